@@ -0,0 +1,186 @@
+"""
+Saved spending profiles and materialized advisor answers.
+The advisor's spending inputs are stored per client in spending_profile, and
+the answer for them (best card per category, projected monthly points,
+subscription coverage) is kept in user_recommendation, so the advisor and
+dashboard read a stored answer instead of recomputing it on every visit.
+
+A stored answer is recomputed only when one of its inputs changes:
+- the profile: calculate_points stores the answer it just computed;
+- the wallet or tracked subscriptions: write paths call
+  mark_recommendation_stale() and the next read recomputes;
+- the catalog: the row keeps the catalog fingerprint it was computed with.
+"""
+import json
+
+from sqlalchemy import delete, insert, select, update
+
+from coverage_solver import solve_coverage
+from db_engine import upsert_insert
+from models import SpendingProfile, UserCard, UserRecommendation
+from read_models import tracked_subscriptions
+from user_summary import POINTS_PER_DOLLAR
+
+
+def advise(catalog, card_ids, user_subs, spending):
+    """The /calculate-points answer for a wallet, tracked subscriptions and {category_id: amount}."""
+    earn_rates = catalog.earn_rates
+    results = []
+    total_points = 0
+
+    for category_id, amount in spending.items():
+        if amount <= 0:
+            continue
+
+        category_id = int(category_id)
+        if not earn_rates.has_category(category_id):
+            continue
+
+        # Best card comes from the in-memory catalog matrix, no per-card queries
+        best_card_id, best_rate = earn_rates.best_card(card_ids, category_id)
+
+        if best_card_id is not None:
+            best_points = int(amount * best_rate)
+            results.append({
+                "category": earn_rates.category_names[category_id],
+                "amount": amount,
+                "card": earn_rates.card_names[best_card_id],
+                "rate": best_rate,
+                "points": best_points
+            })
+            total_points += best_points
+
+    # Pick the set of subscriptions that covers the most dollars
+    points_needed = [int(us.subscription.monthly_cost_cad * POINTS_PER_DOLLAR) for us in user_subs]
+    covered = solve_coverage(total_points, points_needed)
+
+    coverage = []
+    for us, needed, can_cover in zip(user_subs, points_needed, covered):
+        sub = us.subscription
+        coverage.append({
+            "name": sub.name,
+            "cost": sub.monthly_cost_cad,
+            "points_needed": needed,
+            "can_cover": can_cover
+        })
+
+    return {
+        "results": results,
+        "total_points": total_points,
+        "coverage": coverage
+    }
+
+
+def wallet_card_ids(session, client_id):
+    """A user's catalog card ids in wallet order."""
+    return session.execute(
+        select(UserCard.credit_card_id).where(UserCard.client_id == client_id).order_by(UserCard.id)
+    ).scalars().all()
+
+
+def load_spending_profile(session, client_id):
+    """Saved monthly spending as {"category_id": amount}, the shape the advisor posts."""
+    rows = session.execute(
+        select(SpendingProfile.category_id, SpendingProfile.monthly_amount)
+        .where(SpendingProfile.client_id == client_id)
+        .order_by(SpendingProfile.category_id)
+    )
+    return {str(category_id): amount for category_id, amount in rows}
+
+
+def profile_amounts(catalog, spending):
+    """The part of a spending payload a profile keeps: {category_id: amount} for positive, known categories."""
+    wanted = {}
+    for category_id, amount in spending.items():
+        category_id = int(category_id)
+        if amount > 0 and catalog.earn_rates.has_category(category_id):
+            wanted[category_id] = float(amount)
+    return wanted
+
+
+def save_spending_profile(session, catalog, client_id, spending):
+    """Replace a user's profile with the positive, known-category amounts; True if it changed."""
+    wanted = profile_amounts(catalog, spending)
+    current = {int(category_id): amount for category_id, amount in load_spending_profile(session, client_id).items()}
+    if current == wanted:
+        return False
+
+    session.execute(delete(SpendingProfile).where(SpendingProfile.client_id == client_id))
+    if wanted:
+        session.execute(insert(SpendingProfile), [
+            {"client_id": client_id, "category_id": category_id, "monthly_amount": amount}
+            for category_id, amount in sorted(wanted.items())
+        ])
+    return True
+
+
+def store_user_recommendation(session, catalog, client_id, payload):
+    """Upsert a user's materialized answer in the session's transaction."""
+    values = {
+        "client_id": client_id,
+        "payload": json.dumps(payload),
+        "total_points": payload["total_points"],
+        "catalog_fingerprint": catalog.fingerprint,
+        "is_stale": False,
+    }
+    dialect_insert = upsert_insert(session.get_bind())
+    if dialect_insert is not None:
+        stmt = dialect_insert(UserRecommendation.__table__).values(**values)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["client_id"],
+            set_={name: stmt.excluded[name] for name in values if name != "client_id"},
+        ))
+    else:
+        session.merge(UserRecommendation(**values))
+
+
+def save_profile_answer(session, catalog, client_id, spending, payload):
+    """
+    Save the advisor inputs and the answer computed for them; True if the
+    profile changed. A profile left with no usable amounts removes the answer.
+    """
+    if not save_spending_profile(session, catalog, client_id, spending):
+        return False
+    if profile_amounts(catalog, spending):
+        store_user_recommendation(session, catalog, client_id, payload)
+    else:
+        session.execute(delete(UserRecommendation).where(UserRecommendation.client_id == client_id))
+    return True
+
+
+def refresh_user_recommendation(session, catalog, client_id, spending=None):
+    """Recompute a user's answer from the saved profile; None if there is no profile."""
+    if spending is None:
+        spending = load_spending_profile(session, client_id)
+    if not spending:
+        session.execute(delete(UserRecommendation).where(UserRecommendation.client_id == client_id))
+        return None
+
+    user_subs = tracked_subscriptions(session, catalog, client_id, active_only=True)
+    payload = advise(catalog, wallet_card_ids(session, client_id), user_subs, spending)
+    store_user_recommendation(session, catalog, client_id, payload)
+    return payload
+
+
+def mark_recommendation_stale(session, client_id):
+    """Flag a user's answer for recomputation after a wallet or subscription change."""
+    session.execute(
+        update(UserRecommendation).where(UserRecommendation.client_id == client_id).values(is_stale=True)
+    )
+
+
+def get_user_recommendation(session, catalog, client_id):
+    """The stored answer for a user, recomputed first if stale; None without a profile."""
+    row = session.execute(
+        select(UserRecommendation.payload, UserRecommendation.catalog_fingerprint, UserRecommendation.is_stale)
+        .where(UserRecommendation.client_id == client_id)
+    ).first()
+    if row is not None and not row.is_stale and row.catalog_fingerprint == catalog.fingerprint:
+        return json.loads(row.payload)
+
+    spending = load_spending_profile(session, client_id)
+    if row is None and not spending:
+        return None
+    payload = refresh_user_recommendation(session, catalog, client_id, spending)
+    session.commit()
+    return payload
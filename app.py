@@ -4,17 +4,37 @@ A web app that helps users understand how to use credit card points to cover sub
 """
 
 from datetime import datetime
-from flask import Flask, render_template, flash, redirect, url_for, request, jsonify, session as flask_session
-from flask_bcrypt import Bcrypt
+from flask import (
+    Flask, render_template, flash, redirect, url_for, request, jsonify, after_this_request,
+    session as flask_session,
+)
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
+from sqlalchemy.orm import sessionmaker
 import traceback
 import os
+import numpy as np
 
-from models import DbBase, Client, CreditCard, Subscription, SpendingCategory, CardBonus, UserCard, UserSubscription
-from forms import SignupForm, LoginForm, VerificationForm, EditProfileForm, ChangePasswordForm
-from email_utils import generate_verification_code, get_code_expiry, send_verification_email, mail
+from models import Client, UserCard
+from db_engine import create_db_engine
+from migrations import run_migrations
+from advice import (
+    advise, get_user_recommendation, load_spending_profile, mark_recommendation_stale,
+    save_profile_answer, wallet_card_ids,
+)
+from catalog import get_catalog
+from catalog_artifact import install_catalog_artifact, sqlite_file_path
+from coverage_solver import CoverageSolver
+from result_cache import ResultCache, spending_fingerprint
+from statements import StatementError, aggregate_spending, read_transactions
+from passwords import HasherBusy, PasswordHasher
+from principal import UserPrincipal
+from projection import project_coverage
+from read_models import wallet_cards, tracked_subscriptions
+from recommender import recommend_cards
+from simulation import DEFAULT_CV, DEFAULT_SAMPLES, simulate_coverage
+from startup import Lazy, startup_report
+from user_summary import POINTS_PER_DOLLAR, get_user_summary, refresh_user_summary
+from wallet import add_user_card, remove_user_card, add_user_subscription, remove_user_subscription, set_card_points
 
 # App setup — use absolute paths so templates/static resolve on Vercel
 _base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -33,12 +53,6 @@ app.config["MAIL_USERNAME"] = os.environ.get("MAIL_USERNAME")
 app.config["MAIL_PASSWORD"] = os.environ.get("MAIL_PASSWORD")
 app.config["MAIL_DEFAULT_SENDER"] = os.environ.get("MAIL_DEFAULT_SENDER", "noreply@deed.com")
 
-# Initialize Flask-Mail
-try:
-    mail.init_app(app)
-except Exception as e:
-    print(f"Warning: Could not initialize Flask-Mail: {e}")
-
 # Database setup - handle Vercel serverless environment
 is_vercel = os.environ.get("VERCEL") or os.environ.get("VERCEL_ENV")
 if is_vercel:
@@ -48,32 +62,131 @@ else:
     db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clients.db")
 
 database_url = os.environ.get("DATABASE_URL", f"sqlite:///{db_path}")
-engine = create_engine(database_url, echo=False, connect_args={"check_same_thread": False})
+engine = create_db_engine(database_url)
 Session = sessionmaker(bind=engine)
+# Where the engine actually points (DATABASE_URL wins over db_path), without the password
+database_location = sqlite_file_path(database_url) or engine.url.render_as_string(hide_password=True)
+
+
+def _init_database():
+    """Start a new SQLite file from the prebuilt catalog, then apply pending schema migrations."""
+    try:
+        # A fresh database (e.g. /tmp on a new serverless instance) is one file copy away from seeded
+        sqlite_path = sqlite_file_path(database_url)
+        if sqlite_path and install_catalog_artifact(sqlite_path):
+            print(f"Catalog copied to: {sqlite_path}")
+        run_migrations(engine)
+        print(f"Database initialized at: {database_location}")
+    except Exception as e:
+        print(f"Warning: Could not initialize database tables: {e}")
+
+
+# Deferred to the first request so importing the app stays cheap on cold starts
+database = Lazy("database", _init_database)
+
+
+@app.before_request
+def ensure_database():
+    """Run the deferred database setup before the first request that may need it."""
+    if request.endpoint != "static":
+        database()
 
-# Initialize database tables
-try:
-    DbBase.metadata.create_all(engine)
-    print(f"Database initialized at: {db_path}")
-except Exception as e:
-    print(f"Warning: Could not initialize database tables: {e}")
 
 # Extensions
-bcrypt = Bcrypt(app)
+password_hasher = PasswordHasher.from_env()
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 login_manager.login_message = "Please log in to access this page."
 login_manager.login_message_category = "info"
 
 
+def _email_transport():
+    from email_outbox import ConsoleTransport, FlaskMailTransport
+    from email_utils import DEV_MODE, mail
+    
+    try:
+        mail.init_app(app)
+    except Exception as e:
+        print(f"Warning: Could not initialize Flask-Mail: {e}")
+    return ConsoleTransport() if DEV_MODE else FlaskMailTransport(app, mail)
+
+
+def _outbox_workers():
+    from email_outbox import OutboxWorker, OutboxWorkerPool
+    
+    return OutboxWorkerPool(
+        OutboxWorker(Session, email_transport()),
+        size=int(os.environ.get("EMAIL_WORKERS", 1)),
+    )
+
+
+# Emails are queued in the outbox by requests and delivered by background workers,
+# which (with Flask-Mail) are only set up once something is queued
+email_transport = Lazy("email_transport", _email_transport)
+outbox_workers = Lazy("outbox_workers", _outbox_workers)
+
+# A serverless function can freeze as soon as its response is sent, stopping background
+# threads, and its /tmp database is out of reach of a separate outbox process
+deliver_emails_on_response = os.environ.get(
+    "EMAIL_DELIVER_ON_RESPONSE", "true" if is_vercel else "false"
+).lower() == "true"
+
+
+def _drain_outbox():
+    try:
+        outbox_workers().worker.drain_once()
+    except Exception as e:
+        print(f"Email outbox delivery error: {e}")
+
+
+def send_queued_emails():
+    """Deliver emails the request just committed to the outbox."""
+    if deliver_emails_on_response:
+        # Still inside the invocation: runs once the response body has been sent
+        @after_this_request
+        def drain_after_response(response):
+            response.call_on_close(_drain_outbox)
+            return response
+    else:
+        outbox_workers().notify()
+
+
+def _merchant_index():
+    from merchant_index import load_merchant_index
+    
+    return load_merchant_index()
+
+
+# Compiled merchant keyword automaton, memory-mapped from its disk cache on first statement import
+merchant_index = Lazy("merchant_index", _merchant_index)
+
+# Memoized /calculate-points answers, invalidated by wallet and subscription changes
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_SIZE", 4096)),
+    ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL", 300)),
+)
+
+# Authenticated users, so page views skip the Client lookup
+principal_cache = ResultCache(
+    max_entries=int(os.environ.get("PRINCIPAL_CACHE_SIZE", 10000)),
+    ttl_seconds=float(os.environ.get("PRINCIPAL_CACHE_TTL", 300)),
+)
+
+
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login."""
-    with Session() as session:
-        user = session.get(Client, int(user_id))
-        if user:
-            session.expunge(user)
-        return user
+    user_id = int(user_id)
+    generation = principal_cache.generation()
+    principal = principal_cache.get(user_id, "principal")
+    if principal is None:
+        with Session() as session:
+            user = session.get(Client, user_id)
+            if not user:
+                return None
+            principal = UserPrincipal.from_client(user)
+        principal_cache.put(user_id, "principal", principal, generation)
+    return principal
 
 
 # =============================================================================
@@ -99,9 +212,11 @@ def health():
     
     return jsonify({
         "status": "ok",
-        "database": db_path,
+        "database": database_location,
         "vercel": bool(is_vercel),
-        "db_status": db_status
+        "db_status": db_status,
+        "password_hasher": password_hasher.stats(),
+        "startup_ms": startup_report(database, email_transport, outbox_workers, merchant_index),
     }), 200
 
 
@@ -111,9 +226,13 @@ def signup():
     if current_user.is_authenticated:
         return redirect(url_for("dashboard"))
     
+    from email_outbox import enqueue_verification_email
+    from email_utils import generate_verification_code, get_code_expiry
+    from forms import SignupForm
+    
     form = SignupForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        hashed_password = password_hasher.hash_password(form.password.data)
         
         # Generate verification code
         verification_code = generate_verification_code()
@@ -136,13 +255,15 @@ def signup():
                 code_expires_at=code_expiry,
             )
             session.add(new_client)
+            
+            # Queue the verification email in the same transaction as the account
+            enqueue_verification_email(session, form.email.data, verification_code, form.first_name.data)
             session.commit()
             
             # Get the user ID before session closes
             new_client_id = new_client.id
         
-        # Send verification email
-        send_verification_email(form.email.data, verification_code, form.first_name.data)
+        send_queued_emails()
         
         # Store user ID in flask session for verification page
         flask_session['pending_verification_user_id'] = new_client_id
@@ -159,21 +280,27 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for("dashboard"))
     
+    from forms import LoginForm
+    
     form = LoginForm()
     if form.validate_on_submit():
         with Session() as session:
             client = session.query(Client).filter_by(email=form.email.data).first()
 
-            if client and bcrypt.check_password_hash(client.password, form.password.data):
+            if client and password_hasher.check_password(client.password, form.password.data):
+                # Upgrade hashes made with an older, cheaper cost while we have the password
+                if password_hasher.needs_rehash(client.password):
+                    client.password = password_hasher.hash_password(form.password.data)
+                    session.commit()
+                
                 # Check if email is verified
                 if not client.is_verified:
                     flask_session['pending_verification_user_id'] = client.id
                     flash("Please verify your email before logging in.", "warning")
                     return redirect(url_for("verify_email"))
                 
-                # Detach user from session so Flask-Login can use it
-                session.expunge(client)
-                login_user(client)
+                # Log in a plain principal so nothing depends on this session
+                login_user(UserPrincipal.from_client(client))
                 flash("Welcome back!", "success")
                 next_page = request.args.get("next")
                 return redirect(next_page if next_page else url_for("dashboard"))
@@ -194,6 +321,8 @@ def verify_email():
         flash("No pending verification. Please sign up or log in.", "warning")
         return redirect(url_for("login"))
     
+    from forms import VerificationForm
+    
     form = VerificationForm()
     email = None
     
@@ -219,15 +348,12 @@ def verify_email():
                     user.verification_code = None
                     user.code_expires_at = None
                     session.commit()
+                    principal_cache.invalidate_user(user.id)
                     
                     flask_session.pop('pending_verification_user_id', None)
-                    verified_user_id = user.id
                     
-                    # Log in user in a new session
-                    with Session() as login_session:
-                        verified_user = login_session.get(Client, verified_user_id)
-                        login_session.expunge(verified_user)
-                        login_user(verified_user)
+                    # Log in a plain principal, as login() does
+                    login_user(UserPrincipal.from_client(user))
                     
                     flash("Email verified successfully! Welcome to Deed.", "success")
                     return redirect(url_for("dashboard"))
@@ -255,12 +381,16 @@ def resend_verification():
             flash("Email already verified.", "info")
             return redirect(url_for("login"))
         
+        from email_outbox import enqueue_verification_email
+        from email_utils import generate_verification_code, get_code_expiry
+        
         new_code = generate_verification_code()
         user.verification_code = new_code
         user.code_expires_at = get_code_expiry()
+        enqueue_verification_email(session, user.email, new_code, user.first_name)
         session.commit()
         
-        send_verification_email(user.email, new_code, user.first_name)
+        send_queued_emails()
         
         flash("A new verification code has been sent to your email.", "success")
     
@@ -280,6 +410,8 @@ def logout():
 @login_required
 def profile():
     """User profile settings."""
+    from forms import EditProfileForm
+    
     form = EditProfileForm()
     
     if request.method == 'GET':
@@ -293,6 +425,7 @@ def profile():
                 client.first_name = form.first_name.data
                 client.surname = form.surname.data
                 session.commit()
+                principal_cache.invalidate_user(client.id)
                 flash("Profile updated successfully!", "success")
                 return redirect(url_for("profile"))
     
@@ -303,15 +436,18 @@ def profile():
 @login_required
 def change_password():
     """Change user password."""
+    from forms import ChangePasswordForm
+    
     form = ChangePasswordForm()
     
     if form.validate_on_submit():
         with Session() as session:
             client = session.get(Client, current_user.id)
-            if client and bcrypt.check_password_hash(client.password, form.current_password.data):
-                hashed_password = bcrypt.generate_password_hash(form.new_password.data).decode('utf-8')
+            if client and password_hasher.check_password(client.password, form.current_password.data):
+                hashed_password = password_hasher.hash_password(form.new_password.data)
                 client.password = hashed_password
                 session.commit()
+                principal_cache.invalidate_user(client.id)
                 flash("Password changed successfully!", "success")
                 return redirect(url_for("profile"))
             else:
@@ -328,42 +464,28 @@ def change_password():
 def dashboard():
     """Main dashboard showing points overview and subscriptions."""
     user_id = current_user.id
+    catalog = get_catalog(Session)
     
     with Session() as session:
-        # Eagerly load relationships to avoid DetachedInstanceError in templates
-        user_cards = session.query(UserCard).options(
-            joinedload(UserCard.credit_card)
-        ).filter_by(client_id=user_id).all()
-        
-        user_subs = session.query(UserSubscription).options(
-            joinedload(UserSubscription.subscription)
-        ).filter_by(client_id=user_id, is_active=True).all()
+        # Header totals are one primary-key read of the denormalized summary
+        summary = get_user_summary(session, user_id)
         
-        # Calculate totals
-        total_points = sum(uc.current_points for uc in user_cards)
-        total_monthly_cost = sum(us.subscription.monthly_cost_cad for us in user_subs)
+        # Plain rows joined to the catalog snapshot, safe to use after the session closes
+        user_cards = wallet_cards(session, catalog, user_id)
+        user_subs = tracked_subscriptions(session, catalog, user_id, active_only=True)
         
-        # Calculate points needed (rough estimate: $1 = 100 points for most cards)
-        points_per_dollar = 100
-        points_needed = int(total_monthly_cost * points_per_dollar)
-        
-        # Calculate coverage percentage
-        coverage_percent = min(100, int((total_points / max(points_needed, 1)) * 100))
-        
-        # Detach all objects so they can be used in templates after session closes
-        for uc in user_cards:
-            session.expunge(uc)
-        for us in user_subs:
-            session.expunge(us)
+        # Stored advisor answer for the saved spending profile, if there is one
+        advice = get_user_recommendation(session, catalog, user_id)
         
     return render_template(
         "dashboard.html",
         user_cards=user_cards,
         user_subs=user_subs,
-        total_points=total_points,
-        total_monthly_cost=total_monthly_cost,
-        points_needed=points_needed,
-        coverage_percent=coverage_percent
+        advice=advice,
+        total_points=summary.total_points,
+        total_monthly_cost=summary.monthly_cost_cad,
+        points_needed=summary.points_needed,
+        coverage_percent=summary.coverage_percent
     )
 
 
@@ -373,21 +495,13 @@ def my_cards():
     """View and manage user's credit cards."""
     user_id = current_user.id
     
+    catalog = get_catalog(Session)
+    all_cards = catalog.active_cards
+    
     with Session() as session:
-        # Eagerly load credit_card relationship
-        all_cards = session.query(CreditCard).filter_by(is_active=True).all()
-        
-        user_cards = session.query(UserCard).options(
-            joinedload(UserCard.credit_card)
-        ).filter_by(client_id=user_id).all()
-        user_card_ids = [uc.credit_card_id for uc in user_cards]
-        
-        # Detach all objects for use in templates
-        for card in all_cards:
-            session.expunge(card)
-        for uc in user_cards:
-            session.expunge(uc)
-        
+        user_cards = wallet_cards(session, catalog, user_id)
+    user_card_ids = [uc.credit_card_id for uc in user_cards]
+    
     return render_template(
         "my_cards.html",
         all_cards=all_cards,
@@ -402,29 +516,23 @@ def add_card(card_id):
     """Add a credit card to user's wallet."""
     user_id = current_user.id
     
+    card = get_catalog(Session).cards_by_id.get(card_id)
+    if not card:
+        flash("Card not found.", "danger")
+        return redirect(url_for("my_cards"))
+    
     with Session() as session:
-        existing = session.query(UserCard).filter_by(
-            client_id=user_id,
-            credit_card_id=card_id
-        ).first()
-        
-        if existing:
-            flash("You already have this card!", "warning")
-            return redirect(url_for("my_cards"))
-        
-        new_user_card = UserCard(
-            client_id=user_id,
-            credit_card_id=card_id,
-            current_points=0
-        )
-        session.add(new_user_card)
+        added = add_user_card(session, user_id, card_id)
+        if added:
+            refresh_user_summary(session, user_id)
+            mark_recommendation_stale(session, user_id)
         session.commit()
-        
-        card = session.get(CreditCard, card_id)
-        if card:
-            flash(f"Added {card.name} to your wallet!", "success")
-        else:
-            flash("Card added to wallet!", "success")
+    
+    if added:
+        result_cache.invalidate_user(user_id)
+        flash(f"Added {card.name} to your wallet!", "success")
+    else:
+        flash("You already have this card!", "warning")
     
     return redirect(url_for("my_cards"))
 
@@ -436,20 +544,19 @@ def remove_card(user_card_id):
     user_id = current_user.id
     
     with Session() as session:
-        user_card = session.query(UserCard).options(
-            joinedload(UserCard.credit_card)
-        ).filter_by(
-            id=user_card_id,
-            client_id=user_id
-        ).first()
-        
-        if user_card:
-            card_name = user_card.credit_card.name
-            session.delete(user_card)
-            session.commit()
-            flash(f"Removed {card_name} from your wallet.", "info")
-        else:
-            flash("Card not found.", "danger")
+        credit_card_id = remove_user_card(session, user_id, user_card_id)
+        if credit_card_id is not None:
+            refresh_user_summary(session, user_id)
+            mark_recommendation_stale(session, user_id)
+        session.commit()
+    
+    if credit_card_id is not None:
+        result_cache.invalidate_user(user_id)
+        card = get_catalog(Session).cards_by_id.get(credit_card_id)
+        card_name = card.name if card else "the card"
+        flash(f"Removed {card_name} from your wallet.", "info")
+    else:
+        flash("Card not found.", "danger")
     
     return redirect(url_for("my_cards"))
 
@@ -469,7 +576,10 @@ def update_points(user_card_id):
         
         if user_card:
             user_card.current_points = max(0, points)
+            session.flush()
+            refresh_user_summary(session, user_id)
             session.commit()
+            result_cache.invalidate_user(user_id)
             flash("Points balance updated!", "success")
         else:
             flash("Card not found.", "danger")
@@ -477,26 +587,74 @@ def update_points(user_card_id):
     return redirect(url_for("my_cards"))
 
 
+# Far more than any real wallet; keeps one sync to a single bounded statement
+MAX_POINT_UPDATES = 500
+
+
+def _whole_number(value):
+    """A JSON number with no fractional part as an int; rejects booleans, strings and 1.7."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(value)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(value)
+    return int(value)
+
+
+@app.route("/update-points", methods=["POST"])
+@login_required
+def update_points_batch():
+    """Sync many card balances at once: {"points": {user_card_id: points}}."""
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not isinstance(data.get("points"), dict):
+        return jsonify({"error": "Expected {\"points\": {user_card_id: points}}"}), 400
+    
+    try:
+        points_by_card = {int(card_id): _whole_number(points) for card_id, points in data["points"].items()}
+    except (TypeError, ValueError):
+        return jsonify({"error": "Card ids and points must be integers"}), 400
+    
+    if len(points_by_card) > MAX_POINT_UPDATES:
+        return jsonify({"error": f"At most {MAX_POINT_UPDATES} cards per request"}), 400
+    
+    user_id = current_user.id
+    catalog = get_catalog(Session)
+    
+    with Session() as session:
+        set_card_points(session, user_id, points_by_card)
+        summary = refresh_user_summary(session, user_id)
+        user_cards = wallet_cards(session, catalog, user_id)
+        session.commit()
+    result_cache.invalidate_user(user_id)
+    
+    owned = {uc.id for uc in user_cards}
+    return jsonify({
+        "updated": sorted(card_id for card_id in points_by_card if card_id in owned),
+        "not_found": sorted(card_id for card_id in points_by_card if card_id not in owned),
+        "cards": [
+            {"user_card_id": uc.id, "name": uc.credit_card.name, "current_points": uc.current_points}
+            for uc in user_cards
+        ],
+        "total_points": summary.total_points,
+        "monthly_cost": round(summary.monthly_cost_cad, 2),
+        "points_needed": summary.points_needed,
+        "coverage_percent": summary.coverage_percent,
+    })
+
+
 @app.route("/my-subscriptions")
 @login_required
 def my_subscriptions():
     """View and manage subscriptions to track."""
     user_id = current_user.id
     
+    catalog = get_catalog(Session)
+    all_subs = catalog.active_subscriptions
+    
     with Session() as session:
-        all_subs = session.query(Subscription).filter_by(is_active=True).all()
-        
-        user_subs = session.query(UserSubscription).options(
-            joinedload(UserSubscription.subscription)
-        ).filter_by(client_id=user_id).all()
-        user_sub_ids = [us.subscription_id for us in user_subs]
-        
-        # Detach all objects for use in templates
-        for sub in all_subs:
-            session.expunge(sub)
-        for us in user_subs:
-            session.expunge(us)
-        
+        user_subs = tracked_subscriptions(session, catalog, user_id)
+    user_sub_ids = [us.subscription_id for us in user_subs]
+    
     return render_template(
         "my_subscriptions.html",
         all_subs=all_subs,
@@ -511,25 +669,23 @@ def add_subscription(sub_id):
     """Add a subscription to track."""
     user_id = current_user.id
     
+    sub = get_catalog(Session).subscriptions_by_id.get(sub_id)
+    if not sub:
+        flash("Subscription not found.", "danger")
+        return redirect(url_for("my_subscriptions"))
+    
     with Session() as session:
-        existing = session.query(UserSubscription).filter_by(
-            client_id=user_id,
-            subscription_id=sub_id
-        ).first()
-        
-        if existing:
-            flash("You're already tracking this subscription!", "warning")
-            return redirect(url_for("my_subscriptions"))
-        
-        new_user_sub = UserSubscription(
-            client_id=user_id,
-            subscription_id=sub_id
-        )
-        session.add(new_user_sub)
+        added = add_user_subscription(session, user_id, sub_id)
+        if added:
+            refresh_user_summary(session, user_id)
+            mark_recommendation_stale(session, user_id)
         session.commit()
-        
-        sub = session.get(Subscription, sub_id)
+    
+    if added:
+        result_cache.invalidate_user(user_id)
         flash(f"Now tracking {sub.name}!", "success")
+    else:
+        flash("You're already tracking this subscription!", "warning")
     
     return redirect(url_for("my_subscriptions"))
 
@@ -541,20 +697,19 @@ def remove_subscription(user_sub_id):
     user_id = current_user.id
     
     with Session() as session:
-        user_sub = session.query(UserSubscription).options(
-            joinedload(UserSubscription.subscription)
-        ).filter_by(
-            id=user_sub_id,
-            client_id=user_id
-        ).first()
-        
-        if user_sub:
-            sub_name = user_sub.subscription.name
-            session.delete(user_sub)
-            session.commit()
-            flash(f"Stopped tracking {sub_name}.", "info")
-        else:
-            flash("Subscription not found.", "danger")
+        subscription_id = remove_user_subscription(session, user_id, user_sub_id)
+        if subscription_id is not None:
+            refresh_user_summary(session, user_id)
+            mark_recommendation_stale(session, user_id)
+        session.commit()
+    
+    if subscription_id is not None:
+        result_cache.invalidate_user(user_id)
+        sub = get_catalog(Session).subscriptions_by_id.get(subscription_id)
+        sub_name = sub.name if sub else "the subscription"
+        flash(f"Stopped tracking {sub_name}.", "info")
+    else:
+        flash("Subscription not found.", "danger")
     
     return redirect(url_for("my_subscriptions"))
 
@@ -565,30 +720,20 @@ def advisor():
     """Smart spending advisor page."""
     user_id = current_user.id
     
+    catalog = get_catalog(Session)
+    
+    # The wallet (to prompt for a first card), plus the saved profile and its stored answer
     with Session() as session:
-        user_cards = session.query(UserCard).options(
-            joinedload(UserCard.credit_card)
-        ).filter_by(client_id=user_id).all()
-        
-        categories = session.query(SpendingCategory).all()
-        
-        user_subs = session.query(UserSubscription).options(
-            joinedload(UserSubscription.subscription)
-        ).filter_by(client_id=user_id, is_active=True).all()
-        
-        # Detach all objects for use in templates
-        for uc in user_cards:
-            session.expunge(uc)
-        for cat in categories:
-            session.expunge(cat)
-        for us in user_subs:
-            session.expunge(us)
-        
+        user_cards = wallet_cards(session, catalog, user_id)
+        profile = load_spending_profile(session, user_id)
+        advice = get_user_recommendation(session, catalog, user_id) if profile else None
+    
     return render_template(
         "advisor.html",
         user_cards=user_cards,
-        categories=categories,
-        user_subs=user_subs
+        categories=catalog.categories,
+        profile=profile,
+        advice=advice
     )
 
 
@@ -603,78 +748,312 @@ def calculate_points():
         
     spending = data.get("spending", {})
     user_id = current_user.id
+    payload = score_spending(user_id, spending)
     
+    # Keep the inputs, and the answer for them, for the advisor and dashboard. The stored
+    # profile decides whether anything changed: another worker may have saved since.
+    catalog = get_catalog(Session)
     with Session() as session:
-        user_cards = session.query(UserCard).options(
-            joinedload(UserCard.credit_card)
-        ).filter_by(client_id=user_id).all()
-        
-        results = []
-        total_points = 0
-        
-        for category_id, amount in spending.items():
-            if amount <= 0:
-                continue
-                
-            category = session.get(SpendingCategory, int(category_id))
-            if not category:
-                continue
-            
-            best_card = None
-            best_rate = 0
-            best_points = 0
-            
-            for user_card in user_cards:
-                card = user_card.credit_card
-                
-                bonus = session.query(CardBonus).filter_by(
-                    credit_card_id=card.id,
-                    category_id=int(category_id)
-                ).first()
-                
-                rate = bonus.earn_rate if bonus else card.base_earn_rate
-                points = int(amount * rate)
-                
-                if rate > best_rate:
-                    best_rate = rate
-                    best_card = card
-                    best_points = points
-            
-            if best_card:
-                results.append({
-                    "category": category.name,
-                    "amount": amount,
-                    "card": best_card.name,
-                    "rate": best_rate,
-                    "points": best_points
-                })
-                total_points += best_points
-        
-        # Get subscriptions user can cover
-        user_subs = session.query(UserSubscription).options(
-            joinedload(UserSubscription.subscription)
-        ).filter_by(client_id=user_id, is_active=True).all()
+        if save_profile_answer(session, catalog, user_id, spending, payload):
+            session.commit()
+    
+    return jsonify(payload)
+
+
+def score_spending(user_id, spending):
+    """Best card per category and subscription coverage for {category_id: monthly amount}."""
+    catalog = get_catalog(Session)
+    earn_rates = catalog.earn_rates
+    
+    # Same wallet, catalog and spending as a recent request: answer from memory
+    fingerprint = (earn_rates.version, spending_fingerprint(spending))
+    generation = result_cache.generation()
+    cached = result_cache.get(user_id, fingerprint)
+    if cached is not None:
+        return cached
+    
+    with Session() as session:
+        card_ids = [
+            row.credit_card_id for row in session.query(UserCard.credit_card_id)
+            .filter_by(client_id=user_id).order_by(UserCard.id)
+        ]
         
-        coverage = []
-        points_remaining = total_points
-        for us in user_subs:
-            sub = us.subscription
-            points_needed = int(sub.monthly_cost_cad * 100)
-            can_cover = points_remaining >= points_needed
-            coverage.append({
-                "name": sub.name,
-                "cost": sub.monthly_cost_cad,
-                "points_needed": points_needed,
-                "can_cover": can_cover
-            })
-            if can_cover:
-                points_remaining -= points_needed
+        user_subs = tracked_subscriptions(session, catalog, user_id, active_only=True)
+    
+    payload = advise(catalog, card_ids, user_subs, spending)
+    result_cache.put(user_id, fingerprint, payload, generation)
+    return payload
+
+
+@app.route("/project-coverage", methods=["POST"])
+@login_required
+def projected_coverage():
+    """Month-by-month balances and subscription coverage for the next 1-36 months."""
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not isinstance(data.get("spending") or {}, dict):
+        return jsonify({"error": "Invalid JSON"}), 400
+    
+    user_id = current_user.id
+    catalog = get_catalog(Session)
+    
+    with Session() as session:
+        # Project the posted spending, or the saved profile when none is posted
+        spending = data.get("spending") or load_spending_profile(session, user_id)
+        user_cards = wallet_cards(session, catalog, user_id)
+        user_subs = tracked_subscriptions(session, catalog, user_id, active_only=True)
+    
+    try:
+        projection = project_coverage(
+            catalog,
+            [(uc.credit_card_id, uc.current_points) for uc in user_cards],
+            spending,
+            [(us.subscription_id, us.subscription.monthly_cost_cad) for us in user_subs],
+            months=int(data.get("months", 12)),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    card_names = [catalog.cards_by_id[card_id].name for card_id in projection.card_ids]
+    sub_names = [catalog.subscriptions_by_id[sub_id].name for sub_id in projection.subscription_ids]
+    return jsonify({
+        "monthly_earn": dict(zip(card_names, projection.monthly_earn.tolist())),
+        "months": [
+            {
+                "month": month + 1,
+                "points": dict(zip(card_names, points)),
+                "value": value,
+                "covered": [name for name, hit in zip(sub_names, covered) if hit],
+            }
+            for month, (points, value, covered) in enumerate(zip(
+                projection.points.tolist(), projection.value.tolist(), projection.covered.tolist()
+            ))
+        ],
+        "first_covered": dict(zip(sub_names, projection.first_covered)),
+    })
+
+
+@app.route("/recommend-cards", methods=["POST"])
+@login_required
+def card_recommendations():
+    """Rank catalog cards the user doesn't hold by the annual value they'd add."""
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not isinstance(data.get("spending") or {}, dict):
+        return jsonify({"error": "Invalid JSON"}), 400
+    
+    user_id = current_user.id
+    catalog = get_catalog(Session)
+    
+    # Rank for the posted spending, or the saved profile when none is posted
+    spending = data.get("spending")
+    if not spending:
+        with Session() as session:
+            spending = load_spending_profile(session, user_id)
+    
+    fingerprint = ("recommend", catalog.version, spending_fingerprint(spending))
+    generation = result_cache.generation()
+    cached = result_cache.get(user_id, fingerprint)
+    if cached is not None:
+        return jsonify(cached)
+    
+    with Session() as session:
+        card_ids = [
+            row.credit_card_id for row in session.query(UserCard.credit_card_id).filter_by(client_id=user_id)
+        ]
+    
+    try:
+        singles, pairs = recommend_cards(catalog, card_ids, spending)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Spending must map category ids to amounts"}), 400
+    
+    category_names = catalog.earn_rates.category_names
+    payload = {
+        "cards": [
+            {
+                "card_id": rec.card.id,
+                "name": rec.card.name,
+                "bank": rec.card.bank,
+                "annual_fee": rec.card.annual_fee,
+                "annual_value": rec.annual_value,
+                "gross_value": rec.gross_value,
+                "categories": [category_names[cid] for cid in rec.category_ids],
+            }
+            for rec in singles
+        ],
+        "pairs": [
+            {"card_ids": [card.id for card in pair.cards], "names": [card.name for card in pair.cards],
+             "annual_value": pair.annual_value}
+            for pair in pairs
+        ],
+    }
+    result_cache.put(user_id, fingerprint, payload, generation)
+    return jsonify(payload)
+
+
+@app.route("/import-statement", methods=["POST"])
+@login_required
+def import_statement():
+    """Derive monthly spending from an uploaded CSV/OFX statement and score it."""
+    upload = request.files.get("statement")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Upload a CSV or OFX file as 'statement'"}), 400
+    
+    catalog = get_catalog(Session)
+    classifier = merchant_index().classifier(catalog.categories)
+    negative_spend = request.form.get("negative_spend", "false").lower() == "true"
+    
+    # The upload is read line by line; only the monthly totals are kept
+    try:
+        transactions = read_transactions(upload.stream, upload.filename, negative_spend=negative_spend)
+        monthly = aggregate_spending(transactions, classifier)
+    except StatementError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    category_names = {category.id: category.name for category in catalog.categories}
+    spending = {
+        str(category_id): amount for category_id, amount in monthly.average().items()
+        if category_id is not None
+    }
+    payload = score_spending(current_user.id, spending)
+    return jsonify({
+        "transactions": monthly.transactions,
+        "months": {
+            month: {category_names[category_id]: round(amount, 2)
+                    for category_id, amount in totals.items() if category_id in category_names}
+            for month, totals in sorted(monthly.months.items())
+        },
+        "spending": spending,
+        **payload,
+    })
+
+
+# Upper bound on rows per batch request to keep responses a reasonable size
+MAX_BATCH_SCENARIOS = 10000
+
+
+@app.route("/calculate-points/batch", methods=["POST"])
+@login_required
+def calculate_points_batch():
+    """Score many spending scenarios at once against the user's wallet."""
+    data = request.get_json(silent=True)
+    
+    if (not isinstance(data, dict) or not isinstance(data.get("categories", []), list)
+            or not isinstance(data.get("spending", []), list)):
+        return jsonify({"error": "Expected {\"categories\": [ids], \"spending\": [[amounts]]}"}), 400
+    
+    try:
+        category_ids = [int(cid) for cid in data.get("categories", [])]
+        spending = np.asarray(data.get("spending", []), dtype=np.float64)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Spending must be a numeric matrix"}), 400
+    
+    if spending.ndim != 2 or spending.shape[1] != len(category_ids):
+        return jsonify({"error": "Spending must have one column per category"}), 400
+    if not np.isfinite(spending).all():
+        return jsonify({"error": "Spending must be a numeric matrix"}), 400
+    if spending.shape[0] > MAX_BATCH_SCENARIOS:
+        return jsonify({"error": f"At most {MAX_BATCH_SCENARIOS} scenarios per request"}), 400
+    
+    user_id = current_user.id
+    catalog = get_catalog(Session)
+    earn_rates = catalog.earn_rates
+    
+    with Session() as session:
+        card_ids = [
+            row.credit_card_id for row in session.query(UserCard.credit_card_id)
+            .filter_by(client_id=user_id).order_by(UserCard.id)
+        ]
         
-        return jsonify({
-            "results": results,
-            "total_points": total_points,
-            "coverage": coverage
-        })
+        user_subs = tracked_subscriptions(session, catalog, user_id, active_only=True)
+        subscriptions = [
+            {"name": us.subscription.name, "cost": us.subscription.monthly_cost_cad,
+             "points_needed": int(us.subscription.monthly_cost_cad * POINTS_PER_DOLLAR)}
+            for us in user_subs
+        ]
+    
+    # One pass over the wallet's earn-rate sub-matrix for every scenario
+    best_cards, best_rates, points = earn_rates.score_scenarios(card_ids, category_ids, spending)
+    total_points = points.sum(axis=1)
+    
+    # Optimal coverage per scenario; the DP is shared by every row
+    solver = CoverageSolver([sub["points_needed"] for sub in subscriptions])
+    can_cover = solver.solve_many(total_points)
+    
+    card_names = np.array(
+        [earn_rates.card_names.get(int(cid)) for cid in best_cards], dtype=object
+    )
+    row_cards = np.where(spending > 0, card_names, None)
+    
+    return jsonify({
+        "categories": [
+            {
+                "id": cid,
+                "category": earn_rates.category_names.get(cid),
+                "card": earn_rates.card_names.get(int(card_id)),
+                "rate": float(rate)
+            }
+            for cid, card_id, rate in zip(category_ids, best_cards, best_rates)
+        ],
+        "subscriptions": subscriptions,
+        "scenarios": [
+            {
+                "cards": cards,
+                "points": row_points,
+                "total_points": total,
+                "can_cover": covered
+            }
+            for cards, row_points, total, covered in zip(
+                row_cards.tolist(), points.tolist(), total_points.tolist(), can_cover.tolist()
+            )
+        ]
+    })
+
+
+@app.route("/simulate-coverage", methods=["POST"])
+@login_required
+def simulate_coverage_confidence():
+    """Probability each tracked subscription is covered when monthly spending varies."""
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not isinstance(data.get("spending") or {}, dict):
+        return jsonify({"error": "Invalid JSON"}), 400
+    
+    user_id = current_user.id
+    catalog = get_catalog(Session)
+    
+    with Session() as session:
+        # Simulate around the posted spending, or the saved profile when none is posted
+        spending = data.get("spending") or load_spending_profile(session, user_id)
+        card_ids = wallet_card_ids(session, user_id)
+        user_subs = tracked_subscriptions(session, catalog, user_id, active_only=True)
+    
+    points_needed = [int(us.subscription.monthly_cost_cad * POINTS_PER_DOLLAR) for us in user_subs]
+    try:
+        simulation = simulate_coverage(
+            catalog, card_ids, points_needed, spending,
+            n_samples=int(data.get("samples", DEFAULT_SAMPLES)),
+            distribution=data.get("distribution", "lognormal"),
+            cv=data.get("cv", DEFAULT_CV),
+            seed=data.get("seed"),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "samples": simulation.samples,
+        "mean_points": round(simulation.mean_points, 1),
+        "points_percentiles": {f"p{q}": round(points, 1) for q, points in simulation.percentiles.items()},
+        "coverage": [
+            {
+                "name": us.subscription.name,
+                "cost": us.subscription.monthly_cost_cad,
+                "points_needed": needed,
+                "probability": round(probability, 4)
+            }
+            for us, needed, probability in zip(user_subs, points_needed, simulation.probabilities)
+        ]
+    })
 
 
 # =============================================================================
@@ -693,6 +1072,13 @@ def internal_server_error(e):
     return render_template('500.html'), 500
 
 
+@app.errorhandler(HasherBusy)
+def password_hasher_busy(e):
+    """Too many logins at once: ask the user to retry instead of queueing forever."""
+    flash("We're handling a lot of sign-ins right now. Please try again in a moment.", "warning")
+    return redirect(request.path, code=303)
+
+
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Handle all unhandled exceptions."""
@@ -0,0 +1,101 @@
+"""
+Cold-start benchmark for the serverless entry point.
+Each run starts a fresh Python subprocess, the way a new Vercel instance
+would, imports api/index.py and serves one request through the test client.
+It reports the time to import the app, the time to the first response
+(import plus the deferred startup and the request) and the process wall time,
+and fails if the median import exceeds the budget.
+
+Every run gets its own copy of clients.db, or an empty database with
+--empty-db (a brand new /tmp on Vercel, so the first request also copies
+the prebuilt catalog database into place).
+
+Usage: python benchmarks/bench_cold_start.py [--runs 10] [--path /] [--empty-db] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in the child process; prints one JSON line of timings
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import importlib.util
+spec = importlib.util.spec_from_file_location("index", sys.argv[1])
+index = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(index)
+imported = time.perf_counter()
+loaded = {name: name in sys.modules for name in sys.argv[3:]}
+response = index.app.test_client().get(sys.argv[2])
+responded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_response_ms": (responded - start) * 1000,
+    "status": response.status_code,
+    "lazy_modules": loaded,
+}))
+"""
+
+# Modules the entry point should not import until a request needs them
+LAZY_MODULES = ("forms", "email_utils", "email_outbox", "flask_mail", "wtforms", "merchant_index", "seed_data")
+
+
+def run_once(path, empty_db):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "clients.db")
+        if not empty_db:
+            shutil.copy(os.path.join(ROOT, "clients.db"), db_path)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", MERCHANT_INDEX_DIR=os.path.join(tmp, "mi"))
+
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, os.path.join(ROOT, "api", "index.py"), path, *LAZY_MODULES],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["wall_ms"] = wall_ms
+    return timings
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--empty-db", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    runs = [run_once(args.path, args.empty_db) for _ in range(args.runs)]
+    print(f"GET {args.path} x {args.runs} fresh processes ({'empty' if args.empty_db else 'copied'} database)")
+    print(f"{'':>20} {'median ms':>10} {'max ms':>10}")
+    for key in ("import_ms", "first_response_ms", "wall_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key:>20} {median(values):>10.1f} {max(values):>10.1f}")
+
+    statuses = sorted({run["status"] for run in runs})
+    eager = sorted(name for name, loaded in runs[0]["lazy_modules"].items() if loaded)
+    print(f"status: {', '.join(map(str, statuses))}")
+    print(f"imported with the app: {', '.join(eager) or 'none'}")
+
+    import_ms = median([run["import_ms"] for run in runs])
+    if import_ms > args.budget_ms:
+        print(f"FAIL: median import above {args.budget_ms} ms")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark for the subscription coverage solver.
+Times CoverageSolver on users tracking many subscriptions with catalog-like
+prices and fails if the median solve for up to 50 subscriptions exceeds the
+budget.
+
+Usage: python benchmarks/bench_coverage.py [--budget-ms 3]
+"""
+import random
+
+from harness import check_budget, median_ms, parse_args
+
+from coverage_solver import CoverageSolver
+
+# Monthly CAD prices in the seeded subscription catalog
+CATALOG_PRICES = [28.00, 28.00, 16.49, 20.99, 11.99, 16.99, 11.99, 9.99, 10.99, 13.99,
+                  19.99, 11.00, 22.00, 39.99, 79.99, 9.99, 1.29, 3.99, 2.79]
+
+
+def random_inputs(n_subs, rng):
+    """Point costs for n_subs catalog-like subscriptions and a balance to cover them with."""
+    needed = [int(rng.choice(CATALOG_PRICES) * 100 * rng.uniform(0.5, 1.5)) for _ in range(n_subs)]
+    return needed, rng.randint(0, sum(needed))
+
+
+def main():
+    args = parse_args(__doc__, budget_ms=3.0, repeats=200)
+
+    rng = random.Random(42)
+    medians = {}
+    print(f"{'subs':>6} {'median ms':>10} {'max ms':>10}")
+    for n_subs in (10, 50, 100, 200):
+        # Cold solves: the DP is built from scratch every run
+        median, worst = median_ms(lambda needed, available: CoverageSolver(needed).solve(available),
+                                  args.repeats, setup=lambda: random_inputs(n_subs, rng))
+        medians[n_subs] = median
+        print(f"{n_subs:>6} {median:>10.3f} {worst:>10.3f}")
+
+    for n_subs in (10, 50):
+        check_budget(medians[n_subs], args.budget_ms, f"{n_subs} subscriptions")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
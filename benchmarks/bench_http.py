@@ -0,0 +1,474 @@
+"""
+End-to-end HTTP benchmark against the synthetic scale dataset.
+Drives the real app, either in-process through Flask's test client or over
+a local gunicorn, as logged-in scale users: the dashboard, wallet,
+subscription and advisor pages, /calculate-points, /login and the
+add/remove/update POSTs. Reports p50/p95/p99 latency, throughput and SQL
+statements per request for each endpoint.
+
+The dataset (scale_dataset.py) is generated once per --users/--seed into
+the temp directory and every run works on a fresh copy of it. Statements are
+counted by a WSGI middleware that returns the count in an X-SQL-Statements
+header, so gunicorn workers report them too. Add and remove are timed in
+pairs (add a card the user doesn't hold, then remove it) so every run leaves
+wallets as it found them.
+
+Results are compared with a baseline JSON file when one exists: a p95 more
+than --tolerance above it, more statements per request or any failed
+request is a regression. --save-baseline writes the file instead.
+
+Usage: python benchmarks/bench_http.py [--server inprocess|gunicorn] [--users 100000]
+       [--requests 200] [--clients N] [--workers 2] [--baseline PATH] [--save-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine, event, select  # noqa: E402
+
+from models import Client, CreditCard, SpendingCategory, Subscription, UserCard, UserSubscription  # noqa: E402
+from passwords import MIN_ROUNDS  # noqa: E402
+
+STATEMENTS_HEADER = "X-SQL-Statements"
+BENCH_PASSWORD = "bench-password"
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+CSRF_TOKEN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+class StatementCounter:
+    """WSGI middleware returning the number of SQL statements each request ran in a header."""
+
+    def __init__(self, wsgi_app, engine):
+        self.wsgi_app = wsgi_app
+        self._local = threading.local()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self._local.count = getattr(self._local, "count", 0) + 1
+
+    def __call__(self, environ, start_response):
+        self._local.count = 0
+
+        def counting_start_response(status, headers, exc_info=None):
+            return start_response(status, headers + [(STATEMENTS_HEADER, str(self._local.count))], exc_info)
+
+        return self.wsgi_app(environ, counting_start_response)
+
+
+def counted_app():
+    """The app with statement counting; gunicorn loads it as bench_http:counted_app()."""
+    from app import app, engine
+
+    if not isinstance(app.wsgi_app, StatementCounter):
+        app.wsgi_app = StatementCounter(app.wsgi_app, engine)
+    return app
+
+
+# =============================================================================
+# Dataset
+# =============================================================================
+
+def scale_database(users, seed, rounds):
+    """Path of the generated scale database for these settings, generating it on first use."""
+    path = os.path.join(tempfile.gettempdir(), f"deed-scale-{users}-{seed}-r{rounds}.db")
+    if os.path.exists(path):
+        return path
+
+    import bcrypt
+
+    from db_engine import create_db_engine
+    from migrations import run_migrations
+    from scale_dataset import generate_dataset
+
+    tmp_path = path + ".partial"
+    shutil.copyfile(os.path.join(ROOT, "catalog.db"), tmp_path)
+    engine = create_db_engine(f"sqlite:///{tmp_path}", dict(os.environ, SQLITE_SYNCHRONOUS="OFF"))
+    run_migrations(engine)
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    print(f"Generating {users:,} users into {path} ...")
+    start = time.perf_counter()
+    generate_dataset(engine, users, seed=seed, password_hash=password_hash)
+    engine.dispose()
+    os.replace(tmp_path, path)
+    print(f"Generated in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+class Fixture:
+    """Read-only view of the working database: bench users, their rows and the catalog ids."""
+
+    def __init__(self, db_path):
+        self.engine = create_engine(f"sqlite:///{db_path}")
+        with self.engine.connect() as conn:
+            self.category_ids = conn.execute(select(SpendingCategory.id)).scalars().all()
+            self.card_ids = conn.execute(
+                select(CreditCard.id).where(CreditCard.is_active.is_(True))
+            ).scalars().all()
+            self.subscription_ids = conn.execute(
+                select(Subscription.id).where(Subscription.is_active.is_(True))
+            ).scalars().all()
+
+    def users(self, n, rng):
+        """n random verified scale users as (id, email)."""
+        with self.engine.connect() as conn:
+            verified = conn.execute(
+                select(Client.id, Client.email)
+                .where(Client.is_verified.is_(True), Client.email.like("scale%"))
+            ).all()
+        if len(verified) < n:
+            raise SystemExit(f"Only {len(verified)} verified scale users; raise --users")
+        return [tuple(verified[i]) for i in rng.choice(len(verified), n, replace=False)]
+
+    def user_card_id(self, user_id, card_id=None):
+        query = select(UserCard.id).where(UserCard.client_id == user_id)
+        if card_id is not None:
+            query = query.where(UserCard.credit_card_id == card_id)
+        with self.engine.connect() as conn:
+            return conn.execute(query.order_by(UserCard.id).limit(1)).scalar()
+
+    def held(self, user_id):
+        with self.engine.connect() as conn:
+            cards = conn.execute(select(UserCard.credit_card_id).where(UserCard.client_id == user_id)).scalars()
+            subs = conn.execute(
+                select(UserSubscription.subscription_id).where(UserSubscription.client_id == user_id)
+            ).scalars()
+            return set(cards), set(subs)
+
+    def user_subscription_id(self, user_id, subscription_id):
+        with self.engine.connect() as conn:
+            return conn.execute(select(UserSubscription.id).where(
+                UserSubscription.client_id == user_id, UserSubscription.subscription_id == subscription_id,
+            )).scalar()
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+class InProcessClient:
+    """Requests through Flask's test client, with its own cookies."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, form=None, json_body=None):
+        response = self.client.open(path, method=method, data=form, json=json_body)
+        return response.status_code, response.headers.get(STATEMENTS_HEADER), response.get_data(as_text=True)
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Requests to a running server over HTTP, with its own cookies; redirects aren't followed."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, form=None, json_body=None):
+        data, headers = None, {}
+        if json_body is not None:
+            data, headers = json.dumps(json_body).encode(), {"Content-Type": "application/json"}
+        elif form is not None:
+            data = urlencode(form).encode()
+        try:
+            response = self.opener.open(Request(self.base_url + path, data=data, headers=headers, method=method))
+        except HTTPError as error:
+            response = error
+        with response:
+            return response.status, response.headers.get(STATEMENTS_HEADER), response.read().decode()
+
+
+def login_form(client, email):
+    """The /login form fields for email, with the CSRF token from a fresh login page."""
+    _, _, page = client.request("GET", "/login")
+    match = CSRF_TOKEN.search(page)
+    return {"email": email, "password": BENCH_PASSWORD, "csrf_token": match.group(1) if match else ""}
+
+
+# =============================================================================
+# Workload
+# =============================================================================
+
+class VirtualUser:
+    """One logged-in scale user issuing timed requests."""
+
+    def __init__(self, make_client, fixture, user_id, email, rng):
+        self.make_client = make_client
+        self.fixture = fixture
+        self.user_id = user_id
+        self.email = email
+        self.rng = rng
+        self.client = make_client()
+        status, _, _ = self.client.request("POST", "/login", form=login_form(self.client, email))
+        if status != 302:
+            raise SystemExit(f"Logging in {email} returned {status}")
+        self.cards, self.subscriptions = fixture.held(user_id)
+        self.user_card_id = fixture.user_card_id(user_id)
+        self.samples = {}
+
+    def timed(self, endpoint, method, path, expect, client=None, **kwargs):
+        start = time.perf_counter()
+        status, statements, _ = (client or self.client).request(method, path, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.samples.setdefault(endpoint, []).append(
+            (elapsed, int(statements) if statements is not None else None, status == expect)
+        )
+
+    def page(self, path):
+        self.timed(f"GET {path}", "GET", path, 200)
+
+    def calculate_points(self):
+        categories = self.rng.choice(self.fixture.category_ids, size=min(5, len(self.fixture.category_ids)),
+                                     replace=False)
+        spending = {str(category_id): round(float(self.rng.uniform(20, 800)), 2) for category_id in categories}
+        self.timed("POST /calculate-points", "POST", "/calculate-points", 200, json_body={"spending": spending})
+
+    def login(self):
+        # A fresh cookie jar each time; a logged-in session is redirected without checking the password
+        client = self.make_client()
+        self.timed("POST /login", "POST", "/login", 302, client=client, form=login_form(client, self.email))
+
+    def update_points(self):
+        self.timed("POST /update-points/<id>", "POST", f"/update-points/{self.user_card_id}", 302,
+                   form={"points": int(self.rng.integers(0, 50000))})
+
+    def card_churn(self):
+        unheld = [card_id for card_id in self.fixture.card_ids if card_id not in self.cards]
+        if not unheld:
+            return
+        card_id = int(self.rng.choice(unheld))
+        self.timed("POST /add-card/<id>", "POST", f"/add-card/{card_id}", 302)
+        user_card_id = self.fixture.user_card_id(self.user_id, card_id)
+        self.timed("POST /remove-card/<id>", "POST", f"/remove-card/{user_card_id}", 302)
+
+    def subscription_churn(self):
+        untracked = [sub_id for sub_id in self.fixture.subscription_ids if sub_id not in self.subscriptions]
+        if not untracked:
+            return
+        sub_id = int(self.rng.choice(untracked))
+        self.timed("POST /add-subscription/<id>", "POST", f"/add-subscription/{sub_id}", 302)
+        user_sub_id = self.fixture.user_subscription_id(self.user_id, sub_id)
+        self.timed("POST /remove-subscription/<id>", "POST", f"/remove-subscription/{user_sub_id}", 302)
+
+
+PHASES = [
+    ("dashboard", lambda vu: vu.page("/dashboard")),
+    ("my-cards", lambda vu: vu.page("/my-cards")),
+    ("my-subscriptions", lambda vu: vu.page("/my-subscriptions")),
+    ("advisor", lambda vu: vu.page("/advisor")),
+    ("calculate-points", VirtualUser.calculate_points),
+    ("login", VirtualUser.login),
+    ("update-points", VirtualUser.update_points),
+    ("card-churn", VirtualUser.card_churn),
+    ("subscription-churn", VirtualUser.subscription_churn),
+]
+
+
+def run_phase(users, action, iterations):
+    """Every virtual user runs action iterations times, concurrently."""
+    def work(vu):
+        for _ in range(iterations):
+            action(vu)
+
+    threads = [threading.Thread(target=work, args=(vu,)) for vu in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def summarize_samples(samples, clients):
+    latencies = np.array([elapsed for elapsed, _, _ in samples]) * 1000
+    statements = [count for _, count, _ in samples if count is not None]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": len(samples),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        # Little's law: clients kept busy / mean time per request
+        "throughput_rps": round(float(clients * 1000 / latencies.mean()), 1),
+        "statements": round(sum(statements) / len(statements), 2) if statements else None,
+        "errors": sum(1 for _, _, ok in samples if not ok),
+    }
+
+
+# =============================================================================
+# Servers
+# =============================================================================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(env, workers, timeout=30):
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+         "--pythonpath", f"{ROOT},{os.path.dirname(os.path.abspath(__file__))}",
+         "--log-level", "warning", "bench_http:counted_app()"],
+        cwd=ROOT, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {process.returncode}")
+        try:
+            HttpClient(base_url).request("GET", "/health")
+            return process, base_url
+        except URLError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("gunicorn did not start")
+
+
+# =============================================================================
+# Baselines
+# =============================================================================
+
+def find_regressions(results, baseline, tolerance):
+    """Lines describing every endpoint that got slower, ran more statements or failed."""
+    regressions = []
+    for endpoint, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{endpoint}: {result['errors']} failed requests")
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        # A millisecond of slack keeps sub-millisecond endpoints from flapping
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance) + 1:
+            regressions.append(f"{endpoint}: p95 {result['p95_ms']} ms, baseline {before['p95_ms']} ms")
+        if (result["statements"] is not None and before.get("statements") is not None
+                and result["statements"] > before["statements"] + 0.5):
+            regressions.append(
+                f"{endpoint}: {result['statements']} statements/request, baseline {before['statements']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=("inprocess", "gunicorn"), default="inprocess")
+    parser.add_argument("--users", type=int, default=100000, help="scale dataset size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--clients", type=int, help="concurrent virtual users (default 1, or 2 per gunicorn worker)")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--bcrypt-rounds", type=int, default=MIN_ROUNDS, help="the app never hashes below this")
+    parser.add_argument("--baseline", help="baseline JSON (default benchmarks/baselines/http_<server>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    clients = args.clients or (1 if args.server == "inprocess" else 2 * args.workers)
+    iterations = max(1, args.requests // clients)
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"http_{args.server}.json")
+    rng = np.random.default_rng(args.seed)
+
+    dataset = scale_database(args.users, args.seed, args.bcrypt_rounds)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "clients.db")
+        shutil.copyfile(dataset, db_path)
+        env = {
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+            # Hash inline: a process pool per gunicorn worker would skew the timings
+            "BCRYPT_WORKERS": "0",
+            "MERCHANT_INDEX_DIR": os.path.join(tmp, "merchant-index"),
+        }
+        fixture = Fixture(db_path)
+
+        process = None
+        if args.server == "inprocess":
+            os.environ.update(env)
+            app = counted_app()
+
+            def make_client():
+                return InProcessClient(app)
+        else:
+            process, base_url = start_gunicorn(dict(os.environ, **env), args.workers)
+
+            def make_client():
+                return HttpClient(base_url)
+
+        try:
+            users = [VirtualUser(make_client, fixture, user_id, email, np.random.default_rng([args.seed, i]))
+                     for i, (user_id, email) in enumerate(fixture.users(clients, rng))]
+            # Warm caches, templates and connections
+            for vu in users:
+                for path in ("/dashboard", "/my-cards", "/my-subscriptions", "/advisor"):
+                    vu.client.request("GET", path)
+
+            for _, action in PHASES:
+                run_phase(users, action, iterations)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            fixture.engine.dispose()
+
+    samples = {}
+    for vu in users:
+        for endpoint, endpoint_samples in vu.samples.items():
+            samples.setdefault(endpoint, []).extend(endpoint_samples)
+    results = {endpoint: summarize_samples(endpoint_samples, clients) for endpoint, endpoint_samples in samples.items()}
+
+    print(f"{args.server}: {args.users:,} scale users, {clients} clients, {iterations} requests each"
+          + (f", {args.workers} gunicorn workers" if process else ""))
+    print(f"{'endpoint':<32} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'stmts':>6} {'errors':>6}")
+    for endpoint, r in results.items():
+        statements = f"{r['statements']:.1f}" if r["statements"] is not None else "-"
+        print(f"{endpoint:<32} {r['requests']:>5} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['throughput_rps']:>8.1f} {statements:>6} {r['errors']:>6}")
+
+    config = {"server": args.server, "users": args.users, "seed": args.seed, "clients": clients,
+              "requests": iterations * clients, "workers": args.workers if process else None,
+              "bcrypt_rounds": args.bcrypt_rounds}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump({"config": config, "machine": platform.machine(), "python": platform.python_version(),
+                       "endpoints": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {baseline_path}")
+
+    regressions = [f"{endpoint}: {r['errors']} failed requests" for endpoint, r in results.items() if r["errors"]]
+    if not args.save_baseline and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"Note: baseline was recorded with {baseline.get('config')}")
+        regressions = find_regressions(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"FAIL: {line}")
+    if regressions:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
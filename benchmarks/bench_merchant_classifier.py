@@ -0,0 +1,59 @@
+"""
+Throughput benchmark for the compiled merchant classifier.
+Generates a corpus of statement-style descriptions ("SOBEYS #1234 HALIFAX
+NS", "UBER *TRIP", unknown merchants) and fails if classification runs below
+the target rate on one core.
+
+Usage: python benchmarks/bench_merchant_classifier.py [--count 1000000] [--min-rate 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from catalog import CategoryInfo  # noqa: E402
+from merchant_index import MERCHANT_KEYWORDS, MerchantIndex  # noqa: E402
+
+MERCHANTS = ["SOBEYS", "LOBLAWS", "ESSO", "PETRO-CANADA", "TIM HORTONS", "UBER *TRIP", "UBER EATS",
+             "AIR CANADA", "PRESTO", "ROGERS", "SHOPPERS DRUG MART", "CINEPLEX", "AMZN MKTP CA",
+             "JOE'S HARDWARE", "SQ *CORNER BAKERY", "PAYPAL *ACME", "CITY OF HALIFAX", "DOLLARAMA"]
+CITIES = ["HALIFAX NS", "TORONTO ON", "MONTREAL QC", "VANCOUVER BC", "CALGARY AB", ""]
+
+
+def make_corpus(count, rng):
+    return [
+        f"{rng.choice(MERCHANTS)} #{rng.randint(1, 9999)} {rng.choice(CITIES)}".strip()
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--min-rate", type=float, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.count, random.Random(42))
+    categories = [CategoryInfo(i, name, None, None) for i, (name, _) in enumerate(MERCHANT_KEYWORDS, start=1)]
+    classifier = MerchantIndex.compile().classifier(categories)
+
+    best = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        classifier.classify_many(corpus)
+        best = min(best, time.perf_counter() - start)
+
+    rate = args.count / best
+    print(f"{args.count} descriptions in {best * 1000:.1f} ms: {rate:,.0f} per second")
+    if rate < args.min_rate:
+        print(f"FAIL: below {args.min_rate:,.0f} descriptions per second")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark for the multi-month points projection.
+Builds a synthetic catalog and times project_coverage over 36 months for
+wallets and subscription lists of growing size, failing if the median for the
+largest wallet exceeds the budget.
+
+Usage: python benchmarks/bench_projection.py [--budget-ms 5]
+"""
+import numpy as np
+
+from harness import check_budget, median_ms, parse_args
+
+from projection import MAX_MONTHS, project_coverage
+from synthetic import synthetic_catalog
+
+N_CARDS = 500
+N_CATEGORIES = 10
+
+
+def make_catalog(rng):
+    return synthetic_catalog(N_CARDS, N_CATEGORIES, rng, point_values=(0.5, 0.7, 1, 1, 1.5, 2))
+
+
+def main():
+    args = parse_args(__doc__, budget_ms=5.0, repeats=50)
+
+    rng = np.random.default_rng(42)
+    catalog = make_catalog(rng)
+    spending = {str(c): float(rng.integers(50, 800)) for c in range(1, N_CATEGORIES + 1)}
+    print(f"{'cards':>6} {'subs':>6} {'median ms':>10} {'max ms':>10}")
+    for n_cards, n_subs in ((3, 5), (20, 20), (100, 50), (N_CARDS, 200)):
+        card_ids = rng.choice(np.arange(1, N_CARDS + 1), size=n_cards, replace=False)
+        wallet = [(int(card_id), int(rng.integers(0, 50000))) for card_id in card_ids]
+        subscriptions = [(i, float(rng.choice([4.99, 9.99, 16.49, 22.99]))) for i in range(n_subs)]
+        median, worst = median_ms(
+            lambda: project_coverage(catalog, wallet, spending, subscriptions, months=MAX_MONTHS), args.repeats
+        )
+        print(f"{n_cards:>6} {n_subs:>6} {median:>10.3f} {worst:>10.3f}")
+
+    check_budget(median, args.budget_ms, f"{n_cards} cards")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
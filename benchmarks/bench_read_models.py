@@ -0,0 +1,102 @@
+"""
+Memory and latency benchmark for the page-view read models.
+Compares the old view pattern (ORM query with joinedload, then expunge every
+instance) against read_models.wallet_cards / tracked_subscriptions for a
+user holding a 100-card wallet.
+
+Usage: python benchmarks/bench_read_models.py [--cards 100] [--repeats 300]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy.orm import joinedload, sessionmaker  # noqa: E402
+
+from catalog import load_catalog  # noqa: E402
+from db_engine import create_db_engine  # noqa: E402
+from models import DbBase, Client, CreditCard, Subscription, UserCard, UserSubscription  # noqa: E402
+from read_models import tracked_subscriptions, wallet_cards  # noqa: E402
+
+
+def prepare(Session, n_cards, n_subs):
+    with Session() as session:
+        session.add(Client(id=1, first_name="Bench", email="bench@example.com"))
+        session.add_all(CreditCard(id=i, name=f"Card {i}", bank="Bank", points_name="Points")
+                        for i in range(1, n_cards + 1))
+        session.add_all(Subscription(id=i, name=f"Sub {i}", monthly_cost_cad=9.99)
+                        for i in range(1, n_subs + 1))
+        session.add_all(UserCard(client_id=1, credit_card_id=i, current_points=i * 10)
+                        for i in range(1, n_cards + 1))
+        session.add_all(UserSubscription(client_id=1, subscription_id=i) for i in range(1, n_subs + 1))
+        session.commit()
+
+
+def orm_view(Session, catalog):
+    with Session() as session:
+        user_cards = session.query(UserCard).options(
+            joinedload(UserCard.credit_card)
+        ).filter_by(client_id=1).all()
+        user_subs = session.query(UserSubscription).options(
+            joinedload(UserSubscription.subscription)
+        ).filter_by(client_id=1, is_active=True).all()
+        for uc in user_cards:
+            session.expunge(uc)
+        for us in user_subs:
+            session.expunge(us)
+    return user_cards, user_subs
+
+
+def read_model_view(Session, catalog):
+    with Session() as session:
+        user_cards = wallet_cards(session, catalog, 1)
+        user_subs = tracked_subscriptions(session, catalog, 1, active_only=True)
+    return user_cards, user_subs
+
+
+def measure(view, Session, catalog, repeats):
+    view(Session, catalog)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        view(Session, catalog)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    result = view(Session, catalog)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(timings), sorted(timings)[int(len(timings) * 0.95)], retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--subs", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        DbBase.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        prepare(Session, args.cards, args.subs)
+        with Session() as session:
+            catalog = load_catalog(session)
+
+        print(f"wallet of {args.cards} cards, {args.subs} subscriptions, {args.repeats} runs")
+        print(f"{'approach':<12} {'p50 ms':>8} {'p95 ms':>8} {'result KiB':>11} {'peak KiB':>9}")
+        for name, view in (("orm+expunge", orm_view), ("read model", read_model_view)):
+            p50, p95, retained, peak = measure(view, Session, catalog, args.repeats)
+            print(f"{name:<12} {p50:>8.3f} {p95:>8.3f} {retained / 1024:>11.1f} {peak / 1024:>9.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Scaling benchmark for the card recommender.
+Builds synthetic catalogs of growing size and times one recommend_cards call
+(all single-card scores plus the branch-and-bound pair search), failing if
+the median for the largest catalog exceeds the budget.
+
+Usage: python benchmarks/bench_recommender.py [--budget-ms 50]
+"""
+import numpy as np
+
+from harness import check_budget, median_ms, parse_args
+
+from recommender import recommend_cards
+from synthetic import synthetic_catalog
+
+N_CATEGORIES = 10
+
+
+def make_catalog(n_cards, rng):
+    return synthetic_catalog(
+        n_cards, N_CATEGORIES, rng, annual_fees=(0, 39, 89, 120, 139, 599), base_earn_rates=(1, 1, 1.25, 1.5),
+        point_values=(0.5, 0.7, 1, 1, 1.5, 2),
+    )
+
+
+def main():
+    args = parse_args(__doc__, budget_ms=50.0, repeats=20)
+
+    rng = np.random.default_rng(42)
+    spending = {str(c): float(rng.integers(50, 800)) for c in range(1, N_CATEGORIES + 1)}
+    print(f"{'cards':>6} {'median ms':>10} {'max ms':>10}")
+    for n_cards in (50, 500, 2000, 5000):
+        catalog = make_catalog(n_cards, rng)
+        wallet = [1, 2, 3]
+        median, worst = median_ms(lambda: recommend_cards(catalog, wallet, spending), args.repeats)
+        print(f"{n_cards:>6} {median:>10.3f} {worst:>10.3f}")
+
+    check_budget(median, args.budget_ms, f"{n_cards} cards")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark for the Monte Carlo coverage simulation.
+Times one seeded simulate_coverage call (sampling, batched scoring against the
+wallet's earn-rate sub-matrix and the coverage solver over every sample) for
+growing sample counts, failing if the median at the largest count exceeds the
+budget.
+
+Usage: python benchmarks/bench_simulation.py [--budget-ms 100]
+"""
+import numpy as np
+
+from harness import check_budget, median_ms, parse_args
+
+from simulation import MAX_SAMPLES, simulate_coverage
+from synthetic import synthetic_catalog
+
+N_CARDS = 200
+N_CATEGORIES = 10
+
+
+def make_catalog(rng):
+    return synthetic_catalog(N_CARDS, N_CATEGORIES, rng)
+
+
+def main():
+    args = parse_args(__doc__, budget_ms=100.0, repeats=10)
+
+    rng = np.random.default_rng(42)
+    catalog = make_catalog(rng)
+    wallet = rng.choice(np.arange(1, N_CARDS + 1), size=5, replace=False).tolist()
+    spending = {str(c): float(rng.integers(50, 800)) for c in range(1, N_CATEGORIES + 1)}
+    points_needed = [int(cost * 100) for cost in rng.choice([4.99, 9.99, 16.49, 22.99], size=8)]
+
+    print(f"{'samples':>8} {'distribution':>12} {'median ms':>10} {'max ms':>10}")
+    for n_samples in (1000, 10000, MAX_SAMPLES):
+        for distribution in ("lognormal", "gamma", "normal"):
+            median, worst = median_ms(
+                lambda: simulate_coverage(catalog, wallet, points_needed, spending, n_samples=n_samples,
+                                          distribution=distribution, seed=1),
+                args.repeats,
+            )
+            print(f"{n_samples:>8} {distribution:>12} {median:>10.3f} {worst:>10.3f}")
+
+            if n_samples == MAX_SAMPLES:
+                check_budget(median, args.budget_ms, f"{n_samples} samples")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Concurrency benchmark for the SQLite engine settings.
+Runs reader and writer processes (like gunicorn workers) against a fresh
+database file, once with the old bare engine (rollback journal) and once
+with db_engine.create_db_engine (WAL + pragmas), and reports throughput.
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [--readers 4] [--writers 1] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from db_engine import create_db_engine  # noqa: E402
+from models import DbBase  # noqa: E402
+
+N_CLIENTS = 1000
+CARDS_PER_CLIENT = 5
+
+
+def make_engine(mode, url):
+    if mode == "baseline":
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_db_engine(url)
+
+
+def prepare(mode, url):
+    engine = make_engine(mode, url)
+    DbBase.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            text('INSERT INTO "Client" (id, first_name, email) VALUES (:id, :name, :email)'),
+            [{"id": i, "name": f"User {i}", "email": f"user{i}@example.com"} for i in range(1, N_CLIENTS + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO user_card (client_id, credit_card_id, current_points) VALUES (:c, :card, 0)"),
+            [{"c": c, "card": k} for c in range(1, N_CLIENTS + 1) for k in range(1, CARDS_PER_CLIENT + 1)],
+        )
+    engine.dispose()
+
+
+def worker(mode, url, role, seconds, results):
+    engine = make_engine(mode, url)
+    rng = random.Random(os.getpid())
+    ops = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        client_id = rng.randint(1, N_CLIENTS)
+        try:
+            if role == "read":
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT SUM(current_points) FROM user_card WHERE client_id = :c"), {"c": client_id}
+                    ).scalar()
+            else:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("UPDATE user_card SET current_points = current_points + 1 WHERE client_id = :c"),
+                        {"c": client_id},
+                    )
+            ops += 1
+        except OperationalError:
+            errors += 1
+    results.put((role, ops, errors))
+
+
+def run(mode, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        prepare(mode, url)
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=worker, args=(mode, url, "read", seconds, results))
+                 for _ in range(readers)]
+        procs += [multiprocessing.Process(target=worker, args=(mode, url, "write", seconds, results))
+                  for _ in range(writers)]
+        for proc in procs:
+            proc.start()
+        totals = {"read": [0, 0], "write": [0, 0]}
+        for _ in procs:
+            role, ops, errors = results.get()
+            totals[role][0] += ops
+            totals[role][1] += errors
+        for proc in procs:
+            proc.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s per mode")
+    print(f"{'mode':<10} {'reads/s':>10} {'writes/s':>10} {'lock errors':>12}")
+    for mode in ("baseline", "tuned"):
+        totals = run(mode, args.readers, args.writers, args.seconds)
+        print(f"{mode:<10} {totals['read'][0] / args.seconds:>10.0f} "
+              f"{totals['write'][0] / args.seconds:>10.0f} "
+              f"{totals['read'][1] + totals['write'][1]:>12}")
+
+
+if __name__ == "__main__":
+    main()
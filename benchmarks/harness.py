@@ -0,0 +1,43 @@
+"""
+Shared timing harness for the micro-benchmarks.
+Each benchmark script parses --budget-ms/--repeats with parse_args, times its
+calls with median_ms, prints its own table and calls check_budget on the
+medians that have a budget. Importing this module also puts the repository
+root on sys.path, so scripts can import the app modules right after it.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def parse_args(doc, budget_ms, repeats):
+    """--budget-ms and --repeats with the script's defaults; doc is its module docstring."""
+    parser = argparse.ArgumentParser(description=doc.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=budget_ms)
+    parser.add_argument("--repeats", type=int, default=repeats)
+    return parser.parse_args()
+
+
+def median_ms(run, repeats, setup=None):
+    """
+    Median and worst milliseconds over repeats calls of run. With setup, each
+    call gets fresh arguments from setup(), which is not timed.
+    """
+    timings = []
+    for _ in range(repeats):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        run(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[-1]
+
+
+def check_budget(median, budget_ms, where):
+    """Print FAIL and exit 1 if median is over budget_ms."""
+    if median > budget_ms:
+        print(f"FAIL: median above {budget_ms} ms at {where}")
+        sys.exit(1)
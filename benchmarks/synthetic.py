@@ -0,0 +1,31 @@
+"""
+Synthetic catalogs for the benchmarks and tests.
+Builds an in-memory CatalogSnapshot of any size without a database, so the
+recommender, projection and simulation can be timed and checked on catalogs
+far larger than the seeded one.
+"""
+from catalog import BonusInfo, CardInfo, CatalogSnapshot, CategoryInfo
+from earn_rates import build_earn_rate_matrix
+
+
+def synthetic_catalog(n_cards, n_categories, rng, annual_fees=(0.0,), base_earn_rates=(1.0,),
+                      point_values=(1.0,), bonuses_per_card=2, inactive_every=None):
+    """
+    Random snapshot: n_cards cards whose fee, base rate and point value are
+    drawn from the given choices, each earning 2-5 points per dollar in
+    bonuses_per_card distinct categories. With inactive_every, every card
+    whose id is a multiple of it is inactive.
+    """
+    cards = tuple(
+        CardInfo(i, f"Card {i}", "Bank", float(rng.choice(annual_fees)), "Points",
+                 float(rng.choice(base_earn_rates)), float(rng.choice(point_values)), None,
+                 not (inactive_every and i % inactive_every == 0))
+        for i in range(1, n_cards + 1)
+    )
+    categories = tuple(CategoryInfo(i, f"Category {i}", None, None) for i in range(1, n_categories + 1))
+    bonuses = [
+        BonusInfo(card.id, int(category_id), float(rng.choice([2, 3, 4, 5])))
+        for card in cards
+        for category_id in rng.choice(range(1, n_categories + 1), size=bonuses_per_card, replace=False)
+    ]
+    return CatalogSnapshot(1, cards, (), categories, build_earn_rate_matrix(cards, categories, bonuses))
@@ -0,0 +1,192 @@
+"""
+Process-wide catalog cache for Deed Finance.
+Credit cards, subscriptions and spending categories only change when the seed
+or catalog tooling runs, so they are loaded once into an immutable, versioned
+snapshot and shared by every request instead of being re-queried per page.
+
+The snapshot is reloaded:
+- on first use, with concurrent misses coalesced into a single load;
+- after any commit in this process that touches a catalog table;
+- when reload_catalog() is called explicitly (e.g. after running seeds);
+- when the catalog_version row has moved past the snapshot's revision, which
+  bulk loads in any process bump (checked at most every
+  CATALOG_REVISION_CHECK_SECONDS, default 30; 0 disables the check).
+
+version counts reloads in this process only. fingerprint is a hash of the
+catalog contents, the same in every process, for results persisted in the
+database.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from itertools import chain
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session as OrmSession
+
+from models import CatalogVersion, CreditCard, Subscription, SpendingCategory, CardBonus
+from earn_rates import build_earn_rate_matrix, load_card_bonuses
+
+CardInfo = namedtuple("CardInfo", [
+    "id", "name", "bank", "annual_fee", "points_name", "base_earn_rate",
+    "point_value_cents", "image_url", "is_active",
+])
+
+SubscriptionInfo = namedtuple("SubscriptionInfo", [
+    "id", "name", "category", "monthly_cost_cad", "icon", "color", "description", "is_active",
+])
+
+CategoryInfo = namedtuple("CategoryInfo", ["id", "name", "icon", "description"])
+
+# A card_bonus row, for building earn-rate matrices without the database
+BonusInfo = namedtuple("BonusInfo", ["credit_card_id", "category_id", "earn_rate"])
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog tables at one version."""
+
+    def __init__(self, version, cards, subscriptions, categories, earn_rates, fingerprint="", revision=0):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.revision = revision
+        self.cards = cards
+        self.subscriptions = subscriptions
+        self.categories = categories
+        self.earn_rates = earn_rates
+
+        self.cards_by_id = {card.id: card for card in cards}
+        self.subscriptions_by_id = {sub.id: sub for sub in subscriptions}
+        self.active_cards = tuple(card for card in cards if card.is_active)
+        self.active_subscriptions = tuple(sub for sub in subscriptions if sub.is_active)
+
+
+def _load_rows(session, model, row_type):
+    """Query the columns named by row_type and wrap each row in it."""
+    columns = [getattr(model, field) for field in row_type._fields]
+    return tuple(row_type(*row) for row in session.query(*columns).order_by(model.id))
+
+
+def stored_catalog_revision(session):
+    """The persisted catalog_version counter, 0 before any bulk load."""
+    return session.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar() or 0
+
+
+def bump_catalog_revision(session):
+    """Increment the persisted counter in the session's transaction; returns the new value."""
+    revision = stored_catalog_revision(session) + 1
+    updated = session.execute(update(CatalogVersion).where(CatalogVersion.id == 1).values(version=revision))
+    if not updated.rowcount:
+        session.execute(insert(CatalogVersion).values(id=1, version=revision))
+    return revision
+
+
+def load_catalog(session, version=0):
+    """Read the catalog tables into a new snapshot (five queries)."""
+    revision = stored_catalog_revision(session)
+    cards = _load_rows(session, CreditCard, CardInfo)
+    subscriptions = _load_rows(session, Subscription, SubscriptionInfo)
+    categories = _load_rows(session, SpendingCategory, CategoryInfo)
+    bonuses = load_card_bonuses(session)
+    earn_rates = build_earn_rate_matrix(cards, categories, bonuses, version=version)
+    fingerprint = hashlib.sha256(
+        repr((cards, subscriptions, categories, [tuple(bonus) for bonus in bonuses])).encode("utf-8")
+    ).hexdigest()
+    return CatalogSnapshot(version, cards, subscriptions, categories, earn_rates, fingerprint, revision)
+
+
+# =============================================================================
+# Process-wide cache
+# =============================================================================
+
+REVISION_CHECK_SECONDS = float(os.environ.get("CATALOG_REVISION_CHECK_SECONDS", 30))
+
+_lock = threading.Lock()
+_snapshot = None
+_version = 0
+_check_lock = threading.Lock()
+_next_revision_check = 0.0
+
+
+def _schedule_revision_check():
+    """A snapshot just loaded is current; look at the stored revision again one interval later."""
+    global _next_revision_check
+    _next_revision_check = time.monotonic() + REVISION_CHECK_SECONDS
+
+
+def _revision_moved(session_factory, snapshot):
+    """True if another process bumped catalog_version; one thread checks per interval."""
+    if REVISION_CHECK_SECONDS <= 0 or time.monotonic() < _next_revision_check:
+        return False
+    if not _check_lock.acquire(blocking=False):
+        return False
+    try:
+        _schedule_revision_check()
+        with session_factory() as session:
+            return stored_catalog_revision(session) != snapshot.revision
+    except Exception as e:
+        print(f"Warning: Could not check catalog revision: {e}")
+        return False
+    finally:
+        _check_lock.release()
+
+
+def get_catalog(session_factory):
+    """Return the current snapshot, loading it once if missing or outdated."""
+    global _snapshot, _version
+    snapshot = _snapshot
+    if snapshot is not None and _revision_moved(session_factory, snapshot):
+        invalidate_catalog()
+        snapshot = None
+    if snapshot is None:
+        # Callers that miss together wait here and reuse the first load
+        with _lock:
+            if _snapshot is None:
+                with session_factory() as session:
+                    _snapshot = load_catalog(session, version=_version + 1)
+                _version += 1
+                _schedule_revision_check()
+            snapshot = _snapshot
+    return snapshot
+
+
+def reload_catalog(session_factory):
+    """Load a fresh snapshot now and swap it in."""
+    global _snapshot, _version
+    with _lock:
+        with session_factory() as session:
+            _snapshot = load_catalog(session, version=_version + 1)
+        _version += 1
+        _schedule_revision_check()
+        return _snapshot
+
+
+def invalidate_catalog():
+    """Drop the snapshot so the next get_catalog() reloads it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+_CATALOG_MODELS = (CreditCard, Subscription, SpendingCategory, CardBonus)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    """Remember when a flush touched the catalog tables."""
+    changed = chain(session.new, session.dirty, session.deleted)
+    if any(isinstance(obj, _CATALOG_MODELS) for obj in changed):
+        session.info["catalog_changed"] = True
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_catalog_commit(session):
+    """Invalidate the snapshot once catalog changes are committed."""
+    if session.info.pop("catalog_changed", False):
+        invalidate_catalog()
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_catalog_writes(session):
+    session.info.pop("catalog_changed", None)
@@ -0,0 +1,114 @@
+"""
+Prebuilt catalog database for Deed Finance.
+A build step writes the seed catalog (categories, cards, bonuses and
+subscriptions) into a fresh SQLite file with the full, migrated schema, then
+runs ANALYZE and VACUUM so the file ships compact and with query planner
+statistics. Rows are written by the bulk catalog loader (catalog_loader.py),
+with ids in seed order.
+
+On startup, a SQLite database file that doesn't exist yet (a new serverless
+instance's /tmp/clients.db) is created by copying the artifact, so it starts
+seeded and indexed without any seeding at request time. User tables in the
+artifact are empty and all writes go to the copy. The artifact is copied
+rather than ATTACHed because user tables have foreign keys into the catalog
+and queries join across them.
+
+Build it with:
+    python catalog_artifact.py [output path, default catalog.db]
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from catalog_loader import load_catalog_records
+from db_engine import is_memory_sqlite
+from migrations import run_migrations
+
+DEFAULT_ARTIFACT_PATH = os.environ.get(
+    "CATALOG_ARTIFACT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.db")
+)
+
+
+def build_catalog_artifact(path=DEFAULT_ARTIFACT_PATH):
+    """Write the seeded, migrated, vacuumed catalog database to path; returns rows per record type."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".db")
+    os.close(fd)
+    # A single rollback-journal file, so the artifact is self-contained
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    try:
+        run_migrations(engine)
+        # Only the build step needs the seed lists; startup just copies the file
+        from seed_data import seed_records
+
+        with Session(bind=engine) as session:
+            diff = load_catalog_records(session, seed_records())
+            session.commit()
+        counts = {kind: len(added) for kind, added in diff.added.items()}
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+            conn.execute(text("VACUUM"))
+        engine.dispose()
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        engine.dispose()
+        os.remove(tmp_path)
+        raise
+    return counts
+
+
+def sqlite_file_path(database_url):
+    """Filesystem path of a SQLite database URL, or None for other backends and :memory:."""
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or is_memory_sqlite(url):
+        return None
+    return url.database
+
+
+def install_catalog_artifact(db_path, artifact_path=DEFAULT_ARTIFACT_PATH):
+    """
+    Create db_path as a copy of the artifact if it doesn't exist yet (or is
+    an empty file). Returns True if the artifact was copied.
+    """
+    if os.path.exists(db_path) and os.path.getsize(db_path) > 0:
+        return False
+    if not os.path.exists(artifact_path):
+        print(f"Warning: No catalog artifact at {artifact_path}; run python catalog_artifact.py")
+        return False
+
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".db")
+    os.close(fd)
+    try:
+        shutil.copyfile(artifact_path, tmp_path)
+        if os.path.exists(db_path):
+            # An empty file holds no data; replace it
+            os.replace(tmp_path, db_path)
+        else:
+            try:
+                # Create-if-absent: another process installing at the same time wins cleanly
+                os.link(tmp_path, db_path)
+            except FileExistsError:
+                return False
+            except OSError:
+                # No hard links on this filesystem
+                os.replace(tmp_path, db_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ARTIFACT_PATH
+    counts = build_catalog_artifact(output)
+    for table, count in counts.items():
+        print(f"✅ {table}: {count} rows")
+    print(f"✅ Catalog artifact written to {output} ({os.path.getsize(output)} bytes)")
@@ -0,0 +1,419 @@
+"""
+Bulk catalog loader for Deed Finance.
+Applies catalog records (spending categories, credit cards, subscriptions and
+card bonuses) from data files in one transaction. The current catalog is read
+once into name-keyed maps; records are compared against them in memory and
+written as batched executemany INSERTs and UPDATEs, so a file with thousands
+of cards costs a handful of statements per batch instead of a SELECT per row.
+
+Categories, cards and subscriptions are matched by name: a new name is
+inserted, a known one has the fields present in the record updated. Bonuses
+name their card and category ({"card": ..., "category": ..., "earn_rate": ...})
+and are matched by that pair. Nothing is deleted; set is_active to retire a
+card or subscription.
+
+Files are read as a stream of (type, fields) records:
+- JSON Lines (.jsonl, .ndjson): one {"type": "card", ...} object per line.
+- JSON (.json): {"cards": [...], "bonuses": [...], ...} or a list of typed
+  objects; parsed whole, so prefer JSON Lines for very large catalogs.
+- CSV (.csv): one record type per file, named by the file (cards.csv,
+  card_bonuses.csv, subscriptions.csv, spending_categories.csv, ...).
+
+Every load returns a CatalogDiff of what changed. A load that changed
+anything bumps the persisted catalog revision in the same transaction, so
+catalog caches in every process reload (see catalog.py). Repricing a
+subscription also refreshes the user_summary rows of everyone tracking it in
+that transaction, so dashboard totals never show the old price.
+
+    python catalog_loader.py cards.csv card_bonuses.csv [--dry-run]
+"""
+import argparse
+import csv
+import json
+import os
+from itertools import chain
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from catalog import bump_catalog_revision, invalidate_catalog
+from models import CardBonus, CreditCard, SpendingCategory, Subscription
+from user_summary import refresh_subscriber_summaries
+
+BATCH_SIZE = 500
+
+# Record types matched by name, in the order pending rows are written
+NAMED_MODELS = {
+    "category": SpendingCategory,
+    "card": CreditCard,
+    "subscription": Subscription,
+}
+RECORD_TYPES = tuple(NAMED_MODELS) + ("bonus",)
+
+# JSON keys and CSV file names -> record type
+RECORD_TYPE_ALIASES = {
+    "category": "category", "categories": "category", "spending_category": "category",
+    "spending_categories": "category",
+    "card": "card", "cards": "card", "credit_card": "card", "credit_cards": "card",
+    "subscription": "subscription", "subscriptions": "subscription",
+    "bonus": "bonus", "bonuses": "bonus", "card_bonus": "bonus", "card_bonuses": "bonus",
+}
+
+TRUE_STRINGS = {"1", "true", "yes", "y", "t"}
+FALSE_STRINGS = {"0", "false", "no", "n", "f"}
+
+
+class CatalogLoadError(ValueError):
+    """A catalog file or record that can't be loaded."""
+
+
+def record_type(name):
+    """Normalize a JSON key, CSV file name or "type" field to a record type."""
+    kind = RECORD_TYPE_ALIASES.get(str(name).strip().lower())
+    if kind is None:
+        raise CatalogLoadError(f"Unknown catalog record type: {name!r}")
+    return kind
+
+
+# =============================================================================
+# Readers
+# =============================================================================
+
+def _typed(record, where):
+    if not isinstance(record, dict) or "type" not in record:
+        raise CatalogLoadError(f"{where}: expected an object with a \"type\" field")
+    fields = dict(record)
+    return record_type(fields.pop("type")), fields
+
+
+def read_catalog_file(path):
+    """Yield (record type, fields) from a .jsonl, .json or .csv catalog file."""
+    stem, suffix = os.path.splitext(os.path.basename(path))
+    suffix = suffix.lower()
+
+    if suffix in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    yield _typed(json.loads(line), f"{path}:{line_number}")
+    elif suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+        if isinstance(document, dict):
+            for key, records in document.items():
+                kind = record_type(key)
+                for fields in records:
+                    yield kind, fields
+        else:
+            for i, record in enumerate(document):
+                yield _typed(record, f"{path}[{i}]")
+    elif suffix == ".csv":
+        kind = record_type(stem)
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                yield kind, row
+    else:
+        raise CatalogLoadError(f"{path}: expected a .jsonl, .json or .csv file")
+
+
+def _coerce(column, value, where):
+    """Convert a JSON or CSV value to the column's Python type; blank is None."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    python_type = column.type.python_type
+    try:
+        if python_type is bool:
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in TRUE_STRINGS or text in FALSE_STRINGS:
+                return text in TRUE_STRINGS
+            raise ValueError(value)
+        if python_type is str:
+            return str(value).strip()
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise CatalogLoadError(f"{where}: invalid {column.name} {value!r}") from None
+
+
+# =============================================================================
+# Loader
+# =============================================================================
+
+class CatalogDiff:
+    """What a load changed, per record type. Bonuses are keyed "card / category"."""
+
+    def __init__(self):
+        self.added = {kind: [] for kind in RECORD_TYPES}
+        self.updated = {kind: {} for kind in RECORD_TYPES}  # key -> {field: (old, new)}
+        self.unchanged = {kind: 0 for kind in RECORD_TYPES}
+        self.unresolved = []  # bonuses naming a card or category that doesn't exist
+        self.revision = None
+
+    @property
+    def changed(self):
+        return any(self.added.values()) or any(self.updated.values())
+
+    def as_dict(self):
+        report = {
+            kind: {
+                "added": self.added[kind],
+                "updated": {key: {field: list(change) for field, change in fields.items()}
+                            for key, fields in self.updated[kind].items()},
+                "unchanged": self.unchanged[kind],
+            }
+            for kind in RECORD_TYPES
+        }
+        report["unresolved"] = [list(pair) for pair in self.unresolved]
+        report["revision"] = self.revision
+        return report
+
+    def summary(self):
+        """Human-readable report lines."""
+        lines = []
+        for kind in RECORD_TYPES:
+            lines.append(f"{kind}: {len(self.added[kind])} added, {len(self.updated[kind])} updated, "
+                         f"{self.unchanged[kind]} unchanged")
+            for key in self.added[kind]:
+                lines.append(f"  + {key}")
+            for key, fields in self.updated[kind].items():
+                changes = ", ".join(f"{field} {old!r} -> {new!r}" for field, (old, new) in fields.items())
+                lines.append(f"  ~ {key}: {changes}")
+        for card, category in self.unresolved:
+            lines.append(f"unresolved bonus: {card} / {category}")
+        return lines
+
+
+class CatalogLoader:
+    """Applies records to the catalog tables in the session's transaction."""
+
+    def __init__(self, session, batch_size=BATCH_SIZE):
+        self.session = session
+        self.batch_size = batch_size
+        self.diff = CatalogDiff()
+
+        # Current rows by name; the lowest id wins if a name is duplicated
+        self._rows = {}
+        for kind, model in NAMED_MODELS.items():
+            table = model.__table__
+            rows = self._rows[kind] = {}
+            for row in session.execute(select(table).order_by(table.c.id)).mappings():
+                rows.setdefault(row["name"], dict(row))
+
+        bonus_table = CardBonus.__table__
+        self._bonuses = {}
+        for row in session.execute(select(bonus_table).order_by(bonus_table.c.id)).mappings():
+            self._bonuses.setdefault((row["credit_card_id"], row["category_id"]), dict(row))
+
+        self._pending = {kind: {} for kind in RECORD_TYPES}
+        # Ids of subscriptions whose monthly_cost_cad changed
+        self._repriced = set()
+
+    def add(self, kind, fields, where=""):
+        """Queue one record; full batches are written as they fill."""
+        if kind == "bonus":
+            key, values = self._bonus_fields(fields, where)
+        else:
+            key, values = self._named_fields(kind, fields, where)
+        pending = self._pending[kind]
+        pending[key] = {**pending.get(key, {}), **values}
+        if len(pending) >= self.batch_size:
+            self.flush(kind)
+
+    def finish(self):
+        """
+        Write everything still queued, refresh the summaries of repriced
+        subscriptions' users and bump the revision if anything changed.
+        """
+        for kind in RECORD_TYPES:
+            self.flush(kind)
+        if self._repriced:
+            refresh_subscriber_summaries(self.session, sorted(self._repriced))
+        if self.diff.changed:
+            self.diff.revision = bump_catalog_revision(self.session)
+        return self.diff
+
+    def flush(self, kind):
+        if kind == "bonus":
+            # Bonuses resolve names, so queued cards and categories go first
+            self.flush("category")
+            self.flush("card")
+            self._flush_bonuses()
+        else:
+            self._flush_named(kind)
+
+    def _named_fields(self, kind, fields, where):
+        table = NAMED_MODELS[kind].__table__
+        values = {}
+        for name, value in fields.items():
+            if name == "id":
+                continue
+            if name not in table.c:
+                raise CatalogLoadError(f"{where}: unknown {kind} field {name!r}")
+            values[name] = _coerce(table.c[name], value, where)
+        if not values.get("name"):
+            raise CatalogLoadError(f"{where}: {kind} needs a name")
+        return values["name"], values
+
+    def _bonus_fields(self, fields, where):
+        card = (fields.get("card") or "").strip()
+        category = (fields.get("category") or "").strip()
+        if not card or not category:
+            raise CatalogLoadError(f"{where}: bonus needs a card and a category")
+        earn_rate = _coerce(CardBonus.__table__.c.earn_rate, fields.get("earn_rate"), where)
+        if earn_rate is None:
+            raise CatalogLoadError(f"{where}: bonus needs an earn_rate")
+        return (card, category), {"earn_rate": earn_rate}
+
+    def _write(self, table, inserts, updates):
+        """One executemany INSERT and one executemany UPDATE (by id) for a batch."""
+        if inserts:
+            columns = [column for column in table.c if column.name != "id"]
+            defaults = {
+                column.name: column.default.arg if column.default is not None and column.default.is_scalar else None
+                for column in columns
+            }
+            self.session.execute(insert(table), [{**defaults, **values} for values in inserts])
+        if updates:
+            fields = [name for name in updates[0] if name != "id"]
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("_id"))
+                .values({name: bindparam(f"_{name}") for name in fields})
+            )
+            self.session.execute(stmt, [
+                {"_id": values["id"], **{f"_{name}": values[name] for name in fields}} for values in updates
+            ])
+
+    def _changes(self, current, values):
+        return {name: (current[name], value) for name, value in values.items() if current[name] != value}
+
+    def _flush_named(self, kind):
+        pending = self._pending[kind]
+        if not pending:
+            return
+        table = NAMED_MODELS[kind].__table__
+        rows = self._rows[kind]
+        inserts, updates = [], []
+        required = [
+            column.name for column in table.c
+            if not column.nullable and column.default is None and not column.primary_key
+        ]
+        for name, values in pending.items():
+            current = rows.get(name)
+            if current is None:
+                missing = [column for column in required if values.get(column) is None]
+                if missing:
+                    raise CatalogLoadError(f"New {kind} {name!r} needs {', '.join(missing)}")
+                inserts.append(values)
+                self.diff.added[kind].append(name)
+                continue
+            changes = self._changes(current, values)
+            if changes:
+                current.update(values)
+                updates.append(dict(current))
+                self.diff.updated[kind].setdefault(name, {}).update(changes)
+                if kind == "subscription" and "monthly_cost_cad" in changes:
+                    self._repriced.add(current["id"])
+            else:
+                self.diff.unchanged[kind] += 1
+        pending.clear()
+
+        self._write(table, inserts, updates)
+        if inserts:
+            # Pick up the new ids so later bonuses can resolve these names
+            names = [values["name"] for values in inserts]
+            for row in self.session.execute(
+                select(table).where(table.c.name.in_(names)).order_by(table.c.id)
+            ).mappings():
+                rows.setdefault(row["name"], dict(row))
+
+    def _flush_bonuses(self):
+        pending = self._pending["bonus"]
+        if not pending:
+            return
+        table = CardBonus.__table__
+        cards, categories = self._rows["card"], self._rows["category"]
+        inserts, updates = [], []
+        for (card, category), values in pending.items():
+            if card not in cards or category not in categories:
+                self.diff.unresolved.append((card, category))
+                continue
+            key = (cards[card]["id"], categories[category]["id"])
+            label = f"{card} / {category}"
+            current = self._bonuses.get(key)
+            if current is None:
+                row = {"credit_card_id": key[0], "category_id": key[1], **values}
+                inserts.append(row)
+                self._bonuses[key] = row
+                self.diff.added["bonus"].append(label)
+                continue
+            changes = self._changes(current, values)
+            if changes:
+                current.update(values)
+                updates.append(dict(current))
+                self.diff.updated["bonus"].setdefault(label, {}).update(changes)
+            else:
+                self.diff.unchanged["bonus"] += 1
+        pending.clear()
+
+        self._write(table, inserts, updates)
+        if inserts:
+            # Pick up the new ids so a later batch can update these pairs
+            card_ids = sorted({row["credit_card_id"] for row in inserts})
+            for row in self.session.execute(
+                select(table).where(table.c.credit_card_id.in_(card_ids)).order_by(table.c.id)
+            ).mappings():
+                key = (row["credit_card_id"], row["category_id"])
+                if "id" not in self._bonuses[key]:
+                    self._bonuses[key] = dict(row)
+
+
+def load_catalog_records(session, records, batch_size=BATCH_SIZE):
+    """
+    Apply (record type, fields) pairs in the session's transaction and return
+    the CatalogDiff. The caller commits (and then calls invalidate_catalog()).
+    """
+    loader = CatalogLoader(session, batch_size=batch_size)
+    for i, (kind, fields) in enumerate(records, start=1):
+        loader.add(record_type(kind), fields, where=f"record {i}")
+    return loader.finish()
+
+
+def load_catalog_files(session_factory, paths, dry_run=False, batch_size=BATCH_SIZE):
+    """Load catalog files in one transaction; rolled back instead of committed on dry_run."""
+    with session_factory() as session:
+        records = chain.from_iterable(read_catalog_file(path) for path in paths)
+        diff = load_catalog_records(session, records, batch_size=batch_size)
+        if dry_run:
+            session.rollback()
+            return diff
+        session.commit()
+    if diff.changed:
+        invalidate_catalog()
+    return diff
+
+
+if __name__ == "__main__":
+    from db_engine import create_db_engine
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Bulk-load catalog data files into the database.")
+    parser.add_argument("paths", nargs="+", help=".jsonl, .json or .csv catalog files")
+    parser.add_argument("--dry-run", action="store_true", help="report the diff without committing")
+    parser.add_argument("--json", action="store_true", help="print the diff as JSON")
+    args = parser.parse_args()
+
+    engine = create_db_engine(os.environ.get("DATABASE_URL", "sqlite:///clients.db"))
+    run_migrations(engine)
+    diff = load_catalog_files(sessionmaker(bind=engine), args.paths, dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(diff.as_dict(), indent=2))
+    else:
+        print("\n".join(diff.summary()))
+        if args.dry_run:
+            print("Dry run: nothing was committed")
+        elif diff.changed:
+            print(f"✅ Catalog revision is now {diff.revision}")
+        else:
+            print("✅ Catalog is already up to date")
@@ -0,0 +1,129 @@
+"""
+Subscription coverage solver for the spending advisor.
+Picks which tracked subscriptions to pay for with earned points so that the
+most dollars are covered, instead of taking them greedily in database order.
+
+Points needed for a subscription are proportional to its cost, so maximizing
+dollars covered is a bounded knapsack where value equals weight. It is solved
+exactly with a pseudo-polynomial DP over point totals, using Python ints as
+bitsets of reachable totals.
+"""
+import numpy as np
+
+
+class CoverageSolver:
+    """Exact coverage solver for one fixed list of subscription point costs."""
+
+    def __init__(self, points_needed):
+        self.points_needed = [int(p) for p in points_needed]
+        self.total = sum(p for p in self.points_needed if p > 0)
+        self._free = [i for i, p in enumerate(self.points_needed) if p <= 0]
+
+        # Identical costs form one bounded item; split counts into 1, 2, 4, ... chunks
+        groups = {}
+        for i, p in enumerate(self.points_needed):
+            if p > 0:
+                groups.setdefault(p, []).append(i)
+        self._groups = groups
+        self._parts = []
+        for weight, items in groups.items():
+            remaining, chunk = len(items), 1
+            while remaining > 0:
+                take = min(chunk, remaining)
+                self._parts.append((weight, take))
+                remaining -= take
+                chunk *= 2
+
+        self._min_weight = min(groups, default=0)
+        self._stages = None
+        self._reachable = None
+        self._choices = {}
+
+    def _build(self):
+        """Run the DP once: stage i holds the totals reachable with the first i parts."""
+        reach = 1
+        stages = [reach]
+        for weight, count in self._parts:
+            reach |= reach << (weight * count)
+            stages.append(reach)
+        self._stages = stages
+
+    def _best_total(self, points_available):
+        """Largest reachable total that fits in points_available."""
+        if self._stages is None:
+            self._build()
+        mask = (1 << (points_available + 1)) - 1
+        return (self._stages[-1] & mask).bit_length() - 1
+
+    def _choose(self, target):
+        """Walk the DP stages backwards to recover a set summing to target."""
+        chosen = self._choices.get(target)
+        if chosen is not None:
+            return chosen
+
+        taken = {}
+        remaining = target
+        for i in range(len(self._parts) - 1, -1, -1):
+            if (self._stages[i] >> remaining) & 1:
+                continue
+            weight, count = self._parts[i]
+            taken[weight] = taken.get(weight, 0) + count
+            remaining -= weight * count
+
+        flags = [False] * len(self.points_needed)
+        for i in self._free:
+            flags[i] = True
+        for weight, count in taken.items():
+            for i in self._groups[weight][:count]:
+                flags[i] = True
+        chosen = tuple(flags)
+        self._choices[target] = chosen
+        return chosen
+
+    def solve(self, points_available):
+        """Return one can-cover flag per subscription, maximizing points spent."""
+        points_available = int(points_available)
+        n = len(self.points_needed)
+
+        # Fast paths: nothing paid fits, or everything fits
+        if points_available < self._min_weight:
+            return tuple(i in self._free for i in range(n))
+        if points_available >= self.total:
+            return (True,) * n
+
+        return self._choose(self._best_total(points_available))
+
+    def solve_many(self, points_available):
+        """Vectorized solve over an array of point totals; returns an N x S bool matrix."""
+        points_available = np.asarray(points_available, dtype=np.int64)
+        n = len(self.points_needed)
+        if n == 0:
+            return np.zeros((points_available.size, n), dtype=bool)
+
+        if self._reachable is None:
+            if self._stages is None:
+                self._build()
+            reach = self._stages[-1]
+            bits = np.unpackbits(
+                np.frombuffer(reach.to_bytes((reach.bit_length() + 7) // 8, "little"), dtype=np.uint8),
+                bitorder="little",
+            )
+            self._reachable = np.flatnonzero(bits)
+
+        # Best reachable total per row is a sorted-array lookup
+        best_idx = np.searchsorted(self._reachable, points_available, side="right") - 1
+        best_totals = self._reachable[np.maximum(best_idx, 0)]
+        best_totals = np.where(best_idx >= 0, best_totals, -1)
+
+        # One DP walk per distinct total, then a gather back to the rows
+        targets, inverse = np.unique(best_totals, return_inverse=True)
+        nothing = tuple(i in self._free for i in range(n))
+        choices = np.array(
+            [nothing if target < 0 else self._choose(target) for target in targets.tolist()], dtype=bool
+        ).reshape(len(targets), n)
+        return choices[inverse.reshape(-1)]
+
+
+def solve_coverage(points_available, points_needed):
+    """Convenience wrapper: can-cover flags for a single points total."""
+    return list(CoverageSolver(points_needed).solve(points_available))
@@ -0,0 +1,115 @@
+"""
+Engine factory for Deed Finance.
+Picks pooling per database backend and, for SQLite files, applies WAL mode and
+related pragmas on every new connection so concurrent readers under gunicorn
+don't queue behind writers.
+
+Every setting can be overridden from the environment:
+
+| Variable                 | Applies to | Default            |
+|--------------------------|------------|--------------------|
+| DB_POOL_SIZE             | all        | 5                  |
+| DB_MAX_OVERFLOW          | all        | 10                 |
+| DB_POOL_RECYCLE          | non-SQLite | 1800 seconds       |
+| DB_ECHO                  | all        | false              |
+| SQLITE_JOURNAL_MODE      | SQLite     | WAL                |
+| SQLITE_SYNCHRONOUS       | SQLite     | NORMAL             |
+| SQLITE_BUSY_TIMEOUT_MS   | SQLite     | 5000               |
+| SQLITE_MMAP_SIZE         | SQLite     | 268435456 (256 MB) |
+| SQLITE_CACHE_SIZE        | SQLite     | -65536 (64 MB)     |
+"""
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+
+_UPSERT_DIALECTS = {"sqlite": sqlite, "postgresql": postgresql}
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _env_int(environ, name, default):
+    return int(environ.get(name, default))
+
+
+def is_memory_sqlite(url):
+    """True for SQLite URLs that point at an in-memory database."""
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def sqlite_pragmas(environ=None):
+    """Pragmas to run on each new SQLite connection, in order."""
+    environ = os.environ if environ is None else environ
+
+    journal_mode = environ.get("SQLITE_JOURNAL_MODE", "WAL").upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {journal_mode}")
+    synchronous = environ.get("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {synchronous}")
+
+    return [
+        ("busy_timeout", _env_int(environ, "SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        ("journal_mode", journal_mode),
+        ("synchronous", synchronous),
+        ("mmap_size", _env_int(environ, "SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        ("cache_size", _env_int(environ, "SQLITE_CACHE_SIZE", -64 * 1024)),
+    ]
+
+
+def engine_options(url, environ=None):
+    """create_engine() keyword arguments for a database URL."""
+    environ = os.environ if environ is None else environ
+    url = make_url(url)
+    options = {"echo": environ.get("DB_ECHO", "false").lower() == "true"}
+
+    if url.get_backend_name() == "sqlite":
+        # Connections are shared across Flask's worker threads
+        options["connect_args"] = {"check_same_thread": False}
+        if is_memory_sqlite(url):
+            # One connection, or every checkout would see a fresh empty database
+            options["poolclass"] = StaticPool
+            return options
+        options["connect_args"]["timeout"] = _env_int(environ, "SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000
+    else:
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = _env_int(environ, "DB_POOL_RECYCLE", 1800)
+
+    options["poolclass"] = QueuePool
+    options["pool_size"] = _env_int(environ, "DB_POOL_SIZE", 5)
+    options["max_overflow"] = _env_int(environ, "DB_MAX_OVERFLOW", 10)
+    return options
+
+
+def create_db_engine(database_url, environ=None, **overrides):
+    """Build an engine tuned for its backend; keyword overrides win."""
+    url = make_url(database_url)
+    options = engine_options(url, environ)
+    options.update(overrides)
+    engine = create_engine(url, **options)
+
+    if url.get_backend_name() == "sqlite" and not is_memory_sqlite(url):
+        pragmas = sqlite_pragmas(environ)
+
+        @event.listens_for(engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas:
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    return engine
+
+
+def upsert_insert(bind):
+    """
+    The dialect insert() construct that supports ON CONFLICT for bind's
+    backend (SQLite, PostgreSQL), or None if the backend has none.
+    """
+    dialect = _UPSERT_DIALECTS.get(bind.dialect.name)
+    return dialect.insert if dialect is not None else None
@@ -0,0 +1,106 @@
+"""
+Card x category earn-rate matrix for the spending advisor.
+Built once per catalog snapshot (see catalog.py) so the advisor can pick the
+best card for a category with array lookups instead of querying CardBonus per
+card.
+"""
+import numpy as np
+
+from models import CardBonus
+
+
+class EarnRateMatrix:
+    """
+    Dense earn rates indexed by [credit_card.id, spending_category.id].
+    Cells without a CardBonus hold the card's base_earn_rate.
+    """
+
+    def __init__(self, rates, card_names, category_names, version=0):
+        self.rates = rates
+        self.card_names = card_names
+        self.category_names = category_names
+        self.version = version
+
+    def has_category(self, category_id):
+        """Check whether a spending category exists in the catalog."""
+        return category_id in self.category_names
+
+    def wallet_card_ids(self, card_ids):
+        """Keep only the card ids that exist in the catalog, preserving order."""
+        return np.array([cid for cid in card_ids if cid in self.card_names], dtype=np.intp)
+
+    def best_card(self, card_ids, category_id):
+        """
+        Return (card_id, rate) of the best earning card for a category.
+        Ties go to the earliest card in card_ids; (None, 0.0) if nothing earns.
+        """
+        wallet = self.wallet_card_ids(card_ids)
+        if wallet.size == 0:
+            return None, 0.0
+
+        column = self.rates[wallet, category_id]
+        best = int(np.argmax(column))
+        if column[best] <= 0:
+            return None, 0.0
+        return int(wallet[best]), float(column[best])
+
+    def score_scenarios(self, card_ids, category_ids, spending):
+        """
+        Score an N x C spending matrix against a wallet in one pass.
+        Columns follow category_ids; unknown categories and non-positive
+        amounts earn nothing. Returns (best_card_ids, best_rates, points)
+        where the first two are per category (-1 / 0.0 when nothing earns)
+        and points is an N x C integer matrix.
+        """
+        wallet = self.wallet_card_ids(card_ids)
+        categories = np.asarray(category_ids, dtype=np.intp)
+        known = np.array([self.has_category(int(c)) for c in categories], dtype=bool)
+
+        best_cards = np.full(categories.size, -1, dtype=np.int64)
+        best_rates = np.zeros(categories.size, dtype=np.float64)
+        if wallet.size and known.any():
+            sub_matrix = self.rates[np.ix_(wallet, categories[known])]
+            best_idx = np.argmax(sub_matrix, axis=0)
+            rates = sub_matrix[best_idx, np.arange(best_idx.size)]
+            earning = rates > 0
+            best_cards[known] = np.where(earning, wallet[best_idx], -1)
+            best_rates[known] = np.where(earning, rates, 0.0)
+
+        amounts = np.where(spending > 0, spending, 0.0)
+        points = np.floor(amounts * best_rates).astype(np.int64)
+        return best_cards, best_rates, points
+
+
+def build_earn_rate_matrix(cards, categories, bonuses, version=0):
+    """
+    Build the matrix from catalog rows. cards need id, name and
+    base_earn_rate; categories need id and name; bonuses need
+    credit_card_id, category_id and earn_rate.
+    """
+    n_cards = max((c.id for c in cards), default=0) + 1
+    n_categories = max((c.id for c in categories), default=0) + 1
+    rates = np.zeros((n_cards, n_categories), dtype=np.float64)
+
+    for card in cards:
+        rates[card.id, :] = card.base_earn_rate or 0.0
+    for bonus in bonuses:
+        if bonus.credit_card_id < n_cards and bonus.category_id < n_categories:
+            rates[bonus.credit_card_id, bonus.category_id] = bonus.earn_rate
+
+    rates.setflags(write=False)
+    return EarnRateMatrix(
+        rates=rates,
+        card_names={c.id: c.name for c in cards},
+        category_names={c.id: c.name for c in categories},
+        version=version,
+    )
+
+
+def load_card_bonuses(session):
+    """
+    Load bonus rows for build_earn_rate_matrix. Descending id so the
+    lowest-id bonus wins when a card/category pair is duplicated.
+    """
+    return session.query(
+        CardBonus.credit_card_id, CardBonus.category_id, CardBonus.earn_rate
+    ).order_by(CardBonus.id.desc()).all()
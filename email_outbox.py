@@ -0,0 +1,231 @@
+"""
+Asynchronous email outbox for Deed Finance.
+Request handlers only insert an email_outbox row, in the same transaction as
+the change that triggers the email. A small pool of background workers drains
+due rows in batches, reuses one SMTP connection per batch and retries failed
+sends with exponential backoff.
+
+Delivery can also run in its own process:
+    python email_outbox.py
+
+On serverless hosts (EMAIL_DELIVER_ON_RESPONSE, on by default on Vercel) there
+are no background workers: the request that queued an email drains one batch
+when its response closes, before the invocation ends.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask_mail import Message
+from sqlalchemy import select, update
+
+from email_utils import VERIFICATION_SUBJECT, render_verification_email, print_email
+from models import EmailOutbox
+
+MAX_ATTEMPTS = 5
+# How long a claimed row stays reserved for the worker that claimed it
+LEASE_SECONDS = 120
+
+
+def enqueue_email(session, recipient, subject, text_body, html_body=None):
+    """Add an email to the outbox; delivered after the caller commits."""
+    email = EmailOutbox(recipient=recipient, subject=subject, text_body=text_body, html_body=html_body)
+    session.add(email)
+    return email
+
+
+def enqueue_verification_email(session, email, code, first_name):
+    """Queue the 6-digit verification code email."""
+    text, html = render_verification_email(code, first_name)
+    return enqueue_email(session, email, VERIFICATION_SUBJECT, text, html)
+
+
+def retry_delay(attempts, base_seconds=30, max_seconds=3600):
+    """Backoff before the next try: 30s, 60s, 120s, ... capped at an hour."""
+    return timedelta(seconds=min(max_seconds, base_seconds * 2 ** max(attempts - 1, 0)))
+
+
+# =============================================================================
+# Transports
+# =============================================================================
+
+class ConsoleTransport:
+    """Dev mode delivery: print emails instead of sending them."""
+
+    @contextmanager
+    def connect(self):
+        yield lambda email: print_email(email.recipient, email.subject, email.text_body)
+
+
+class FlaskMailTransport:
+    """SMTP delivery through Flask-Mail, one connection per batch."""
+
+    def __init__(self, app, mail):
+        self.app = app
+        self.mail = mail
+
+    @contextmanager
+    def connect(self):
+        with self.app.app_context():
+            sender = self.app.config.get("MAIL_DEFAULT_SENDER", "noreply@deed.com")
+            with self.mail.connect() as conn:
+                def send(email):
+                    msg = Message(subject=email.subject, sender=sender, recipients=[email.recipient])
+                    msg.body = email.text_body
+                    msg.html = email.html_body
+                    conn.send(msg)
+                yield send
+
+
+# =============================================================================
+# Workers
+# =============================================================================
+
+class OutboxWorker:
+    """Claims due outbox rows and delivers them through a transport."""
+
+    def __init__(self, session_factory, transport, batch_size=50, max_attempts=MAX_ATTEMPTS,
+                 clock=datetime.utcnow):
+        self.session_factory = session_factory
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    def claim_batch(self):
+        """Reserve up to batch_size due rows; safe with several workers and processes."""
+        now = self.clock()
+        due = (EmailOutbox.status == "pending") & (EmailOutbox.next_attempt_at <= now)
+        with self.session_factory() as session:
+            ids = session.execute(
+                select(EmailOutbox.id).where(due)
+                .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                .limit(self.batch_size)
+            ).scalars().all()
+
+            # A row belongs to whichever worker's conditional update hits it first
+            claimed = []
+            for email_id in ids:
+                result = session.execute(
+                    update(EmailOutbox).where(EmailOutbox.id == email_id, due)
+                    .values(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+                )
+                if result.rowcount == 1:
+                    claimed.append(email_id)
+            session.commit()
+
+            if not claimed:
+                return []
+            return session.execute(
+                select(EmailOutbox.id, EmailOutbox.recipient, EmailOutbox.subject,
+                       EmailOutbox.text_body, EmailOutbox.html_body, EmailOutbox.attempts)
+                .where(EmailOutbox.id.in_(claimed)).order_by(EmailOutbox.id)
+            ).all()
+
+    def deliver(self, emails):
+        """Send a batch over one connection; returns {id: error or None}."""
+        outcome = {}
+        try:
+            with self.transport.connect() as send:
+                for email in emails:
+                    try:
+                        send(email)
+                        outcome[email.id] = None
+                    except Exception as e:
+                        outcome[email.id] = e
+        except Exception as e:
+            # Connecting (or closing) failed: everything not yet sent is retried
+            for email in emails:
+                outcome.setdefault(email.id, e)
+        return outcome
+
+    def record(self, emails, outcome):
+        """Mark sent rows and schedule retries for the failures."""
+        now = self.clock()
+        with self.session_factory() as session:
+            for email in emails:
+                attempts = email.attempts + 1
+                error = outcome.get(email.id)
+                if error is None:
+                    values = {"status": "sent", "sent_at": now, "attempts": attempts, "last_error": None}
+                elif attempts >= self.max_attempts:
+                    values = {"status": "failed", "attempts": attempts, "last_error": str(error)[:500]}
+                else:
+                    values = {"attempts": attempts, "last_error": str(error)[:500],
+                              "next_attempt_at": now + retry_delay(attempts)}
+                session.execute(update(EmailOutbox).where(EmailOutbox.id == email.id).values(**values))
+            session.commit()
+
+    def drain_once(self):
+        """Claim, deliver and record one batch; returns how many were handled."""
+        emails = self.claim_batch()
+        if emails:
+            self.record(emails, self.deliver(emails))
+        return len(emails)
+
+
+class OutboxWorkerPool:
+    """Background threads running an OutboxWorker until stopped."""
+
+    def __init__(self, worker, size=1, poll_interval=5.0):
+        self.worker = worker
+        self.size = size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads if they aren't running yet."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.size):
+                thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def notify(self):
+        """Wake the workers after new rows were committed, starting them if needed."""
+        self.start()
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """Ask the workers to exit and wait for them."""
+        with self._lock:
+            self._stop.set()
+            self._wake.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                handled = self.worker.drain_once()
+            except Exception as e:
+                print(f"Email outbox worker error: {e}")
+                handled = 0
+            # A full batch means more may be waiting; otherwise sleep until woken
+            if handled < self.worker.batch_size:
+                self._wake.wait(self.poll_interval)
+
+
+if __name__ == "__main__":
+    from app import Session, database, email_transport
+
+    database()
+    pool = OutboxWorkerPool(
+        OutboxWorker(Session, email_transport()),
+        size=int(os.environ.get("EMAIL_WORKERS", 1)),
+    )
+    pool.start()
+    print(f"📧 Delivering outbox emails with {pool.size} worker(s), Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pool.stop()
@@ -27,32 +27,17 @@ def get_code_expiry():
     return datetime.utcnow() + timedelta(minutes=10)
 
 
-def send_verification_email(email, code, first_name):
-    """
-    Send verification email with 6-digit code.
-    In DEV_MODE, prints to console instead of sending email.
-    """
-    if DEV_MODE:
-        print("\n" + "=" * 50)
-        print("📧 VERIFICATION EMAIL (Dev Mode)")
-        print("=" * 50)
-        print(f"To: {email}")
-        print(f"Subject: Verify your Deed account")
-        print("-" * 50)
-        print(f"Hi {first_name},")
-        print(f"\nYour verification code is: {code}")
-        print(f"\nThis code expires in 10 minutes.")
-        print("=" * 50 + "\n")
-        return True
-    
-    # Production email sending
-    try:
-        msg = Message(
-            subject="Verify your Deed account",
-            sender=current_app.config.get('MAIL_DEFAULT_SENDER', 'noreply@deed.com'),
-            recipients=[email]
-        )
-        msg.html = f"""
+VERIFICATION_SUBJECT = "Verify your Deed account"
+
+
+def render_verification_email(code, first_name):
+    """Build the (text, html) bodies of the verification email."""
+    text = (
+        f"Hi {first_name},\n\n"
+        f"Your verification code is: {code}\n\n"
+        f"This code expires in 10 minutes.\n"
+    )
+    html = f"""
         <div style="font-family: Arial, sans-serif; max-width: 500px; margin: 0 auto; padding: 20px;">
             <h2 style="color: #667eea;">Welcome to Deed!</h2>
             <p>Hi {first_name},</p>
@@ -74,6 +59,41 @@ def send_verification_email(email, code, first_name):
             </p>
         </div>
         """
+    return text, html
+
+
+def print_email(recipient, subject, text):
+    """Print an email to the console (dev mode delivery)."""
+    print("\n" + "=" * 50)
+    print("📧 EMAIL (Dev Mode)")
+    print("=" * 50)
+    print(f"To: {recipient}")
+    print(f"Subject: {subject}")
+    print("-" * 50)
+    print(text)
+    print("=" * 50 + "\n")
+
+
+def send_verification_email(email, code, first_name):
+    """
+    Send verification email with 6-digit code.
+    In DEV_MODE, prints to console instead of sending email.
+    Request handlers queue emails through email_outbox instead of calling this.
+    """
+    text, html = render_verification_email(code, first_name)
+    if DEV_MODE:
+        print_email(email, VERIFICATION_SUBJECT, text)
+        return True
+    
+    # Production email sending
+    try:
+        msg = Message(
+            subject=VERIFICATION_SUBJECT,
+            sender=current_app.config.get('MAIL_DEFAULT_SENDER', 'noreply@deed.com'),
+            recipients=[email]
+        )
+        msg.body = text
+        msg.html = html
         mail.send(msg)
         return True
     except Exception as e:
@@ -0,0 +1,253 @@
+"""
+Compiled merchant-to-category index.
+Statement descriptions ("SOBEYS #1234 HALIFAX", "UBER *TRIP") are matched
+against the merchant keyword dictionary with an Aho-Corasick automaton
+compiled into a dense transition table. A batch of descriptions is classified
+column by column with NumPy, one table lookup per character for the whole
+batch, instead of a substring loop per transaction.
+
+The automaton is indexed directly by ASCII code (case folded, anything
+non-ASCII treated as DEL), plus one extra column for start-of-text.
+
+The compiled arrays are saved as .npy files keyed by a hash of the
+dictionary and memory-mapped on later loads, so every process shares one
+copy from the page cache. The cache directory is MERCHANT_INDEX_DIR (default
+a "deed-merchant-index" folder in the system temp dir).
+
+Rules are tried in dictionary order: a description gets the category of the
+first keyword it contains, like the old substring loop. A leading "^"
+anchors a keyword to the start of the description. A known MCC code wins
+over any keyword.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import deque
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Merchant names come first; anything after this many characters is ignored
+MAX_DESCRIPTION_CHARS = 64
+CHUNK_SIZE = 32768
+
+# Character classes while compiling: 0 for characters no keyword uses, 1 for start-of-text
+OTHER_CLASS = 0
+START_CLASS = 1
+# Columns of the compiled table: ASCII codes 0-127, then start-of-text
+START_COLUMN = 128
+N_COLUMNS = 129
+
+# Category name -> keywords, in priority order
+MERCHANT_KEYWORDS = (
+    ("Groceries", ("grocery", "loblaws", "sobeys", "metro", "no frills", "safeway", "freshco",
+                   "food basics", "superstore", "farm boy", "t&t")),
+    ("Gas", ("esso", "petro-canada", "petro canada", "shell", "husky", "ultramar", "pioneer",
+             "chevron", "gas station", "fuel")),
+    ("Dining", ("restaurant", "tim hortons", "starbucks", "mcdonald", "uber eats", "ubereats",
+                "doordash", "skip the dishes", "skipthedishes", "cafe", "pizza", "sushi", "a&w")),
+    ("Travel", ("air canada", "westjet", "porter", "hotel", "marriott", "hilton", "airbnb",
+                "expedia", "booking.com", "enterprise rent", "avis", "hertz")),
+    ("Transit", ("^uber *trip", "^lyft *ride", "presto", "translink", "go transit", "via rail",
+                 "uber", "lyft")),
+    ("Recurring Bills", ("rogers", "bell canada", "telus", "fido", "koodo", "hydro", "enbridge",
+                         "netflix", "spotify", "disney plus", "crave", "insurance")),
+    ("Drug Stores", ("shoppers drug", "pharmacy", "rexall", "jean coutu", "london drugs", "pharmaprix")),
+    ("Entertainment", ("cineplex", "ticketmaster", "theatre", "concert", "steam", "playstation", "xbox")),
+    ("Online Shopping", ("amazon", "amzn", "ebay", "etsy", "shopify", "aliexpress", "best buy")),
+)
+
+# Merchant category code ranges (inclusive) -> category name
+MCC_CATEGORIES = (
+    (5411, 5411, "Groceries"),
+    (5422, 5422, "Groceries"),
+    (5499, 5499, "Groceries"),
+    (5541, 5542, "Gas"),
+    (5811, 5814, "Dining"),
+    (3000, 3299, "Travel"),
+    (3351, 3441, "Travel"),
+    (3501, 3999, "Travel"),
+    (4511, 4511, "Travel"),
+    (7011, 7011, "Travel"),
+    (7512, 7512, "Travel"),
+    (4111, 4131, "Transit"),
+    (4121, 4121, "Transit"),
+    (4812, 4814, "Recurring Bills"),
+    (4899, 4900, "Recurring Bills"),
+    (5912, 5912, "Drug Stores"),
+    (7832, 7832, "Entertainment"),
+    (7922, 7922, "Entertainment"),
+    (7996, 7999, "Entertainment"),
+    (5964, 5964, "Online Shopping"),
+)
+
+
+def flatten_rules(keywords=MERCHANT_KEYWORDS):
+    """[(keyword, category name)] in priority order."""
+    return [(keyword.lower(), name) for name, words in keywords for keyword in words]
+
+
+def _char_classes(rules):
+    """128-entry ASCII table: case-folded keyword characters get their own class."""
+    alphabet = sorted({ch for keyword, _ in rules for ch in keyword.lstrip("^")})
+    if any(ord(ch) >= 128 for ch in alphabet):
+        raise ValueError("Merchant keywords must be ASCII")
+    table = np.full(128, OTHER_CLASS, dtype=np.int32)
+    for cls, ch in enumerate(alphabet, start=START_CLASS + 1):
+        table[ord(ch)] = cls
+        table[ord(ch.upper())] = cls
+    return table, len(alphabet) + 2
+
+
+def compile_automaton(rules):
+    """
+    Build the dense Aho-Corasick automaton for rules. Returns
+    (transitions[state, column], outputs[state]) where outputs holds the
+    lowest rule index ending at a state, or len(rules) for none.
+    """
+    char_classes, n_classes = _char_classes(rules)
+    no_match = len(rules)
+
+    # Trie: one dict of class -> child per state
+    children = [{}]
+    outputs = [no_match]
+    for priority, (keyword, _) in enumerate(rules):
+        path = [START_CLASS] if keyword.startswith("^") else []
+        path += [int(char_classes[ord(ch)]) for ch in keyword.lstrip("^")]
+        state = 0
+        for cls in path:
+            if cls not in children[state]:
+                children[state][cls] = len(children)
+                children.append({})
+                outputs.append(no_match)
+            state = children[state][cls]
+        outputs[state] = min(outputs[state], priority)
+
+    # Breadth-first failure links, folded straight into a full transition table
+    transitions = np.zeros((len(children), n_classes), dtype=np.int32)
+    fail = [0] * len(children)
+    queue = deque()
+    for cls, child in children[0].items():
+        transitions[0, cls] = child
+        queue.append(child)
+    while queue:
+        state = queue.popleft()
+        outputs[state] = min(outputs[state], outputs[fail[state]])
+        transitions[state] = transitions[fail[state]]
+        for cls, child in children[state].items():
+            fail[child] = int(transitions[fail[state], cls])
+            transitions[state, cls] = child
+            queue.append(child)
+
+    # Expand from character classes to raw ASCII codes; DEL stands in for non-ASCII
+    char_classes[127] = OTHER_CLASS
+    columns = np.append(char_classes, START_CLASS)
+    return np.ascontiguousarray(transitions[:, columns]), np.asarray(outputs, dtype=np.int32)
+
+
+def _cache_paths(cache_dir, digest):
+    return {name: os.path.join(cache_dir, f"merchant-{digest}-{name}.npy")
+            for name in ("transitions", "outputs")}
+
+
+class MerchantIndex:
+    """A compiled keyword automaton; category ids are bound by classifier()."""
+
+    def __init__(self, rules, transitions, outputs):
+        self.rules = rules
+        self.transitions = transitions
+        self.outputs = outputs
+
+    @classmethod
+    def compile(cls, keywords=MERCHANT_KEYWORDS):
+        """Compile in memory, without touching the disk cache."""
+        rules = flatten_rules(keywords)
+        return cls(rules, *compile_automaton(rules))
+
+    def classifier(self, categories, fallback="Other"):
+        """Bind the index to the catalog's SpendingCategory rows."""
+        return MerchantClassifier(self, categories, fallback)
+
+    def match(self, descriptions):
+        """Lowest matching rule index per description (len(rules) if none)."""
+        best = np.empty(len(descriptions), dtype=np.int32)
+        for start in range(0, len(descriptions), CHUNK_SIZE):
+            chunk = descriptions[start:start + CHUNK_SIZE]
+            best[start:start + len(chunk)] = self._match_chunk(chunk)
+        return best
+
+    def _match_chunk(self, descriptions):
+        width = min(max(map(len, descriptions), default=0), MAX_DESCRIPTION_CHARS) or 1
+        # Fixed-width UCS-4 codes, truncated and NUL-padded; one row per character position
+        codes = np.array(descriptions, dtype=f"<U{width}").view(np.uint32).reshape(len(descriptions), width)
+        columns = np.minimum(codes, 127).astype(np.uint8).T.copy()
+
+        flat = self.transitions.reshape(-1)
+        state = np.full(len(descriptions), self.transitions[0, START_COLUMN], dtype=np.int32)
+        best = self.outputs[state]
+        for column in columns:
+            state = flat[state * N_COLUMNS + column]
+            np.minimum(best, self.outputs[state], out=best)
+        return best
+
+
+class MerchantClassifier:
+    """Maps descriptions (and optional MCC codes) to SpendingCategory ids."""
+
+    def __init__(self, index, categories, fallback="Other"):
+        ids_by_name = {category.name: category.id for category in categories}
+        self.index = index
+        self.fallback_id = ids_by_name.get(fallback)
+        fallback_id = -1 if self.fallback_id is None else self.fallback_id
+
+        # Rule index -> category id, with one extra slot for "no match"
+        self.rule_category_ids = np.array(
+            [ids_by_name.get(name, fallback_id) for _, name in index.rules] + [fallback_id],
+            dtype=np.int64,
+        )
+        self.mcc_category_ids = np.full(10000, -1, dtype=np.int64)
+        for first, last, name in MCC_CATEGORIES:
+            if name in ids_by_name:
+                self.mcc_category_ids[first:last + 1] = ids_by_name[name]
+
+    def classify_many(self, descriptions, mccs=None):
+        """Category id per description as an int array; -1 if there is no category."""
+        category_ids = self.rule_category_ids[self.index.match(descriptions)]
+        if mccs is not None:
+            codes = np.array([mcc if mcc is not None else -1 for mcc in mccs], dtype=np.int64)
+            known = (codes >= 0) & (codes < len(self.mcc_category_ids))
+            by_mcc = np.full(len(codes), -1, dtype=np.int64)
+            by_mcc[known] = self.mcc_category_ids[codes[known]]
+            category_ids = np.where(by_mcc >= 0, by_mcc, category_ids)
+        return category_ids
+
+    def classify(self, description, mcc=None):
+        """Category id for one description, or None."""
+        category_id = int(self.classify_many([description], None if mcc is None else [mcc])[0])
+        return None if category_id < 0 else category_id
+
+
+def load_merchant_index(keywords=MERCHANT_KEYWORDS, cache_dir=None):
+    """The compiled index for keywords, memory-mapped from the disk cache when possible."""
+    if cache_dir is None:
+        cache_dir = os.environ.get("MERCHANT_INDEX_DIR", os.path.join(tempfile.gettempdir(), "deed-merchant-index"))
+    rules = flatten_rules(keywords)
+    digest = hashlib.sha256(json.dumps([FORMAT_VERSION, rules]).encode("utf-8")).hexdigest()[:16]
+    paths = _cache_paths(cache_dir, digest)
+
+    if not all(os.path.exists(path) for path in paths.values()):
+        arrays = dict(zip(("transitions", "outputs"), compile_automaton(rules)))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for name, path in paths.items():
+                # Write then rename, so a concurrent loader never maps a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".npy")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, arrays[name])
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not cache merchant index in {cache_dir}: {e}")
+            return MerchantIndex(rules, arrays["transitions"], arrays["outputs"])
+
+    return MerchantIndex(rules, *(np.load(paths[name], mmap_mode="r") for name in ("transitions", "outputs")))
@@ -0,0 +1,92 @@
+"""
+Versioned schema migrations for Deed Finance.
+create_all() only creates missing tables, so changes to tables that already
+exist in a clients.db (new indexes, constraints, columns) are applied here.
+The applied version is stored in a one-row schema_version table.
+
+Run directly to migrate the configured database:
+    python migrations.py
+"""
+import os
+
+from sqlalchemy import Column, Integer, MetaData, Table, text
+
+from models import DbBase, CardBonus, UserCard, UserSubscription
+
+metadata = MetaData()
+schema_version = Table(
+    "schema_version", metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def get_schema_version(conn):
+    """Return the applied schema version, 0 for an unmigrated database."""
+    return conn.execute(schema_version.select()).scalar() or 0
+
+
+def _set_schema_version(conn, version):
+    conn.execute(schema_version.delete())
+    conn.execute(schema_version.insert().values(version=version))
+
+
+def _dedupe(conn, table, columns):
+    """Delete duplicate rows on columns, keeping the lowest id."""
+    cols = ", ".join(columns)
+    conn.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT MIN(id) FROM {table} GROUP BY {cols})"
+    ))
+
+
+def _index(model, name):
+    return next(index for index in model.__table__.indexes if index.name == name)
+
+
+def _add_access_indexes(conn):
+    """Per-user access path indexes and uniqueness on wallet/bonus pairs."""
+    _dedupe(conn, "user_card", ["client_id", "credit_card_id"])
+    _dedupe(conn, "user_subscription", ["client_id", "subscription_id"])
+    _dedupe(conn, "card_bonus", ["credit_card_id", "category_id"])
+
+    for model, name in [
+        (UserCard, "uq_user_card_client_card"),
+        (UserSubscription, "ix_user_subscription_client_active"),
+        (UserSubscription, "uq_user_subscription_client_sub"),
+        (CardBonus, "uq_card_bonus_card_category"),
+    ]:
+        _index(model, name).create(conn, checkfirst=True)
+
+
+# (version, description, upgrade function) - append only, never reorder
+MIGRATIONS = [
+    (1, "Per-user access indexes and unique constraints", _add_access_indexes),
+]
+
+
+def run_migrations(engine):
+    """Create missing tables, then apply pending migrations in order."""
+    DbBase.metadata.create_all(engine)
+    metadata.create_all(engine)
+
+    applied = []
+    for version, description, upgrade in MIGRATIONS:
+        with engine.begin() as conn:
+            if get_schema_version(conn) >= version:
+                continue
+            upgrade(conn)
+            _set_schema_version(conn, version)
+        applied.append((version, description))
+    return applied
+
+
+if __name__ == "__main__":
+    from db_engine import create_db_engine
+
+    database_url = os.environ.get("DATABASE_URL", "sqlite:///clients.db")
+    engine = create_db_engine(database_url)
+    applied = run_migrations(engine)
+    for version, description in applied:
+        print(f"✅ Applied migration {version}: {description}")
+    if not applied:
+        print("✅ Database schema is up to date!")
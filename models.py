@@ -2,7 +2,7 @@
 Database models for Subscription Points Planner MVP.
 Includes credit cards, subscriptions, and user relationship models.
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from flask_login import UserMixin
@@ -15,7 +15,8 @@ DbBase = declarative_base()
 
 # Hide Base from __all__ but it's still in module __dict__ (Vercel scans __dict__)
 __all__ = ['Client', 'CreditCard', 'Subscription', 'SpendingCategory', 
-           'CardBonus', 'UserCard', 'UserSubscription']
+           'CardBonus', 'UserCard', 'UserSubscription', 'UserSummary', 'EmailOutbox',
+           'SpendingProfile', 'UserRecommendation', 'CatalogVersion']
 
 
 class Client(DbBase, UserMixin):
@@ -83,6 +84,11 @@ class CardBonus(DbBase):
     category_id = Column(Integer, ForeignKey("spending_category.id"), nullable=False)
     earn_rate = Column(Float, nullable=False)  # Points per $1 in this category
     
+    # One rate per card and category
+    __table_args__ = (
+        Index("uq_card_bonus_card_category", "credit_card_id", "category_id", unique=True),
+    )
+    
     # Relationships
     credit_card = relationship("CreditCard", back_populates="bonus_categories")
     category = relationship("SpendingCategory", back_populates="card_bonuses")
@@ -118,6 +124,11 @@ class UserCard(DbBase):
     current_points = Column(Integer, default=0)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Wallet lookups filter by client_id; a card can only be added once
+    __table_args__ = (
+        Index("uq_user_card_client_card", "client_id", "credit_card_id", unique=True),
+    )
+    
     # Relationships
     client = relationship("Client", back_populates="user_cards")
     credit_card = relationship("CreditCard", back_populates="user_cards")
@@ -133,6 +144,95 @@ class UserSubscription(DbBase):
     is_active = Column(Boolean, default=True)
     added_at = Column(DateTime, default=datetime.utcnow)
     
+    # Views filter by (client_id, is_active); a subscription can only be tracked once
+    __table_args__ = (
+        Index("ix_user_subscription_client_active", "client_id", "is_active"),
+        Index("uq_user_subscription_client_sub", "client_id", "subscription_id", unique=True),
+    )
+    
     # Relationships
     client = relationship("Client", back_populates="user_subscriptions")
     subscription = relationship("Subscription", back_populates="user_subscriptions")
+
+
+class UserSummary(DbBase):
+    """
+    Denormalized dashboard header totals, one row per client.
+    Kept current by the write paths in user_summary.py.
+    """
+    __tablename__ = "user_summary"
+    
+    client_id = Column(Integer, ForeignKey("Client.id"), primary_key=True)
+    total_points = Column(Integer, nullable=False, default=0)
+    monthly_cost_cad = Column(Float, nullable=False, default=0.0)
+    points_needed = Column(Integer, nullable=False, default=0)
+    coverage_percent = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EmailOutbox(DbBase):
+    """
+    Outgoing emails waiting for the background delivery workers.
+    Requests only insert rows; see email_outbox.py for delivery and retries.
+    """
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String(100), nullable=False)
+    subject = Column(String(200), nullable=False)
+    text_body = Column(Text)
+    html_body = Column(Text)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+    
+    # Workers poll for due pending rows
+    __table_args__ = (
+        Index("ix_email_outbox_status_due", "status", "next_attempt_at"),
+    )
+
+
+class SpendingProfile(DbBase):
+    """A client's saved monthly spending per category, entered in the advisor."""
+    __tablename__ = "spending_profile"
+    
+    id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, ForeignKey("Client.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("spending_category.id"), nullable=False)
+    monthly_amount = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("uq_spending_profile_client_category", "client_id", "category_id", unique=True),
+    )
+
+
+class UserRecommendation(DbBase):
+    """
+    Materialized advisor answer for a client's saved spending profile.
+    Maintained by advice.py; stale when the wallet changes or the catalog
+    fingerprint no longer matches.
+    """
+    __tablename__ = "user_recommendation"
+    
+    client_id = Column(Integer, ForeignKey("Client.id"), primary_key=True)
+    payload = Column(Text, nullable=False)  # JSON, same shape as /calculate-points
+    total_points = Column(Integer, nullable=False, default=0)
+    catalog_fingerprint = Column(String(64), nullable=False)
+    is_stale = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CatalogVersion(DbBase):
+    """
+    One-row catalog revision counter. Bulk catalog loads bump it in the same
+    transaction as their changes, so every process's catalog cache notices.
+    """
+    __tablename__ = "catalog_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
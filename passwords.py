@@ -0,0 +1,176 @@
+"""
+Password hashing off the request thread.
+bcrypt is slow on purpose, so a burst of logins used to pin every gunicorn
+worker on CPU. PasswordHasher runs hashes in a bounded process pool sized to
+the machine's cores. The bcrypt cost is picked by timing a hash against a
+target latency the first time one is needed, in a pool worker so a busy
+request thread doesn't skew it, and is never below 12 (Flask-Bcrypt's
+default, which every older hash used). login() rehashes stored hashes whose
+cost is below the current one.
+
+Serverless functions (VERCEL set) hash inline: AWS Lambda has no /dev/shm
+for the pool's semaphores. Anywhere else a pool that can't start falls back
+to hashing inline too.
+
+| Variable              | Default                      |
+|-----------------------|------------------------------|
+| BCRYPT_ROUNDS         | calibrated, at least 12      |
+| BCRYPT_TARGET_MS      | 250                          |
+| BCRYPT_WORKERS        | CPU count, 0 on Vercel       |
+| BCRYPT_MAX_PENDING    | 4 per worker                 |
+| BCRYPT_WAIT_SECONDS   | 10                           |
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+MIN_ROUNDS = 12
+MAX_ROUNDS = 16
+# bcrypt only reads this many bytes of a password
+MAX_PASSWORD_BYTES = 72
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashes are already waiting for a worker."""
+
+
+def _password_bytes(password):
+    # Older bcrypt releases truncated silently; newer ones raise instead
+    return password.encode("utf-8")[:MAX_PASSWORD_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _check(pw_hash, password):
+    try:
+        return bcrypt.checkpw(_password_bytes(password), pw_hash.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def hash_rounds(pw_hash):
+    """The cost factor stored in a bcrypt hash ("$2b$12$..." -> 12)."""
+    return int(pw_hash.split("$")[2])
+
+
+def calibrate_rounds(target_ms=250, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, timer=time.perf_counter):
+    """Highest cost whose hash takes at most target_ms here; each round doubles the work."""
+    start = timer()
+    _hash("calibration", min_rounds)
+    elapsed_ms = (timer() - start) * 1000
+
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        elapsed_ms *= 2
+        rounds += 1
+    return rounds
+
+
+class PasswordHasher:
+    """bcrypt hashing and checking in a bounded worker process pool."""
+
+    def __init__(self, workers=None, rounds=None, target_ms=250, max_pending=None, wait_seconds=10.0):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.target_ms = target_ms
+        self.max_pending = max_pending if max_pending is not None else 4 * max(self.workers, 1)
+        self.wait_seconds = wait_seconds
+        self._rounds = rounds
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._calibration_lock = threading.Lock()
+        self._in_flight = 0
+        self._pool = None
+        self._pool_pid = None
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """Build a hasher configured from BCRYPT_* environment variables."""
+        environ = os.environ if environ is None else environ
+        workers = environ.get("BCRYPT_WORKERS")
+        if workers is None and (environ.get("VERCEL") or environ.get("VERCEL_ENV")):
+            workers = 0
+        rounds = environ.get("BCRYPT_ROUNDS")
+        max_pending = environ.get("BCRYPT_MAX_PENDING")
+        return cls(
+            workers=int(workers) if workers is not None else None,
+            rounds=max(MIN_ROUNDS, int(rounds)) if rounds is not None else None,
+            target_ms=float(environ.get("BCRYPT_TARGET_MS", 250)),
+            max_pending=int(max_pending) if max_pending is not None else None,
+            wait_seconds=float(environ.get("BCRYPT_WAIT_SECONDS", 10)),
+        )
+
+    @property
+    def rounds(self):
+        """Cost factor for new hashes, calibrated once per process."""
+        if self._rounds is None:
+            with self._calibration_lock:
+                if self._rounds is None:
+                    self._rounds = self._run(calibrate_rounds, self.target_ms)
+        return self._rounds
+
+    def _executor(self):
+        with self._lock:
+            # A pool inherited through a fork (gunicorn --preload) can't be used
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if self.workers == 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise HasherBusy(f"{self.max_pending} password hashes already pending")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            try:
+                executor = self._executor()
+            except OSError as e:
+                # No POSIX semaphores here (e.g. no /dev/shm); hash inline from now on
+                print(f"Warning: Password hashing pool unavailable ({e}); hashing inline")
+                self.workers = 0
+                return fn(*args)
+            return executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def hash_password(self, password):
+        """bcrypt hash of password at the current cost."""
+        return self._run(_hash, password, self.rounds)
+
+    def check_password(self, pw_hash, password):
+        """True if password matches pw_hash."""
+        if not pw_hash:
+            return False
+        return self._run(_check, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True if pw_hash was made with a lower cost than new hashes use."""
+        return hash_rounds(pw_hash) < self.rounds
+
+    def stats(self):
+        """Pool size, current cost and how many hashes are running or queued."""
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "workers": self.workers,
+            "rounds": self._rounds,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+        }
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,33 @@
+"""
+Lightweight authenticated-user object for Flask-Login.
+load_user caches one of these per user instead of loading a Client row on
+every request; it carries only the fields views and templates read.
+"""
+from flask_login import UserMixin
+
+
+class UserPrincipal(UserMixin):
+    """Detached, non-ORM stand-in for Client used as current_user."""
+
+    __slots__ = ("id", "first_name", "surname", "email", "is_verified")
+
+    def __init__(self, id, first_name, surname, email, is_verified):
+        self.id = id
+        self.first_name = first_name
+        self.surname = surname
+        self.email = email
+        self.is_verified = is_verified
+
+    @classmethod
+    def from_client(cls, client):
+        """Copy the template-facing fields off a Client row."""
+        return cls(
+            id=client.id,
+            first_name=client.first_name,
+            surname=client.surname,
+            email=client.email,
+            is_verified=client.is_verified,
+        )
+
+    def __repr__(self):
+        return f"<UserPrincipal {self.id}>"
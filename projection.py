@@ -0,0 +1,105 @@
+"""
+Multi-month points projection.
+Starting from each wallet card's current_points, every month adds the points
+the spending profile earns (each category on the wallet card worth the most
+dollars for it, by earn rate and point_value_cents), then redeems points for
+tracked subscriptions at each card's point_value_cents.
+
+Each month redeems the set of subscriptions that covers the most dollars
+the wallet can pay, chosen exactly by the advisor's CoverageSolver over
+cents, so a month never covers less than /calculate-points would for the
+same balance. The dollars redeemed come off every card in proportion to its
+share of the wallet's value. Each month is a few array operations over the
+wallet plus a memoized solve, so a 36-month projection stays well under a
+millisecond or two.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from coverage_solver import CoverageSolver
+
+MIN_MONTHS = 1
+MAX_MONTHS = 36
+
+Projection = namedtuple("Projection", [
+    "card_ids", "subscription_ids", "monthly_earn", "points", "value", "covered", "first_covered",
+])
+Projection.__doc__ = """
+card_ids / subscription_ids: column order of the arrays below.
+monthly_earn: points earned per card each month.
+points: months x cards balances at the end of each month, after redemptions.
+value: months dollar value of the wallet at the end of each month.
+covered: months x subscriptions, True where points paid the subscription.
+first_covered: per subscription, the first covered month (1-based) or None.
+"""
+
+
+def monthly_earnings(catalog, card_ids, spending):
+    """Points each wallet card earns per month when every category goes to its most valuable card."""
+    earn_rates = catalog.earn_rates
+    wallet = earn_rates.wallet_card_ids(card_ids)
+    earn = np.zeros(wallet.size, dtype=np.float64)
+    if wallet.size == 0:
+        return wallet, earn
+
+    categories, amounts = [], []
+    for category_id, amount in spending.items():
+        category_id = int(category_id)
+        if amount > 0 and earn_rates.has_category(category_id):
+            categories.append(category_id)
+            amounts.append(float(amount))
+    if not categories:
+        return wallet, earn
+
+    cents = np.array([catalog.cards_by_id[card_id].point_value_cents or 0.0 for card_id in wallet.tolist()])
+    rates = earn_rates.rates[np.ix_(wallet, categories)]
+    best = np.argmax(rates * cents[:, None], axis=0)
+    points = np.floor(np.asarray(amounts) * rates[best, np.arange(len(categories))])
+    np.add.at(earn, best, points)
+    return wallet, earn
+
+
+def project_coverage(catalog, wallet, spending, subscriptions, months=12):
+    """
+    Simulate months of earning and redemption.
+    wallet is [(credit_card_id, current_points)] and subscriptions is
+    [(subscription_id, monthly_cost_cad)], both in the user's order.
+    """
+    if not MIN_MONTHS <= months <= MAX_MONTHS:
+        raise ValueError(f"months must be between {MIN_MONTHS} and {MAX_MONTHS}")
+
+    starting = {card_id: points or 0 for card_id, points in wallet}
+    card_ids, earn = monthly_earnings(catalog, [card_id for card_id, _ in wallet], spending)
+    balances = np.array([starting[card_id] for card_id in card_ids.tolist()], dtype=np.float64)
+    dollars_per_point = np.array(
+        [(catalog.cards_by_id[card_id].point_value_cents or 0.0) / 100 for card_id in card_ids.tolist()]
+    )
+
+    subscription_ids = [sub_id for sub_id, _ in subscriptions]
+    costs = np.array([cost for _, cost in subscriptions], dtype=np.float64)
+    solver = CoverageSolver(np.round(costs * 100).astype(np.int64))
+
+    points = np.empty((months, card_ids.size), dtype=np.float64)
+    value = np.empty(months, dtype=np.float64)
+    covered = np.zeros((months, len(subscriptions)), dtype=bool)
+    for month in range(months):
+        balances += earn
+        wallet_value = balances @ dollars_per_point
+
+        # The subscriptions covering the most dollars the wallet can pay this month
+        paid = np.array(solver.solve(int(wallet_value * 100 + 1e-6)), dtype=bool)
+        spent = costs[paid].sum()
+        if spent > 0:
+            balances *= max(0.0, 1 - spent / wallet_value)
+            wallet_value = max(0.0, wallet_value - spent)
+        covered[month] = paid
+
+        points[month] = balances
+        value[month] = wallet_value
+
+    any_covered = covered.any(axis=0)
+    first = covered.argmax(axis=0) + 1
+    first_covered = [int(m) if hit else None for m, hit in zip(first.tolist(), any_covered.tolist())]
+    return Projection(card_ids.tolist(), subscription_ids, earn.astype(np.int64),
+                      np.floor(points + 1e-9).astype(np.int64), np.round(value, 2), covered, first_covered)
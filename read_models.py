@@ -0,0 +1,47 @@
+"""
+Lightweight read models for the page views.
+Views used to load full UserCard / UserSubscription graphs with joinedloads
+and expunge each instance so templates could use them. These helpers run
+column-only select() statements instead and attach the catalog row from the
+in-memory snapshot, so templates keep using uc.credit_card.name and
+us.subscription.name without identity-map or relationship overhead.
+"""
+from collections import namedtuple
+
+from sqlalchemy import select
+
+from models import UserCard, UserSubscription
+
+WalletCard = namedtuple("WalletCard", ["id", "credit_card_id", "current_points", "credit_card"])
+
+TrackedSubscription = namedtuple("TrackedSubscription", ["id", "subscription_id", "subscription"])
+
+
+def wallet_cards(session, catalog, client_id):
+    """A user's cards in wallet order, each with its catalog CardInfo."""
+    rows = session.execute(
+        select(UserCard.id, UserCard.credit_card_id, UserCard.current_points)
+        .where(UserCard.client_id == client_id)
+        .order_by(UserCard.id)
+    )
+    cards = catalog.cards_by_id
+    return [
+        WalletCard(row_id, card_id, points or 0, cards[card_id])
+        for row_id, card_id, points in rows
+        if card_id in cards
+    ]
+
+
+def tracked_subscriptions(session, catalog, client_id, active_only=False):
+    """A user's tracked subscriptions, each with its catalog SubscriptionInfo."""
+    stmt = select(UserSubscription.id, UserSubscription.subscription_id).where(
+        UserSubscription.client_id == client_id
+    )
+    if active_only:
+        stmt = stmt.where(UserSubscription.is_active.is_(True))
+    subs = catalog.subscriptions_by_id
+    return [
+        TrackedSubscription(row_id, sub_id, subs[sub_id])
+        for row_id, sub_id in session.execute(stmt.order_by(UserSubscription.id))
+        if sub_id in subs
+    ]
@@ -0,0 +1,114 @@
+"""
+Card-acquisition recommender.
+For a monthly spending profile and the user's current wallet, every active
+catalog card the user doesn't hold is scored by the annual dollar value it
+would add: in each category where it beats the wallet's best card, the extra
+points times point_value_cents, summed and minus its annual_fee. All
+candidates are scored at once with matrix operations over the catalog.
+
+Pairs of new cards are found by branch and bound. A pair can never be worth
+more than the sum of its two single-card values, so candidates are walked
+best-first and the search stops once no remaining partner could beat the
+pairs already kept.
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+MONTHS_PER_YEAR = 12
+
+Recommendation = namedtuple("Recommendation", ["card", "annual_value", "gross_value", "category_ids"])
+
+PairRecommendation = namedtuple("PairRecommendation", ["cards", "annual_value"])
+
+
+def card_values(catalog):
+    """
+    Dollars earned per dollar spent, indexed [card_id, category_id], and
+    annual fees indexed by card_id, for a catalog snapshot.
+    """
+    rates = catalog.earn_rates.rates
+    cents_per_point = np.zeros(rates.shape[0], dtype=np.float64)
+    fees = np.zeros(rates.shape[0], dtype=np.float64)
+    for card in catalog.cards:
+        cents_per_point[card.id] = card.point_value_cents or 0.0
+        fees[card.id] = card.annual_fee or 0.0
+    return rates * cents_per_point[:, None] / 100, fees
+
+
+def annual_spending(catalog, spending):
+    """{category_id: monthly dollars} -> yearly dollars per category column."""
+    annual = np.zeros(catalog.earn_rates.rates.shape[1], dtype=np.float64)
+    for category_id, amount in spending.items():
+        category_id = int(category_id)
+        if amount > 0 and catalog.earn_rates.has_category(category_id):
+            annual[category_id] += amount * MONTHS_PER_YEAR
+    return annual
+
+
+def best_pairs(gains, annual, fees, net, count):
+    """
+    Top `count` pairs of candidate rows by net annual value, best first, as
+    (row_a, row_b, value). gains is candidates x categories, never negative.
+    """
+    if count <= 0:
+        return []
+    order = np.argsort(-net, kind="stable")
+    sorted_net = net[order]
+    kept = []  # min-heap of (value, row_a, row_b)
+
+    for a in range(len(order) - 1):
+        threshold = kept[0][0] if len(kept) == count else -np.inf
+        # No partner further down the order can lift this card above the threshold
+        if sorted_net[a] + sorted_net[a + 1] <= threshold:
+            break
+        end = a + 1 + int(np.searchsorted(-sorted_net[a + 1:], sorted_net[a] - threshold, side="left"))
+        partners = order[a + 1:end]
+        if partners.size == 0:
+            continue
+
+        row = order[a]
+        values = np.maximum(gains[row], gains[partners]) @ annual - fees[row] - fees[partners]
+        for partner, value in zip(partners.tolist(), values.tolist()):
+            if len(kept) < count:
+                heapq.heappush(kept, (value, row, partner))
+            elif value > kept[0][0]:
+                heapq.heapreplace(kept, (value, row, partner))
+
+    return [(int(a), int(b), value) for value, a, b in sorted(kept, key=lambda item: -item[0])]
+
+
+def recommend_cards(catalog, wallet_card_ids, spending, limit=10, pair_limit=3):
+    """
+    Rank catalog cards the user doesn't hold by marginal annual value.
+    Returns (top single cards, top pairs), each best first.
+    """
+    values, fees = card_values(catalog)
+    annual = annual_spending(catalog, spending)
+
+    wallet = catalog.earn_rates.wallet_card_ids(wallet_card_ids)
+    baseline = values[wallet].max(axis=0) if wallet.size else np.zeros(values.shape[1])
+
+    held = set(wallet.tolist())
+    cards = [card for card in catalog.active_cards if card.id not in held]
+    if not cards:
+        return [], []
+    candidates = np.array([card.id for card in cards], dtype=np.intp)
+
+    # What each candidate adds over the wallet's best card, category by category
+    gains = np.maximum(values[candidates] - baseline, 0.0)
+    gross = gains @ annual
+    net = gross - fees[candidates]
+
+    singles = []
+    for row in np.argsort(-net, kind="stable")[:limit].tolist():
+        category_ids = np.flatnonzero((gains[row] > 0) & (annual > 0)).tolist()
+        singles.append(Recommendation(cards[row], round(float(net[row]), 2), round(float(gross[row]), 2),
+                                      category_ids))
+
+    pairs = [
+        PairRecommendation((cards[a], cards[b]), round(value, 2))
+        for a, b, value in best_pairs(gains, annual, fees[candidates], net, pair_limit)
+    ]
+    return singles, pairs
@@ -0,0 +1,116 @@
+"""
+Per-user memo cache.
+Repeated /calculate-points requests with the same spending inputs are answered
+from memory instead of being rebuilt from the database, and load_user keeps
+the logged-in user's principal here instead of loading Client per request.
+
+Entries are keyed by user and a caller-supplied fingerprint. Any route that
+changes the cached data calls invalidate_user() after committing, which drops
+the user's entries. A reader takes generation() before reading the database
+and passes it to put(), which discards the value if the user was invalidated
+in between, so an answer built from the old rows is never stored. The cache
+is per process, so under several workers the TTL bounds how stale a result
+can be on a worker that did not see the write.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def spending_fingerprint(spending):
+    """Stable, hashable fingerprint of a spending payload."""
+    return json.dumps(spending, sort_keys=True, separators=(",", ":"))
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a TTL and per-user invalidation."""
+
+    def __init__(self, max_entries=4096, ttl_seconds=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._fingerprints = {}
+        # Invalidations so far, and the count at each user's latest one (oldest first,
+        # at most max_entries users; older ones are only known to be before _forgotten)
+        self._invalidations = 0
+        self._invalidated_at = OrderedDict()
+        self._forgotten = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, fingerprint):
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            key = (user_id, fingerprint)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self):
+        """Token to take before reading what will be put(); see put()."""
+        with self._lock:
+            return self._invalidations
+
+    def put(self, user_id, fingerprint, value, generation=None):
+        """
+        Store a value, evicting the least recently used entries if full.
+        With the generation() taken before the value was read, a value the
+        user's invalidation has since made stale is dropped; returns False then.
+        """
+        with self._lock:
+            if generation is not None and self._invalidated_since(user_id, generation):
+                return False
+            key = (user_id, fingerprint)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self._fingerprints.setdefault(user_id, set()).add(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+            return True
+
+    def _invalidated_since(self, user_id, generation):
+        at = self._invalidated_at.get(user_id)
+        if at is None:
+            # Not invalidated recently enough to remember; stale if it may have been
+            return self._forgotten > generation
+        return at > generation
+
+    def _evict(self, key):
+        del self._entries[key]
+        user_id, fingerprint = key
+        fingerprints = self._fingerprints[user_id]
+        fingerprints.discard(fingerprint)
+        if not fingerprints:
+            del self._fingerprints[user_id]
+
+    def invalidate_user(self, user_id):
+        """Drop every cached result for a user."""
+        with self._lock:
+            for fingerprint in self._fingerprints.pop(user_id, ()):
+                del self._entries[(user_id, fingerprint)]
+            self._invalidations += 1
+            self._invalidated_at.pop(user_id, None)
+            self._invalidated_at[user_id] = self._invalidations
+            while len(self._invalidated_at) > self.max_entries:
+                _, self._forgotten = self._invalidated_at.popitem(last=False)
+
+    def clear(self):
+        """Drop everything."""
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            # Reads already under way may predate whatever prompted the clear
+            self._forgotten = self._invalidations = self._invalidations + 1
+            self._invalidated_at.clear()
+
+    def __len__(self):
+        return len(self._entries)
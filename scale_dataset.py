@@ -0,0 +1,246 @@
+"""
+Synthetic scale dataset for Deed Finance.
+Fills a database that already has the catalog (seed_data.py or the prebuilt
+catalog.db) with a configurable number of users, their wallets and tracked
+subscriptions, so query plans and pages can be measured at production sizes
+instead of against a handful of accounts.
+
+Distributions, all drawn from one seeded NumPy generator:
+- cards per user: 1 + Poisson(cards_per_user - 1), at most the catalog size;
+  cards are picked without repeats with Zipf-like popularity, so a few cards
+  are in most wallets and the long tail is rare.
+- points per card: lognormal around 1,500, so coverage ranges from none to
+  full.
+- subscriptions per user: Poisson(subs_per_user), picked the same way; about
+  nine in ten are active.
+- signups spread over the last three years; about 95% verified.
+
+Rows are built a chunk of users at a time and written with executemany Core
+INSERTs, one transaction per chunk. Client ids are assigned here, continuing
+after the current largest id, so wallet rows never read ids back. Each user
+also gets its user_summary row, computed from the generated rows.
+
+bcrypt takes ~250ms per hash on purpose, so every user shares one hash of
+--password, computed once; --password-hash skips bcrypt entirely. Emails are
+scale<id>@loadtest.deed.com.
+
+    python scale_dataset.py --users 1000000 --cards-per-user 5 --subs-per-user 3
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, insert, select, text
+
+from models import Client, CreditCard, Subscription, UserCard, UserSubscription, UserSummary
+from user_summary import summarize
+
+DEFAULT_PASSWORD = "scale-password"
+EMAIL_DOMAIN = "loadtest.deed.com"
+CHUNK_USERS = 20000
+SIGNUP_DAYS = 3 * 365
+VERIFIED_SHARE = 0.95
+ACTIVE_SUBSCRIPTION_SHARE = 0.9
+POINTS_MEDIAN = 1500
+POINTS_SIGMA = 1.2
+# Zipf exponent for card and subscription popularity
+POPULARITY_SKEW = 1.1
+# Random keys drawn at once when sampling wallets (8 bytes each)
+MAX_SAMPLING_KEYS = 1 << 22
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+SURNAMES = ["Tremblay", "Smith", "Roy", "Gagnon", "Lee", "Wilson", "Martin", "Brown", "Singh", "Chen"]
+
+
+def popularity_weights(n, skew=POPULARITY_SKEW):
+    """Zipf-like pick probabilities for n items, most popular first."""
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+def sample_distinct(rng, weights, counts, max_keys=MAX_SAMPLING_KEYS):
+    """
+    For each row pick counts[row] distinct items by weight (Gumbel top-k).
+    Returns (rows, items) index arrays, row-major.
+    Rows are keyed in blocks of at most max_keys random keys, and only each
+    block's largest count is partitioned out, so memory stays flat however
+    large the catalog.
+    """
+    log_weights = np.log(weights)
+    block = max(1, max_keys // max(weights.size, 1))
+    all_rows, all_items = [], []
+    for start in range(0, counts.size, block):
+        block_counts = counts[start:start + block]
+        k = int(block_counts.max(initial=0))
+        if k == 0:
+            continue
+        keys = log_weights + rng.gumbel(size=(block_counts.size, weights.size))
+        top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        # Best first, so each row's first counts[row] are its top counts[row]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+        take = np.arange(k) < block_counts[:, None]
+        all_rows.append(np.nonzero(take)[0] + start)
+        all_items.append(top[take])
+    if not all_rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(all_rows), np.concatenate(all_items)
+
+
+def _catalog_ids(conn):
+    cards = conn.execute(
+        select(CreditCard.id).where(CreditCard.is_active.is_(True)).order_by(CreditCard.id)
+    ).scalars().all()
+    subscriptions = conn.execute(
+        select(Subscription.id, Subscription.monthly_cost_cad)
+        .where(Subscription.is_active.is_(True)).order_by(Subscription.id)
+    ).all()
+    return np.array(cards, dtype=np.int64), subscriptions
+
+
+def generate_chunk(rng, first_id, n_users, card_ids, subscriptions, password_hash,
+                   cards_per_user=5.0, subs_per_user=3.0, now=None):
+    """Rows for n_users users with ids from first_id: {table: [row dicts]}."""
+    now = now or datetime.utcnow()
+    ids = np.arange(first_id, first_id + n_users)
+    signup_days = rng.uniform(0, SIGNUP_DAYS, n_users)
+    verified = rng.random(n_users) < VERIFIED_SHARE
+    first_names = rng.integers(len(FIRST_NAMES), size=n_users)
+    surnames = rng.integers(len(SURNAMES), size=n_users)
+    clients = [
+        {
+            "id": client_id,
+            "first_name": FIRST_NAMES[first],
+            "surname": SURNAMES[last],
+            "email": f"scale{client_id}@{EMAIL_DOMAIN}",
+            "password": password_hash,
+            "created_at": now - timedelta(days=days),
+            "is_verified": is_verified,
+        }
+        for client_id, first, last, days, is_verified in zip(
+            ids.tolist(), first_names.tolist(), surnames.tolist(), signup_days.tolist(), verified.tolist()
+        )
+    ]
+
+    n_cards = np.minimum(1 + rng.poisson(max(cards_per_user - 1, 0), n_users), card_ids.size)
+    rows, picks = sample_distinct(rng, popularity_weights(card_ids.size), n_cards)
+    points = np.rint(rng.lognormal(np.log(POINTS_MEDIAN), POINTS_SIGMA, rows.size)).astype(np.int64)
+    user_cards = [
+        {"client_id": client_id, "credit_card_id": card_id, "current_points": balance, "last_updated": now}
+        for client_id, card_id, balance in zip(ids[rows].tolist(), card_ids[picks].tolist(), points.tolist())
+    ]
+    total_points = np.bincount(rows, weights=points, minlength=n_users)
+
+    sub_ids = np.array([sub_id for sub_id, _ in subscriptions], dtype=np.int64)
+    sub_costs = np.array([cost for _, cost in subscriptions], dtype=np.float64)
+    n_subs = np.minimum(rng.poisson(subs_per_user, n_users), sub_ids.size)
+    rows, picks = sample_distinct(rng, popularity_weights(sub_ids.size), n_subs)
+    active = rng.random(rows.size) < ACTIVE_SUBSCRIPTION_SHARE
+    user_subscriptions = [
+        {"client_id": client_id, "subscription_id": sub_id, "is_active": is_active, "added_at": now}
+        for client_id, sub_id, is_active in zip(ids[rows].tolist(), sub_ids[picks].tolist(), active.tolist())
+    ]
+    costs = [[] for _ in range(n_users)]
+    for row, cost in zip(rows[active].tolist(), sub_costs[picks[active]].tolist()):
+        costs[row].append(cost)
+
+    summaries = [
+        dict(summarize(int(points), user_costs)._asdict(), client_id=client_id, updated_at=now)
+        for client_id, points, user_costs in zip(ids.tolist(), total_points.tolist(), costs)
+    ]
+    return {
+        Client.__table__: clients,
+        UserCard.__table__: user_cards,
+        UserSubscription.__table__: user_subscriptions,
+        UserSummary.__table__: summaries,
+    }
+
+
+def shared_password_hash(password=DEFAULT_PASSWORD):
+    """One bcrypt hash of password at the configured cost, hashed inline (no worker pool)."""
+    from passwords import PasswordHasher
+
+    return PasswordHasher.from_env(dict(os.environ, BCRYPT_WORKERS="0")).hash_password(password)
+
+
+def generate_dataset(engine, users, cards_per_user=5.0, subs_per_user=3.0, seed=0,
+                     password_hash=None, chunk_users=CHUNK_USERS, progress=None):
+    """
+    Insert users synthetic users (and their wallets, subscriptions and
+    summaries) through engine. Returns rows inserted per table name.
+    """
+    if password_hash is None:
+        password_hash = shared_password_hash()
+
+    with engine.connect() as conn:
+        card_ids, subscriptions = _catalog_ids(conn)
+        next_id = (conn.execute(select(func.max(Client.id))).scalar() or 0) + 1
+    if card_ids.size == 0 or not subscriptions:
+        raise ValueError("The catalog is empty; run python seed_data.py first")
+
+    rng = np.random.default_rng(seed)
+    counts = {table: 0 for table in ("Client", "user_card", "user_subscription", "user_summary")}
+    done = 0
+    while done < users:
+        n = min(chunk_users, users - done)
+        chunk = generate_chunk(rng, next_id + done, n, card_ids, subscriptions, password_hash,
+                               cards_per_user, subs_per_user)
+        with engine.begin() as conn:
+            for table, rows in chunk.items():
+                if rows:
+                    conn.execute(insert(table), rows)
+                counts[table.name] += len(rows)
+        done += n
+        if progress:
+            progress(done, counts)
+
+    if engine.dialect.name == "postgresql" and users:
+        # Explicit ids don't advance the serial sequence
+        with engine.begin() as conn:
+            conn.execute(text(
+                """SELECT setval(pg_get_serial_sequence('"Client"', 'id'), (SELECT MAX(id) FROM "Client"))"""
+            ))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--cards-per-user", type=float, default=5.0)
+    parser.add_argument("--subs-per-user", type=float, default=3.0)
+    parser.add_argument("--chunk-users", type=int, default=CHUNK_USERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password every user shares (hashed once)")
+    parser.add_argument("--password-hash", help="precomputed bcrypt hash to store; skips bcrypt")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///clients.db"))
+    args = parser.parse_args()
+
+    from db_engine import create_db_engine
+    from migrations import run_migrations
+
+    # Bulk load: a crash mid-run means regenerating anyway
+    engine = create_db_engine(args.database_url, dict(os.environ, SQLITE_SYNCHRONOUS="OFF"))
+    run_migrations(engine)
+
+    password_hash = args.password_hash or shared_password_hash(args.password)
+
+    start = time.perf_counter()
+
+    def progress(done, counts):
+        elapsed = time.perf_counter() - start
+        rows = sum(counts.values())
+        print(f"  {done:>10,} users  {rows:>12,} rows  {rows / elapsed:>10,.0f} rows/s")
+
+    counts = generate_dataset(
+        engine, args.users, args.cards_per_user, args.subs_per_user, args.seed,
+        password_hash, args.chunk_users, progress,
+    )
+    elapsed = time.perf_counter() - start
+    for table, count in counts.items():
+        print(f"✅ {table}: {count:,} rows")
+    print(f"✅ Generated {args.users:,} users in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Monte Carlo coverage confidence for the spending advisor.
+A single /calculate-points answer assumes the user spends exactly their
+monthly amounts. Here thousands of monthly spending vectors are sampled
+around those amounts, every sample is scored against the wallet's earn-rate
+sub-matrix in one batched pass (EarnRateMatrix.score_scenarios), and the
+coverage solver runs on all sample totals at once. Each tracked subscription
+gets the fraction of samples in which it is covered.
+
+Spending per category is drawn independently with the category's amount as
+the mean and a coefficient of variation (stddev / mean), from one of
+DISTRIBUTIONS. Pass a seed for reproducible results.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from coverage_solver import CoverageSolver
+
+DEFAULT_SAMPLES = 5000
+MAX_SAMPLES = 50000
+DEFAULT_CV = 0.25
+
+Simulation = namedtuple("Simulation", ["samples", "probabilities", "mean_points", "percentiles"])
+Simulation.__doc__ = """
+samples: number of spending vectors drawn.
+probabilities: per subscription, the fraction of samples that cover it.
+mean_points: mean monthly points across samples.
+percentiles: {5, 50, 95: monthly points at that percentile}.
+"""
+
+
+def _lognormal(rng, means, cvs, n_samples):
+    sigma2 = np.log1p(cvs ** 2)
+    mu = np.log(np.where(means > 0, means, 1.0)) - sigma2 / 2
+    return rng.lognormal(mu, np.sqrt(sigma2), size=(n_samples, means.size))
+
+
+def _gamma(rng, means, cvs, n_samples):
+    shape = 1 / np.where(cvs > 0, cvs, 1.0) ** 2
+    return rng.gamma(shape, means / shape, size=(n_samples, means.size))
+
+
+def _normal(rng, means, cvs, n_samples):
+    return np.maximum(rng.normal(means, means * cvs, size=(n_samples, means.size)), 0.0)
+
+
+# Name -> sampler(rng, means, cvs, n_samples); all keep the mean and stay non-negative
+DISTRIBUTIONS = {
+    "lognormal": _lognormal,
+    "gamma": _gamma,
+    "normal": _normal,
+}
+
+
+def sample_spending(means, n_samples, distribution="lognormal", cv=DEFAULT_CV, rng=None):
+    """
+    Draw an n_samples x C spending matrix around per-category means. cv is a
+    scalar or one value per category; a cv of 0 keeps that category fixed.
+    """
+    sampler = DISTRIBUTIONS.get(distribution)
+    if sampler is None:
+        raise ValueError(f"distribution must be one of {', '.join(sorted(DISTRIBUTIONS))}")
+    means = np.asarray(means, dtype=np.float64)
+    cvs = np.broadcast_to(np.asarray(cv, dtype=np.float64), means.shape)
+    if not np.isfinite(cvs).all() or (cvs < 0).any():
+        raise ValueError("cv must be a non-negative number")
+    if rng is None:
+        rng = np.random.default_rng()
+
+    samples = sampler(rng, means, cvs, n_samples)
+    return np.where((cvs > 0) & (means > 0), samples, means)
+
+
+def simulate_coverage(catalog, card_ids, points_needed, spending, n_samples=DEFAULT_SAMPLES,
+                      distribution="lognormal", cv=DEFAULT_CV, seed=None):
+    """
+    Coverage probability per subscription for {category_id: monthly amount}.
+    points_needed is one points cost per subscription; cv is a scalar or {category_id: cv}; categories not listed use DEFAULT_CV.
+    """
+    if not 1 <= n_samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_SAMPLES}")
+
+    earn_rates = catalog.earn_rates
+    category_ids, means = [], []
+    for category_id, amount in spending.items():
+        category_id = int(category_id)
+        if amount > 0 and earn_rates.has_category(category_id):
+            category_ids.append(category_id)
+            means.append(float(amount))
+    if isinstance(cv, dict):
+        cv = {int(category_id): value for category_id, value in cv.items()}
+        cv = [float(cv.get(category_id, DEFAULT_CV)) for category_id in category_ids]
+
+    samples = sample_spending(means, n_samples, distribution, cv, np.random.default_rng(seed))
+    _, _, points = earn_rates.score_scenarios(card_ids, category_ids, samples)
+    totals = points.sum(axis=1)
+
+    covered = CoverageSolver(points_needed).solve_many(totals)
+    return Simulation(
+        n_samples,
+        covered.mean(axis=0).tolist(),
+        float(totals.mean()),
+        dict(zip((5, 50, 95), np.percentile(totals, (5, 50, 95)).tolist())),
+    )
+
@@ -0,0 +1,53 @@
+"""
+Deferred startup for Deed Finance.
+On serverless hosts every cold start imports app before it can answer, so
+importing app only builds cheap objects. Work that touches the database or
+pulls in a rarely used dependency (Flask-Mail, WTForms) is wrapped in a Lazy
+and runs on first use instead: installing the prebuilt catalog and schema
+migrations before the first non-static request, the email outbox on the first
+signup.
+
+Each step records how long it took, and /health reports the timings so cold
+starts can be compared across deploys.
+
+    python benchmarks/bench_cold_start.py
+"""
+import threading
+import time
+
+_UNSET = object()
+
+
+class Lazy:
+    """A value built by factory on first call, exactly once across threads."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.seconds = None
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._value is not _UNSET
+
+    def __call__(self):
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                # A concurrent first request may have finished while we waited
+                if self._value is _UNSET:
+                    start = time.perf_counter()
+                    self._value = self.factory()
+                    self.seconds = time.perf_counter() - start
+                value = self._value
+        return value
+
+
+def startup_report(*steps):
+    """{step name: milliseconds it took, or None if it hasn't run}."""
+    return {
+        step.name: round(step.seconds * 1000, 1) if step.ready else None
+        for step in steps
+    }
@@ -0,0 +1,171 @@
+"""
+Bank statement import for the advisor.
+Uploaded CSV and OFX exports are read one line at a time, each purchase is
+classified into a SpendingCategory and added to a per-month total, so memory
+stays flat no matter how many years of transactions a file holds. The
+monthly averages are what calculate_points expects as "spending".
+Classification runs in fixed-size chunks through merchant_index.
+
+CSV files need a header row with a date, a description and either an amount
+column or separate debit/credit columns. By default a positive amount is a
+purchase (credit card exports); pass negative_spend=True for bank exports
+where purchases are negative. Payments and refunds are skipped, not netted.
+"""
+import csv
+import io
+import re
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import chain, islice
+
+Transaction = namedtuple("Transaction", ["date", "description", "amount"])
+
+DATE_COLUMNS = ("date", "transaction date", "trans date", "posted date", "posting date")
+DESCRIPTION_COLUMNS = ("description", "description 1", "merchant", "payee", "name", "memo", "details")
+AMOUNT_COLUMNS = ("amount", "cad$", "amount (cad)", "transaction amount")
+DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals", "purchases")
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%d-%b-%Y", "%b %d, %Y", "%d %b %Y")
+
+class StatementError(ValueError):
+    """The uploaded file isn't a statement we can read."""
+
+
+def parse_amount(value):
+    """'$1,234.50' -> 1234.5, '(12.00)' -> -12.0, '' -> None."""
+    value = (value or "").strip().replace("$", "").replace(",", "")
+    if not value:
+        return None
+    negative = value.startswith("(") and value.endswith(")")
+    try:
+        amount = Decimal(value.strip("()"))
+    except InvalidOperation:
+        return None
+    return float(-amount if negative else amount)
+
+
+def parse_date(value):
+    """Parse a statement date in any of DATE_FORMATS; None if unrecognized."""
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _pick_column(fieldnames, candidates):
+    lowered = {name.strip().lower(): name for name in fieldnames if name}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def read_csv_transactions(lines, negative_spend=False):
+    """Yield purchases from CSV text lines as Transaction(date, description, amount > 0)."""
+    reader = csv.DictReader(lines)
+    fieldnames = reader.fieldnames or []
+    date_col = _pick_column(fieldnames, DATE_COLUMNS)
+    description_col = _pick_column(fieldnames, DESCRIPTION_COLUMNS)
+    amount_col = _pick_column(fieldnames, AMOUNT_COLUMNS)
+    debit_col = _pick_column(fieldnames, DEBIT_COLUMNS)
+    if not date_col or not description_col or not (amount_col or debit_col):
+        raise StatementError("CSV needs date, description and amount (or debit) columns")
+
+    for row in reader:
+        if debit_col:
+            amount = parse_amount(row.get(debit_col))
+            amount = abs(amount) if amount else None
+        else:
+            amount = parse_amount(row.get(amount_col))
+            if amount is not None and negative_spend:
+                amount = -amount
+        date = parse_date(row.get(date_col))
+        if date is None or not amount or amount <= 0:
+            continue
+        yield Transaction(date, (row.get(description_col) or "").strip(), amount)
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def read_ofx_transactions(lines):
+    """Yield purchases (negative TRNAMT) from OFX 1.x SGML or 2.x XML lines."""
+    current = None
+    for line in lines:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    transaction = _ofx_transaction(current)
+                    if transaction is not None:
+                        yield transaction
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+def _ofx_transaction(fields):
+    amount = parse_amount(fields.get("TRNAMT"))
+    posted = fields.get("DTPOSTED", "")[:8]
+    if amount is None or amount >= 0 or len(posted) < 8:
+        return None
+    try:
+        date = datetime.strptime(posted, "%Y%m%d").date()
+    except ValueError:
+        return None
+    description = fields.get("NAME") or fields.get("MEMO") or ""
+    return Transaction(date, description, -amount)
+
+
+def read_transactions(stream, filename="", negative_spend=False):
+    """Yield purchases from an uploaded binary stream, CSV or OFX by name or content."""
+    lines = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    first = next(lines, "")
+    lines = chain([first], lines)
+    is_ofx = filename.lower().endswith((".ofx", ".qfx")) or first.lstrip().upper().startswith(
+        ("OFXHEADER", "<?XML", "<OFX")
+    )
+    if is_ofx:
+        return read_ofx_transactions(lines)
+    return read_csv_transactions(lines, negative_spend=negative_spend)
+
+
+class MonthlySpending:
+    """Running per-month, per-category purchase totals."""
+
+    def __init__(self):
+        self.months = {}
+        self.transactions = 0
+
+    def add(self, month, category_id, amount):
+        totals = self.months.setdefault(month, {})
+        totals[category_id] = totals.get(category_id, 0.0) + amount
+        self.transactions += 1
+
+    def average(self):
+        """Mean monthly spend per category over the months seen, in dollars."""
+        if not self.months:
+            return {}
+        sums = {}
+        for totals in self.months.values():
+            for category_id, amount in totals.items():
+                sums[category_id] = sums.get(category_id, 0.0) + amount
+        return {category_id: round(total / len(self.months), 2) for category_id, total in sums.items()}
+
+
+def aggregate_spending(transactions, classifier, chunk_size=4096):
+    """Classify each purchase and total it by month ("YYYY-MM") and category."""
+    spending = MonthlySpending()
+    transactions = iter(transactions)
+    while True:
+        chunk = list(islice(transactions, chunk_size))
+        if not chunk:
+            return spending
+        category_ids = classifier.classify_many([transaction.description for transaction in chunk])
+        for transaction, category_id in zip(chunk, category_ids.tolist()):
+            month = f"{transaction.date.year:04d}-{transaction.date.month:02d}"
+            spending.add(month, category_id if category_id >= 0 else None, transaction.amount)
@@ -1,51 +1,79 @@
-import pytest
+import atexit
 import os
+import shutil
 import sys
+import tempfile
+import uuid
+
+import pytest
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app, engine, Session
-from models import DbBase, Client
-from config import Config
+# Point the app at a throwaway database before it is imported, so tests never
+# touch clients.db; the first request copies the prebuilt catalog into it.
+_test_dir = tempfile.mkdtemp(prefix="deed-tests-")
+atexit.register(shutil.rmtree, _test_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_dir, 'clients.db')}"
+os.environ["MERCHANT_INDEX_DIR"] = os.path.join(_test_dir, "merchant-index")
+
+from app import app  # noqa: E402
+from config import Config  # noqa: E402
+
 
 class TestConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
 
+
 @pytest.fixture
 def client():
     app.config.from_object(TestConfig)
-    
-    # Use an in-memory database for testing
-    # Note: Since app.py uses a global engine, we might need a way to override it 
-    # or just use a separate test db file if the architecture makes dependency injection hard.
-    # Given the structure, we will update the engine URL for the session maker if possible
-    # or just rely on a test_db file.
-    
-    # For this simple setup, let's just use a separate test.db
-    app.config['DB_URI'] = "sqlite:///test_clients.db"
-    
-    # Create tables
-    from sqlalchemy import create_engine
-    test_engine = create_engine(app.config['DB_URI'])
-    DbBase.metadata.create_all(test_engine)
-    
-    # Patch the session to use our test engine
-    # In a real app we'd use dependency injection, but here we can try to patch or just use the file
-    # app.py's Session is bound to 'engine'.
-    
     with app.test_client() as client:
         with app.app_context():
             yield client
-    
-    # Cleanup
-    DbBase.metadata.drop_all(test_engine)
-    if os.path.exists("test_clients.db"):
-        os.remove("test_clients.db")
+
+
+@pytest.fixture
+def user_client(client):
+    """The test client logged in as a new verified user; yields (client, user id)."""
+    import app as app_module
+    from models import Client
+
+    app_module.database()
+    with app_module.Session() as session:
+        user = Client(first_name="Test", surname="User", email=f"user-{uuid.uuid4().hex}@deed.com", is_verified=True)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    with client.session_transaction() as flask_session:
+        flask_session["_user_id"] = str(user_id)
+        flask_session["_fresh"] = True
+    yield client, user_id
+
+
+@pytest.fixture
+def session_factory():
+    """A sessionmaker bound to an empty in-memory database with the full schema."""
+    from sqlalchemy.orm import sessionmaker
+
+    from db_engine import create_db_engine
+    from models import DbBase
+
+    engine = create_db_engine("sqlite://", environ={})
+    DbBase.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(session_factory):
+    """A session from session_factory."""
+    with session_factory() as session:
+        yield session
+
 
 @pytest.fixture
 def init_database():
     # Helper to setup initial data
-    yield 
+    yield
@@ -0,0 +1,113 @@
+import pytest
+
+import advice
+from catalog import load_catalog
+from models import (
+    CardBonus, Client, CreditCard, SpendingCategory, Subscription, UserCard, UserRecommendation,
+    UserSubscription,
+)
+
+
+@pytest.fixture
+def db_session(db_session):
+    db_session.add_all([
+        Client(id=1, email="a@example.com"),
+        SpendingCategory(id=1, name="Groceries"),
+        SpendingCategory(id=2, name="Gas"),
+        CreditCard(id=1, name="Basic", bank="B", base_earn_rate=1.0),
+        CreditCard(id=2, name="Grocer", bank="B", base_earn_rate=1.0),
+        CardBonus(credit_card_id=2, category_id=1, earn_rate=5.0),
+        Subscription(id=1, name="Spotify Premium", monthly_cost_cad=11.99),
+        UserCard(client_id=1, credit_card_id=1),
+        UserSubscription(client_id=1, subscription_id=1),
+    ])
+    db_session.commit()
+    return db_session
+
+
+def test_profile_round_trip_and_change_detection(db_session):
+    catalog = load_catalog(db_session)
+
+    assert advice.save_spending_profile(db_session, catalog, 1, {"1": 400, "2": 0, "99": 50}) is True
+    db_session.commit()
+    assert advice.load_spending_profile(db_session, 1) == {"1": 400.0}
+    assert advice.save_spending_profile(db_session, catalog, 1, {"1": 400.0}) is False
+
+
+def test_no_profile_means_no_recommendation(db_session):
+    assert advice.get_user_recommendation(db_session, load_catalog(db_session), 1) is None
+    assert db_session.query(UserRecommendation).count() == 0
+
+
+def test_stale_and_catalog_changes_recompute(db_session):
+    catalog = load_catalog(db_session)
+    advice.save_spending_profile(db_session, catalog, 1, {"1": 1000})
+    advice.refresh_user_recommendation(db_session, catalog, 1)
+    db_session.commit()
+
+    stored = advice.get_user_recommendation(db_session, catalog, 1)
+    assert stored["total_points"] == 1000
+    assert stored["coverage"][0]["can_cover"] is False
+
+    # Wallet change: the next read recomputes with the new card
+    db_session.add(UserCard(client_id=1, credit_card_id=2))
+    advice.mark_recommendation_stale(db_session, 1)
+    db_session.commit()
+    stored = advice.get_user_recommendation(db_session, catalog, 1)
+    assert stored["total_points"] == 5000
+    assert stored["results"][0]["card"] == "Grocer"
+
+    # Catalog change: a new fingerprint invalidates the stored answer
+    db_session.query(CardBonus).update({"earn_rate": 2.0})
+    db_session.commit()
+    new_catalog = load_catalog(db_session)
+    assert new_catalog.fingerprint != catalog.fingerprint
+    assert advice.get_user_recommendation(db_session, new_catalog, 1)["total_points"] == 2000
+
+
+def test_repeated_calculate_points_only_reads_the_profile(user_client):
+    import app as app_module
+    from sqlalchemy import event
+
+    client, user_id = user_client
+    with app_module.Session() as session:
+        session.add(UserCard(client_id=user_id, credit_card_id=1))
+        session.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(app_module.engine, "before_cursor_execute", count)
+    try:
+        assert client.post("/calculate-points", json={"spending": {"1": 400}}).status_code == 200
+        assert statements
+        statements.clear()
+        assert client.post("/calculate-points", json={"spending": {"1": 400}}).status_code == 200
+        assert len(statements) == 1 and statements[0].lstrip().upper().startswith("SELECT")
+
+        # Only unknown categories left: the profile and its stored answer both go
+        assert client.post("/calculate-points", json={"spending": {"9999": 50}}).status_code == 200
+    finally:
+        event.remove(app_module.engine, "before_cursor_execute", count)
+    with app_module.Session() as session:
+        assert session.query(UserRecommendation).filter_by(client_id=user_id).count() == 0
+        assert advice.load_spending_profile(session, user_id) == {}
+
+
+def test_profile_saved_by_another_worker_is_not_mistaken_for_ours(user_client):
+    import app as app_module
+
+    client, user_id = user_client
+    assert client.post("/calculate-points", json={"spending": {"1": 400}}).status_code == 200
+    # Another process saves different inputs; this one's memory still holds the first
+    with app_module.Session() as session:
+        catalog = app_module.get_catalog(app_module.Session)
+        advice.save_profile_answer(session, catalog, user_id, {"2": 100}, {"total_points": 0})
+        session.commit()
+
+    assert client.post("/calculate-points", json={"spending": {"1": 400}}).status_code == 200
+
+    with app_module.Session() as session:
+        assert advice.load_spending_profile(session, user_id) == {"1": 400.0}
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+import catalog
+from models import CreditCard, SpendingCategory, CardBonus, Subscription
+
+
+@pytest.fixture
+def catalog_session(session_factory):
+    with session_factory() as session:
+        session.add_all([
+            SpendingCategory(id=1, name="Groceries"),
+            SpendingCategory(id=2, name="Gas"),
+            CreditCard(id=1, name="Flat Card", bank="RBC", base_earn_rate=1.0),
+            CreditCard(id=2, name="Retired Card", bank="TD", base_earn_rate=2.0, is_active=False),
+            Subscription(id=1, name="Netflix Standard", monthly_cost_cad=16.49),
+        ])
+        session.commit()
+    catalog.invalidate_catalog()
+    yield session_factory
+    catalog.invalidate_catalog()
+
+
+def test_snapshot_contents(catalog_session):
+    snapshot = catalog.get_catalog(catalog_session)
+
+    assert [card.name for card in snapshot.active_cards] == ["Flat Card"]
+    assert snapshot.cards_by_id[2].name == "Retired Card"
+    assert snapshot.subscriptions_by_id[1].monthly_cost_cad == 16.49
+    assert [cat.name for cat in snapshot.categories] == ["Groceries", "Gas"]
+    assert snapshot.earn_rates.version == snapshot.version
+
+
+def test_catalog_commit_reloads_snapshot(catalog_session):
+    first = catalog.get_catalog(catalog_session)
+    assert catalog.get_catalog(catalog_session) is first
+
+    with catalog_session() as session:
+        session.add(CardBonus(credit_card_id=1, category_id=2, earn_rate=3.0))
+        session.commit()
+
+    reloaded = catalog.get_catalog(catalog_session)
+    assert reloaded.version > first.version
+    assert reloaded.earn_rates.best_card([1], 2) == (1, 3.0)
+
+
+def test_concurrent_misses_load_once(catalog_session, monkeypatch):
+    loads = []
+    real_load = catalog.load_catalog
+
+    def counting_load(session, version=0):
+        loads.append(version)
+        return real_load(session, version=version)
+
+    monkeypatch.setattr(catalog, "load_catalog", counting_load)
+    threads = [threading.Thread(target=catalog.get_catalog, args=(catalog_session,)) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
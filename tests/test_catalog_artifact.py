@@ -0,0 +1,76 @@
+import sqlite3
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import catalog
+from catalog_artifact import build_catalog_artifact, install_catalog_artifact, sqlite_file_path
+from migrations import run_migrations
+from seed_data import seed_catalog
+
+
+def _catalog_contents(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with sessionmaker(bind=engine)() as session:
+        snapshot = catalog.load_catalog(session)
+    engine.dispose()
+    names = snapshot.earn_rates.card_names
+    categories = snapshot.earn_rates.category_names
+    bonuses = {
+        (names[card.id], categories[category.id]): float(snapshot.earn_rates.rates[card.id, category.id])
+        for card in snapshot.cards for category in snapshot.categories
+    }
+    return [card.name for card in snapshot.cards], [sub.name for sub in snapshot.subscriptions], bonuses
+
+
+def test_artifact_matches_running_the_seeds(tmp_path):
+    artifact = tmp_path / "catalog.db"
+    counts = build_catalog_artifact(str(artifact))
+
+    seeded = tmp_path / "seeded.db"
+    engine = create_engine(f"sqlite:///{seeded}")
+    run_migrations(engine)
+    seed_catalog(sessionmaker(bind=engine))
+    engine.dispose()
+
+    assert counts["card"] > 0
+    assert _catalog_contents(artifact) == _catalog_contents(seeded)
+
+
+def test_artifact_is_compact_and_analyzed(tmp_path):
+    artifact = tmp_path / "catalog.db"
+    build_catalog_artifact(str(artifact))
+
+    conn = sqlite3.connect(str(artifact))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+        assert conn.execute("SELECT COUNT(*) FROM user_card").fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert [path.name for path in tmp_path.iterdir()] == ["catalog.db"]
+
+
+def test_install_only_creates_missing_databases(tmp_path):
+    artifact = tmp_path / "catalog.db"
+    build_catalog_artifact(str(artifact))
+    target = tmp_path / "data" / "clients.db"
+
+    assert install_catalog_artifact(str(target), str(artifact))
+    assert target.read_bytes() == artifact.read_bytes()
+
+    target.write_bytes(b"user data")
+    assert not install_catalog_artifact(str(target), str(artifact))
+    assert target.read_bytes() == b"user data"
+
+    empty = tmp_path / "empty.db"
+    empty.touch()
+    assert install_catalog_artifact(str(empty), str(artifact))
+    assert not install_catalog_artifact(str(tmp_path / "other.db"), str(tmp_path / "missing.db"))
+
+
+def test_sqlite_file_path():
+    assert sqlite_file_path("sqlite:////tmp/clients.db") == "/tmp/clients.db"
+    assert sqlite_file_path("sqlite://") is None
+    assert sqlite_file_path("postgresql://user@host/deed") is None
@@ -0,0 +1,151 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+import catalog
+from catalog_loader import CatalogLoadError, load_catalog_files, load_catalog_records, read_catalog_file
+from models import CardBonus, Client, CreditCard, Subscription, UserSubscription
+from user_summary import get_user_summary, refresh_user_summary
+
+
+@pytest.fixture
+def Session(session_factory):
+    catalog.invalidate_catalog()
+    yield session_factory
+    catalog.invalidate_catalog()
+
+
+def _write_catalog(tmp_path):
+    (tmp_path / "cards.csv").write_text(
+        "name,bank,annual_fee,base_earn_rate,point_value_cents,is_active\n"
+        "Gold,Scotia,120,1,1,true\n"
+        "Cash,RBC,0,1,1,yes\n"
+    )
+    records = [
+        {"type": "category", "name": "Groceries"},
+        {"type": "category", "name": "Gas"},
+        {"type": "subscription", "name": "Netflix", "monthly_cost_cad": 16.49},
+        {"type": "bonus", "card": "Gold", "category": "Groceries", "earn_rate": 5},
+        {"type": "bonus", "card": "Cash", "category": "Gas", "earn_rate": "2"},
+    ]
+    (tmp_path / "catalog.jsonl").write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    return [str(tmp_path / "catalog.jsonl"), str(tmp_path / "cards.csv")]
+
+
+def test_load_files_then_reload_is_unchanged(Session, tmp_path):
+    paths = _write_catalog(tmp_path)
+
+    diff = load_catalog_files(Session, paths)
+    assert diff.added["card"] == ["Gold", "Cash"]
+    assert diff.added["bonus"] == ["Gold / Groceries", "Cash / Gas"]
+    assert diff.revision == 1
+
+    snapshot = catalog.get_catalog(Session)
+    gold = next(card for card in snapshot.cards if card.name == "Gold")
+    groceries = next(category for category in snapshot.categories if category.name == "Groceries")
+    assert snapshot.earn_rates.rates[gold.id, groceries.id] == 5.0
+    assert snapshot.revision == 1
+
+    again = load_catalog_files(Session, paths)
+    assert not again.changed
+    assert again.unchanged == {"category": 2, "card": 2, "subscription": 1, "bonus": 2}
+    assert again.revision is None
+
+
+def test_updates_are_reported_and_invalidate_the_cache(Session, tmp_path):
+    load_catalog_files(Session, _write_catalog(tmp_path))
+    before = catalog.get_catalog(Session)
+
+    (tmp_path / "update.json").write_text(json.dumps({
+        "cards": [{"name": "Gold", "annual_fee": 150}],
+        "bonuses": [{"card": "Gold", "category": "Groceries", "earn_rate": 6},
+                    {"card": "Missing", "category": "Gas", "earn_rate": 1}],
+    }))
+    diff = load_catalog_files(Session, [str(tmp_path / "update.json")])
+
+    assert diff.updated["card"] == {"Gold": {"annual_fee": (120.0, 150.0)}}
+    assert diff.updated["bonus"] == {"Gold / Groceries": {"earn_rate": (5.0, 6.0)}}
+    assert diff.unresolved == [("Missing", "Gas")]
+    assert diff.revision == 2
+    assert "  ~ Gold: annual_fee 120.0 -> 150.0" in diff.summary()
+
+    after = catalog.get_catalog(Session)
+    assert after.version > before.version
+    assert after.cards_by_id[1].annual_fee == 150.0
+
+
+def test_repricing_refreshes_subscriber_summaries(Session, tmp_path):
+    load_catalog_files(Session, _write_catalog(tmp_path))
+    with Session() as session:
+        netflix = session.query(Subscription).filter_by(name="Netflix").one()
+        session.add_all([Client(id=1, email="a@example.com"), Client(id=2, email="b@example.com"),
+                         UserSubscription(client_id=1, subscription_id=netflix.id)])
+        session.flush()
+        refresh_user_summary(session, 1)
+        refresh_user_summary(session, 2)
+        session.commit()
+
+    (tmp_path / "price.json").write_text(json.dumps({"subscriptions": [{"name": "Netflix", "monthly_cost_cad": 20}]}))
+    load_catalog_files(Session, [str(tmp_path / "price.json")])
+
+    with Session() as session:
+        assert get_user_summary(session, 1).monthly_cost_cad == 20.0
+        assert get_user_summary(session, 1).points_needed == 2000
+        assert get_user_summary(session, 2).monthly_cost_cad == 0
+
+
+def test_dry_run_rolls_back(Session, tmp_path):
+    diff = load_catalog_files(Session, _write_catalog(tmp_path), dry_run=True)
+
+    assert diff.changed
+    with Session() as session:
+        assert session.query(CreditCard).count() == 0
+
+
+def test_large_load_is_batched(Session):
+    records = [("category", {"name": f"Category {i}"}) for i in range(5)]
+    records += [("card", {"name": f"Card {i}", "bank": "Bank"}) for i in range(2000)]
+    records += [("bonus", {"card": f"Card {i}", "category": f"Category {i % 5}", "earn_rate": 2})
+                for i in range(2000)]
+
+    with Session() as session:
+        statements = []
+        event.listen(session.get_bind(), "before_cursor_execute",
+                     lambda *args: statements.append(args[2]))
+        diff = load_catalog_records(session, records, batch_size=500)
+        session.commit()
+
+    assert len(diff.added["card"]) == 2000
+    # A few reads up front, then a handful per 500-row batch rather than one per row
+    assert len(statements) < 40
+    with Session() as session:
+        assert session.query(CardBonus).count() == 2000
+
+
+def test_revision_bumped_elsewhere_reloads_the_snapshot(Session, monkeypatch):
+    snapshot = catalog.get_catalog(Session)
+    with Session() as session:
+        load_catalog_records(session, [("category", {"name": "Travel"})])
+        session.commit()  # committed without invalidate_catalog(), like another process
+
+    monkeypatch.setattr(catalog, "REVISION_CHECK_SECONDS", 1e-9)
+    monkeypatch.setattr(catalog, "_next_revision_check", 0.0)
+    reloaded = catalog.get_catalog(Session)
+
+    assert reloaded is not snapshot
+    assert [category.name for category in reloaded.categories] == ["Travel"]
+
+
+def test_bad_records_are_rejected(Session, tmp_path):
+    with Session() as session:
+        with pytest.raises(CatalogLoadError):
+            load_catalog_records(session, [("card", {"name": "X", "colour": "red"})])
+        with pytest.raises(CatalogLoadError):
+            load_catalog_records(session, [("card", {"name": "X", "annual_fee": "free"})])
+        with pytest.raises(CatalogLoadError):
+            load_catalog_records(session, [("subscription", {"name": "No price"})])
+
+    (tmp_path / "widgets.csv").write_text("name\nx\n")
+    with pytest.raises(CatalogLoadError):
+        list(read_catalog_file(str(tmp_path / "widgets.csv")))
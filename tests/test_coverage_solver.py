@@ -0,0 +1,43 @@
+import random
+from itertools import combinations
+
+import numpy as np
+
+from coverage_solver import CoverageSolver, solve_coverage
+
+
+def _brute_force_best(points_available, points_needed):
+    best = 0
+    for r in range(len(points_needed) + 1):
+        for combo in combinations(points_needed, r):
+            if best < sum(combo) <= points_available:
+                best = sum(combo)
+    return best
+
+
+def test_beats_greedy_database_order():
+    # Greedy in order would take 1100 and strand the rest of the points
+    flags = solve_coverage(2000, [1100, 1000, 999])
+    assert flags == [False, True, True]
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        needed = [rng.choice([129, 279, 999, 1199, 1649, 2099, 2800]) for _ in range(rng.randint(0, 8))]
+        available = rng.randint(0, 9000)
+        flags = solve_coverage(available, needed)
+        spent = sum(p for p, f in zip(needed, flags) if f)
+        assert spent <= available
+        assert spent == _brute_force_best(available, needed)
+
+
+def test_solve_many_agrees_with_solve():
+    needed = [1199, 1199, 1649, 2800, 399, 0]
+    solver = CoverageSolver(needed)
+    totals = np.array([0, 398, 1200, 2848, 4000, 10000])
+
+    covered = solver.solve_many(totals)
+    for row, total in zip(covered, totals):
+        assert tuple(row) == solver.solve(total)
+    assert covered[:, -1].all()
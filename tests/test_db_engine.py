@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from db_engine import create_db_engine, engine_options, sqlite_pragmas
+
+
+def test_sqlite_file_gets_wal_and_pragmas(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}", environ={"SQLITE_BUSY_TIMEOUT_MS": "2500"})
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+    assert isinstance(engine.pool, QueuePool)
+    engine.dispose()
+
+
+def test_memory_sqlite_uses_one_shared_connection():
+    engine = create_db_engine("sqlite://", environ={})
+    assert isinstance(engine.pool, StaticPool)
+
+
+def test_other_backends_skip_sqlite_arguments():
+    options = engine_options("postgresql://user:pw@localhost/deed", environ={"DB_POOL_SIZE": "20"})
+    assert "connect_args" not in options
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+
+
+def test_rejects_unknown_journal_mode():
+    with pytest.raises(ValueError):
+        sqlite_pragmas({"SQLITE_JOURNAL_MODE": "bogus"})
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from models import CreditCard, SpendingCategory, CardBonus
+from catalog import load_catalog
+
+
+@pytest.fixture
+def catalog_session(session_factory):
+    with session_factory() as session:
+        session.add_all([
+            SpendingCategory(id=1, name="Groceries"),
+            SpendingCategory(id=2, name="Gas"),
+            CreditCard(id=1, name="Flat Card", bank="RBC", base_earn_rate=1.0),
+            CreditCard(id=2, name="Grocery Card", bank="BMO", base_earn_rate=0.5),
+            CardBonus(credit_card_id=2, category_id=1, earn_rate=5.0),
+        ])
+        session.commit()
+    return session_factory
+
+
+def test_bonus_rate_beats_base_rate(catalog_session):
+    with catalog_session() as session:
+        matrix = load_catalog(session).earn_rates
+
+    assert matrix.best_card([1, 2], 1) == (2, 5.0)
+    # No bonus on gas, so the higher base rate wins
+    assert matrix.best_card([1, 2], 2) == (1, 1.0)
+    assert matrix.best_card([], 1) == (None, 0.0)
+    assert not matrix.has_category(99)
+
+
+def test_score_scenarios_matches_single_lookups(catalog_session):
+    with catalog_session() as session:
+        matrix = load_catalog(session).earn_rates
+
+    spending = np.array([
+        [100.0, 40.0, 10.0],
+        [0.0, 15.5, 10.0],
+    ])
+    best_cards, best_rates, points = matrix.score_scenarios([1, 2], [1, 2, 99], spending)
+
+    assert best_cards.tolist() == [2, 1, -1]
+    assert best_rates.tolist() == [5.0, 1.0, 0.0]
+    assert points.tolist() == [[500, 40, 0], [0, 15, 0]]
+
+
+@pytest.fixture
+def wallet_client(user_client):
+    """A logged-in user holding catalog card 1 (1x base, 1.25x travel) and tracking Netflix (16.49)."""
+    import app as app_module
+    from models import UserCard, UserSubscription
+
+    client, user_id = user_client
+    with app_module.Session() as session:
+        session.add_all([UserCard(client_id=user_id, credit_card_id=1),
+                         UserSubscription(client_id=user_id, subscription_id=3)])
+        session.commit()
+    return client
+
+
+def test_batch_endpoint_scores_every_scenario(wallet_client):
+    response = wallet_client.post("/calculate-points/batch", json={
+        "categories": [1, 4],
+        "spending": [[400, 800], [1000, 1000], [0, 0]],
+    })
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [(c["id"], c["rate"]) for c in data["categories"]] == [(1, 1.0), (4, 1.25)]
+    assert [sub["name"] for sub in data["subscriptions"]] == ["Netflix Standard"]
+    assert [row["points"] for row in data["scenarios"]] == [[400, 1000], [1000, 1250], [0, 0]]
+    assert [row["total_points"] for row in data["scenarios"]] == [1400, 2250, 0]
+    assert [row["can_cover"] for row in data["scenarios"]] == [[False], [True], [False]]
+    assert data["scenarios"][2]["cards"] == [None, None]
+
+
+@pytest.mark.parametrize("body", [[1, 2], "spending", 7, {"categories": "14", "spending": [[1, 2]]},
+                                  {"categories": [1], "spending": {"1": 400}}])
+def test_batch_endpoint_rejects_malformed_bodies(wallet_client, body):
+    assert wallet_client.post("/calculate-points/batch", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("body", [
+    {"categories": ["groceries"], "spending": [[1]]},
+    {"categories": [1, 4], "spending": [[1, "lots"]]},
+    {"categories": [1, 4], "spending": [[1], [1, 2]]},
+    {"categories": [1, 4], "spending": [[1, 2, 3]]},
+    {"categories": [1, 4], "spending": [[1, None]]},
+])
+def test_batch_endpoint_rejects_invalid_items(wallet_client, body):
+    response = wallet_client.post("/calculate-points/batch", json=body)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,167 @@
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from flask_mail import Mail
+
+from email_outbox import (
+    FlaskMailTransport, OutboxWorker, enqueue_email, enqueue_verification_email, retry_delay,
+)
+from models import EmailOutbox
+
+
+class FakeTransport:
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.connections = 0
+        self.sent = []
+
+    def connect(self):
+        transport = self
+
+        class _Conn:
+            def __enter__(self):
+                transport.connections += 1
+                return self.send
+
+            def __exit__(self, *exc):
+                return False
+
+            def send(self, email):
+                if email.recipient in transport.fail_for:
+                    raise RuntimeError("mailbox unavailable")
+                transport.sent.append(email.recipient)
+
+        return _Conn()
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+
+def _enqueue(session_factory, clock, *recipients):
+    with session_factory() as session:
+        for recipient in recipients:
+            email = enqueue_email(session, recipient, "Hi", "Hello")
+            email.next_attempt_at = clock.now
+        session.commit()
+
+
+def test_retry_delay_doubles_and_caps():
+    assert retry_delay(1) == timedelta(seconds=30)
+    assert retry_delay(3) == timedelta(seconds=120)
+    assert retry_delay(20) == timedelta(hours=1)
+
+
+def test_batch_shares_one_connection(session_factory):
+    clock = Clock()
+    _enqueue(session_factory, clock, "a@example.com", "b@example.com", "c@example.com")
+    transport = FakeTransport()
+    worker = OutboxWorker(session_factory, transport, clock=clock)
+
+    assert worker.drain_once() == 3
+    assert transport.connections == 1
+    assert transport.sent == ["a@example.com", "b@example.com", "c@example.com"]
+    assert worker.drain_once() == 0
+    with session_factory() as session:
+        assert {e.status for e in session.query(EmailOutbox)} == {"sent"}
+
+
+def test_failures_back_off_then_give_up(session_factory):
+    clock = Clock()
+    _enqueue(session_factory, clock, "ok@example.com", "bad@example.com")
+    worker = OutboxWorker(session_factory, FakeTransport(fail_for={"bad@example.com"}), max_attempts=2, clock=clock)
+
+    assert worker.drain_once() == 2
+    with session_factory() as session:
+        bad = session.query(EmailOutbox).filter_by(recipient="bad@example.com").one()
+        assert (bad.status, bad.attempts) == ("pending", 1)
+        assert bad.next_attempt_at == clock.now + retry_delay(1)
+        assert "mailbox unavailable" in bad.last_error
+
+    # Not due again until the backoff has passed
+    assert worker.drain_once() == 0
+    clock.now += retry_delay(1)
+    assert worker.drain_once() == 1
+    with session_factory() as session:
+        bad = session.query(EmailOutbox).filter_by(recipient="bad@example.com").one()
+        assert (bad.status, bad.attempts) == ("failed", 2)
+
+
+def test_claimed_rows_are_leased(session_factory):
+    clock = Clock()
+    _enqueue(session_factory, clock, "a@example.com")
+    worker = OutboxWorker(session_factory, FakeTransport(), clock=clock)
+
+    assert len(worker.claim_batch()) == 1
+    # A second worker polling before delivery finishes doesn't get the row
+    assert worker.claim_batch() == []
+
+
+def test_flask_mail_transport_reuses_smtp_connection(session_factory):
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.ehlo = 0
+            self.messages = []
+
+        async def handle_EHLO(self, server, session, envelope, hostname, responses):
+            self.ehlo += 1
+            session.host_name = hostname
+            return responses
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages.append(envelope.rcpt_tos)
+            return "250 OK"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        app = Flask(__name__)
+        app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=port,
+                          MAIL_DEFAULT_SENDER="noreply@deed.com")
+        mail = Mail(app)
+        with session_factory() as session:
+            for recipient in ("a@example.com", "b@example.com"):
+                enqueue_verification_email(session, recipient, "123456", "Ada")
+            session.commit()
+
+        worker = OutboxWorker(session_factory, FlaskMailTransport(app, mail), clock=lambda: datetime.utcnow() + timedelta(seconds=1))
+        assert worker.drain_once() == 2
+    finally:
+        controller.stop()
+
+    assert handler.messages == [["a@example.com"], ["b@example.com"]]
+    assert handler.ehlo == 1
+
+
+def test_signup_on_serverless_delivers_when_the_response_closes(client, monkeypatch):
+    import app as app_module
+    from passwords import PasswordHasher
+
+    monkeypatch.setattr(app_module, "deliver_emails_on_response", True)
+    monkeypatch.setattr(app_module, "password_hasher", PasswordHasher(workers=0, rounds=4))
+    response = client.post("/signup", data={
+        "first_name": "Ada", "surname": "Lovelace", "email": "ada@deed.com",
+        "password": "analytical", "confirm": "analytical",
+    })
+    assert response.status_code == 302
+
+    def status():
+        with app_module.Session() as session:
+            return session.query(EmailOutbox.status).filter_by(recipient="ada@deed.com").scalar()
+
+    assert status() == "pending"
+    response.close()
+    assert status() == "sent"
+    assert not app_module.outbox_workers()._threads
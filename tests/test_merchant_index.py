@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+
+from catalog import CategoryInfo
+from merchant_index import MERCHANT_KEYWORDS, MerchantIndex, flatten_rules, load_merchant_index
+
+CATEGORIES = [CategoryInfo(i, name, None, None) for i, (name, _) in enumerate(MERCHANT_KEYWORDS, start=1)]
+CATEGORIES.append(CategoryInfo(99, "Other", None, None))
+
+
+def naive_classify(description):
+    """First keyword in dictionary order contained in the description."""
+    text = description.lower()
+    ids = {c.name: c.id for c in CATEGORIES}
+    for keyword, name in flatten_rules():
+        if keyword.startswith("^") and text.startswith(keyword[1:]):
+            return ids[name]
+        if not keyword.startswith("^") and keyword in text:
+            return ids[name]
+    return 99
+
+
+def test_matches_first_rule_like_substring_scan():
+    rng = random.Random(7)
+    keywords = [keyword.lstrip("^") for keyword, _ in flatten_rules()]
+    descriptions = [
+        " ".join(rng.choice(keywords + ["store", "#1234", "halifax", "ns", "*trip"]) for _ in range(rng.randint(0, 4))).upper()
+        for _ in range(2000)
+    ]
+    classifier = MerchantIndex.compile().classifier(CATEGORIES)
+
+    assert classifier.classify_many(descriptions).tolist() == [naive_classify(d) for d in descriptions]
+
+
+def test_prefix_anchor_and_mcc_override():
+    classifier = MerchantIndex.compile().classifier(CATEGORIES)
+    ids = {c.name: c.id for c in CATEGORIES}
+
+    assert classifier.classify("UBER *TRIP HELP.UBER.COM") == ids["Transit"]
+    assert classifier.classify("UBER EATS TORONTO") == ids["Dining"]
+    assert classifier.classify("SOBEYS #1234 HALIFAX") == ids["Groceries"]
+    assert classifier.classify("Café Ünïcode") == ids["Other"]
+    assert classifier.classify("UNKNOWN SHOP", mcc=5411) == ids["Groceries"]
+    assert classifier.classify("SOBEYS #1234", mcc=1) == ids["Groceries"]
+
+
+def test_disk_cache_is_memory_mapped(tmp_path):
+    first = load_merchant_index(cache_dir=str(tmp_path))
+    second = load_merchant_index(cache_dir=str(tmp_path))
+
+    assert len(list(tmp_path.glob("merchant-*.npy"))) == 2
+    assert isinstance(second.transitions, np.memmap)
+    assert np.array_equal(first.transitions, MerchantIndex.compile().transitions)
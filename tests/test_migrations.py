@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, inspect, text
+
+from migrations import MIGRATIONS, get_schema_version, run_migrations
+
+
+def test_upgrades_existing_database_and_dedupes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # Tables as an older clients.db has them: no indexes, duplicate wallet rows
+        conn.execute(text(
+            "CREATE TABLE user_card (id INTEGER PRIMARY KEY, client_id INTEGER NOT NULL, "
+            "credit_card_id INTEGER NOT NULL, current_points INTEGER, last_updated DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO user_card (id, client_id, credit_card_id, current_points) "
+            "VALUES (1, 1, 5, 100), (2, 1, 5, 200), (3, 2, 5, 0)"
+        ))
+
+    applied = run_migrations(engine)
+
+    assert [version for version, _ in applied] == [version for version, _, _ in MIGRATIONS]
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+        assert conn.execute(text("SELECT id FROM user_card ORDER BY id")).scalars().all() == [1, 3]
+    index_names = {index["name"] for index in inspect(engine).get_indexes("user_card")}
+    assert "uq_user_card_client_card" in index_names
+
+    assert run_migrations(engine) == []
@@ -0,0 +1,82 @@
+import bcrypt
+import pytest
+
+from passwords import HasherBusy, PasswordHasher, calibrate_rounds, hash_rounds
+
+
+def test_calibration_doubles_until_target():
+    ticks = iter([0.0, 0.020])  # 20 ms at the minimum cost
+    timer = lambda: next(ticks)
+
+    assert calibrate_rounds(target_ms=100, min_rounds=4, max_rounds=16, timer=timer) == 6
+    ticks = iter([0.0, 0.5])
+    assert calibrate_rounds(target_ms=100, min_rounds=4, timer=timer) == 4
+
+
+def test_inline_hash_check_and_rehash():
+    hasher = PasswordHasher(workers=0, rounds=5)
+    pw_hash = hasher.hash_password("correct horse")
+
+    assert hash_rounds(pw_hash) == 5
+    assert hasher.check_password(pw_hash, "correct horse")
+    assert not hasher.check_password(pw_hash, "wrong")
+    assert not hasher.check_password(None, "correct horse")
+    assert not hasher.check_password("not-a-hash", "correct horse")
+    assert hasher.needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(4)).decode())
+    assert not hasher.needs_rehash(pw_hash)
+
+
+def test_long_passwords_use_first_72_bytes():
+    hasher = PasswordHasher(workers=0, rounds=4)
+    pw_hash = hasher.hash_password("a" * 100)
+
+    assert hasher.check_password(pw_hash, "a" * 72)
+
+
+def test_process_pool_round_trip():
+    hasher = PasswordHasher(workers=1, rounds=4)
+    try:
+        pw_hash = hasher.hash_password("secret")
+        assert hasher.check_password(pw_hash, "secret")
+        assert hasher.stats() == {"workers": 1, "rounds": 4, "in_flight": 0, "queue_depth": 0}
+    finally:
+        hasher.shutdown()
+
+
+def test_full_queue_raises_busy():
+    hasher = PasswordHasher(workers=1, rounds=4, max_pending=1, wait_seconds=0.01)
+    hasher._slots.acquire()
+
+    with pytest.raises(HasherBusy):
+        hasher.hash_password("secret")
+
+
+def test_env_floors_cost_and_hashes_inline_on_vercel():
+    hasher = PasswordHasher.from_env({"BCRYPT_ROUNDS": "10", "VERCEL": "1"})
+
+    assert hasher.rounds == 12
+    assert hasher.workers == 0
+    assert PasswordHasher.from_env({"VERCEL": "1", "BCRYPT_WORKERS": "2"}).workers == 2
+
+
+def test_pool_that_cannot_start_falls_back_to_inline(monkeypatch):
+    import passwords
+
+    def no_semaphores(max_workers):
+        raise OSError(38, "Function not implemented")
+
+    monkeypatch.setattr(passwords, "ProcessPoolExecutor", no_semaphores)
+    hasher = PasswordHasher(workers=2, rounds=4)
+
+    assert hasher.check_password(hasher.hash_password("secret"), "secret")
+    assert hasher.workers == 0
+    assert hasher.stats()["in_flight"] == 0
+
+
+def test_calibration_runs_through_the_hasher(monkeypatch):
+    hasher = PasswordHasher(workers=0)
+    calls = []
+    monkeypatch.setattr(hasher, "_run", lambda fn, *args: calls.append(fn) or 13)
+
+    assert hasher.rounds == 13
+    assert calls == [calibrate_rounds]
@@ -0,0 +1,30 @@
+from models import Client
+from principal import UserPrincipal
+
+
+def test_principal_carries_template_fields():
+    client = Client(id=3, first_name="Ada", surname="Lovelace", email="ada@example.com", is_verified=True)
+    principal = UserPrincipal.from_client(client)
+
+    assert principal.get_id() == "3"
+    assert principal.is_authenticated
+    assert (principal.first_name, principal.surname, principal.email) == ("Ada", "Lovelace", "ada@example.com")
+
+
+def test_verify_email_logs_in_a_principal(client):
+    import app as app_module
+
+    app_module.database()
+    with app_module.Session() as session:
+        user = Client(first_name="Ada", surname="Lovelace", email="verify@deed.com", password="x",
+                      is_verified=False, verification_code="123456")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    with client.session_transaction() as flask_session:
+        flask_session["pending_verification_user_id"] = user_id
+
+    response = client.post("/verify-email", data={"code": "123456"})
+
+    assert response.status_code == 302 and response.headers["Location"].endswith("/dashboard")
+    assert client.get("/dashboard").status_code == 200
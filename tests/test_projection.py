@@ -0,0 +1,67 @@
+import pytest
+
+from catalog import BonusInfo, CardInfo, CatalogSnapshot, CategoryInfo
+from earn_rates import build_earn_rate_matrix
+from projection import project_coverage
+
+
+
+@pytest.fixture
+def catalog():
+    cards = (
+        CardInfo(1, "Cash", "B", 0.0, "pts", 1.0, 1.0, None, True),
+        CardInfo(2, "Travel", "B", 0.0, "pts", 1.0, 2.0, None, True),
+    )
+    categories = (CategoryInfo(1, "Groceries", None, None), CategoryInfo(2, "Travel", None, None))
+    bonuses = [BonusInfo(1, 1, 4.0), BonusInfo(2, 2, 3.0)]
+    return CatalogSnapshot(1, cards, (), categories, build_earn_rate_matrix(cards, categories, bonuses))
+
+
+def test_categories_go_to_most_valuable_card(catalog):
+    # Groceries: 4 pts x 1c beats 1 pt x 2c; travel: 3 pts x 2c beats 1 pt x 1c
+    projection = project_coverage(catalog, [(1, 0), (2, 0)], {"1": 100, "2": 50}, [], months=3)
+
+    assert projection.monthly_earn.tolist() == [400, 150]
+    assert projection.points[:, 0].tolist() == [400, 800, 1200]
+    assert projection.value.tolist() == [7.0, 14.0, 21.0]
+
+
+def test_affordable_subscriptions_covered_and_redeemed(catalog):
+    subs = [(10, 20.0), (11, 5.0)]
+    projection = project_coverage(catalog, [(1, 300)], {"1": 100}, subs, months=4)
+
+    # $3 + $4 = $7 pays the $5 one in month 1; $20 is never reached
+    assert projection.first_covered == [None, 1]
+    assert projection.value.tolist() == pytest.approx([2.0, 1.0, 0.0, 4.0])
+    assert projection.covered[:, 1].tolist() == [True, True, True, False]
+    assert projection.points[-1].tolist() == [400]
+
+
+def test_redemption_covers_the_most_dollars(catalog):
+    # $55: the $50 subscription beats the cheaper $10 one
+    projection = project_coverage(catalog, [(1, 5500)], {}, [(10, 10.0), (11, 50.0)], months=1)
+
+    assert projection.covered[0].tolist() == [False, True]
+    assert projection.value.tolist() == pytest.approx([5.0])
+    assert projection.points[0].tolist() == [500]
+
+
+def test_months_are_bounded(catalog):
+    with pytest.raises(ValueError):
+        project_coverage(catalog, [], {}, [], months=37)
+
+
+def test_empty_wallet_projects_nothing(catalog):
+    projection = project_coverage(catalog, [], {"1": 100}, [(1, 9.99)], months=12)
+
+    assert projection.points.shape == (12, 0)
+    assert not projection.covered.any()
+    assert projection.first_covered == [None]
+
+
+def test_route_rejects_spending_that_is_not_an_object(user_client):
+    client, _ = user_client
+
+    response = client.post("/project-coverage", json={"spending": [1, 2]})
+    assert response.status_code == 400
+    assert client.post("/project-coverage", json={"months": 3}).status_code == 200
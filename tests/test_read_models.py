@@ -0,0 +1,25 @@
+from catalog import load_catalog
+from models import Client, CreditCard, Subscription, UserCard, UserSubscription
+from read_models import tracked_subscriptions, wallet_cards
+
+
+def test_rows_carry_catalog_entries_for_templates(db_session):
+    db_session.add_all([
+        Client(id=1, email="a@example.com"),
+        CreditCard(id=1, name="RBC ION Visa", bank="RBC"),
+        Subscription(id=1, name="Disney+", monthly_cost_cad=11.99),
+        Subscription(id=2, name="Crave", monthly_cost_cad=19.99),
+        UserCard(client_id=1, credit_card_id=1, current_points=250),
+        UserSubscription(client_id=1, subscription_id=1),
+        UserSubscription(client_id=1, subscription_id=2, is_active=False),
+    ])
+    db_session.commit()
+    catalog = load_catalog(db_session)
+
+    cards = wallet_cards(db_session, catalog, 1)
+    active = tracked_subscriptions(db_session, catalog, 1, active_only=True)
+    tracked = tracked_subscriptions(db_session, catalog, 1)
+
+    assert [(uc.credit_card.name, uc.current_points) for uc in cards] == [("RBC ION Visa", 250)]
+    assert [us.subscription.name for us in active] == ["Disney+"]
+    assert [us.subscription_id for us in tracked] == [1, 2]
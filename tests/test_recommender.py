@@ -0,0 +1,124 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_catalog
+from recommender import best_pairs, recommend_cards
+
+
+def make_catalog(n_cards, n_categories, rng):
+    return synthetic_catalog(
+        n_cards, n_categories, rng, annual_fees=(0, 0, 39, 120, 150), base_earn_rates=(1, 1, 1.5),
+        point_values=(0.5, 1, 1, 2), bonuses_per_card=1, inactive_every=7,
+    )
+
+
+def wallet_value(catalog, card_ids, spending):
+    """Annual dollars a set of cards earns on spending, net of fees (brute force)."""
+    total = 0.0
+    for category_id, amount in spending.items():
+        total += 12 * amount * max(
+            (catalog.earn_rates.rates[c, category_id] * catalog.cards_by_id[c].point_value_cents / 100
+             for c in card_ids), default=0.0)
+    return total - sum(catalog.cards_by_id[c].annual_fee for c in card_ids)
+
+
+def test_singles_and_pairs_match_brute_force():
+    rng = np.random.default_rng(3)
+    catalog = make_catalog(60, 8, rng)
+    spending = {str(c): float(rng.integers(0, 900)) for c in range(1, 9)}
+    numeric = {int(k): v for k, v in spending.items()}
+    wallet = [1, 2]
+    base = wallet_value(catalog, wallet, numeric)
+    candidates = [c.id for c in catalog.active_cards if c.id not in wallet]
+
+    singles, pairs = recommend_cards(catalog, wallet, spending, limit=5, pair_limit=3)
+
+    expected = sorted((wallet_value(catalog, wallet + [c], numeric) - base for c in candidates), reverse=True)
+    assert [s.annual_value for s in singles] == pytest.approx(expected[:5], abs=0.01)
+    expected_pairs = sorted(
+        (wallet_value(catalog, wallet + [a, b], numeric) - base for a, b in combinations(candidates, 2)),
+        reverse=True,
+    )
+    assert [p.annual_value for p in pairs] == pytest.approx(expected_pairs[:3], abs=0.01)
+
+
+def test_pair_search_prunes():
+    rng = np.random.default_rng(0)
+    gains = rng.random((2000, 10)) * (rng.random((2000, 10)) < 0.1)
+    annual = rng.random(10) * 10000
+    fees = rng.choice([0.0, 120.0], size=2000)
+    net = gains @ annual - fees
+
+    pairs = best_pairs(gains, annual, fees, net, 1)
+
+    a, b, value = pairs[0]
+    brute = np.maximum(gains[:, None, :], gains[None, :, :]) @ annual - fees[:, None] - fees[None, :]
+    np.fill_diagonal(brute, -np.inf)
+    assert value == pytest.approx(brute.max())
+
+
+def test_nothing_to_recommend_when_wallet_holds_everything():
+    catalog = make_catalog(3, 2, np.random.default_rng(1))
+
+    assert recommend_cards(catalog, [c.id for c in catalog.cards], {"1": 100}) == ([], [])
+
+
+SPENDING = {"1": 400, "4": 800}
+
+
+def test_route_ranks_cards_outside_the_wallet(user_client):
+    client, _ = user_client
+    assert client.post("/add-card/1").status_code == 302
+
+    response = client.post("/recommend-cards", json={"spending": SPENDING})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["cards"] and 1 not in [card["card_id"] for card in data["cards"]]
+    assert set(data["cards"][0]) == {"card_id", "name", "bank", "annual_fee", "annual_value", "gross_value",
+                                     "categories"}
+    values = [card["annual_value"] for card in data["cards"]]
+    assert values == sorted(values, reverse=True)
+    assert all(set(pair) == {"card_ids", "names", "annual_value"} for pair in data["pairs"])
+
+
+def test_route_falls_back_to_the_saved_profile(user_client):
+    client, _ = user_client
+    assert client.post("/calculate-points", json={"spending": SPENDING}).status_code == 200
+
+    saved = client.post("/recommend-cards", json={})
+
+    assert saved.status_code == 200
+    assert saved.get_json() == client.post("/recommend-cards", json={"spending": SPENDING}).get_json()
+
+
+def test_route_cache_is_dropped_by_wallet_changes(user_client, monkeypatch):
+    import app as app_module
+    from models import UserCard
+
+    client, user_id = user_client
+    calls = []
+
+    def counting_recommend_cards(*args, **kwargs):
+        calls.append(args[1])
+        return recommend_cards(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "recommend_cards", counting_recommend_cards)
+
+    first = client.post("/recommend-cards", json={"spending": SPENDING}).get_json()
+    client.post("/recommend-cards", json={"spending": SPENDING})
+    assert len(calls) == 1
+
+    top_card = first["cards"][0]["card_id"]
+    client.post(f"/add-card/{top_card}")
+    after_add = client.post("/recommend-cards", json={"spending": SPENDING}).get_json()
+    assert len(calls) == 2
+    assert top_card not in [card["card_id"] for card in after_add["cards"]]
+
+    with app_module.Session() as session:
+        user_card_id = session.query(UserCard.id).filter_by(client_id=user_id).scalar()
+    client.post("/update-points", json={"points": {str(user_card_id): 5000}})
+    client.post("/recommend-cards", json={"spending": SPENDING})
+    assert len(calls) == 3
@@ -0,0 +1,71 @@
+from result_cache import ResultCache, spending_fingerprint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fingerprint_ignores_key_order():
+    assert spending_fingerprint({"1": 100, "2": 50}) == spending_fingerprint({"2": 50, "1": 100})
+
+
+def test_hit_expiry_and_invalidation():
+    clock = FakeClock()
+    cache = ResultCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.put(1, "a", {"total_points": 10})
+    cache.put(2, "a", {"total_points": 20})
+
+    assert cache.get(1, "a") == {"total_points": 10}
+
+    cache.invalidate_user(1)
+    assert cache.get(1, "a") is None
+    assert cache.get(2, "a") == {"total_points": 20}
+
+    clock.now = 61
+    assert cache.get(2, "a") is None
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    cache.put(1, "a", 1)
+    cache.put(1, "b", 2)
+    cache.get(1, "a")
+    cache.put(1, "c", 3)
+
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "a") == 1
+    assert cache.get(1, "c") == 3
+
+
+
+def test_put_after_invalidation_is_dropped():
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation()
+    assert cache.get(1, "a") is None
+    # The wallet changes while the old rows are being turned into an answer
+    cache.invalidate_user(1)
+
+    assert cache.put(1, "a", "stale", generation) is False
+    assert cache.get(1, "a") is None
+    # Other users' reads aren't affected
+    assert cache.put(2, "a", "fresh", generation) is True
+    assert cache.put(1, "a", "fresh", cache.generation()) is True
+    assert cache.get(1, "a") == "fresh"
+
+
+def test_invalidation_bookkeeping_stays_bounded():
+    cache = ResultCache(max_entries=3, ttl_seconds=60)
+    generation = cache.generation()
+    cache.put(1, "a", 1)
+    for user_id in range(1, 100):
+        cache.invalidate_user(user_id)
+
+    assert len(cache) == 0
+    assert len(cache._invalidated_at) == 3 and not cache._fingerprints
+    # A user whose invalidation was forgotten is treated as invalidated
+    assert cache.put(5, "a", "stale", generation) is False
+    assert cache.put(5, "a", "fresh", cache.generation()) is True
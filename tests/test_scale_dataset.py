@@ -0,0 +1,53 @@
+import numpy as np
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from catalog_loader import load_catalog_records
+from models import Client, DbBase, UserCard, UserSubscription, UserSummary
+from scale_dataset import generate_dataset, popularity_weights, sample_distinct
+
+
+def _catalog_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scale.db'}")
+    DbBase.metadata.create_all(engine)
+    records = [("category", {"name": "Groceries"})]
+    records += [("card", {"name": f"Card {i}", "bank": "RBC"}) for i in range(8)]
+    records += [("subscription", {"name": f"Sub {i}", "monthly_cost_cad": 5.0 + i}) for i in range(6)]
+    with Session(bind=engine) as session:
+        load_catalog_records(session, records)
+        session.commit()
+    return engine
+
+
+def test_generates_users_with_distinct_wallet_rows_and_summaries(tmp_path):
+    engine = _catalog_engine(tmp_path)
+    counts = generate_dataset(engine, 250, password_hash="hash", chunk_users=100, seed=1)
+
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Client)).scalar() == 250
+        assert conn.execute(select(func.count()).select_from(UserSummary)).scalar() == 250
+        assert conn.execute(select(func.count()).select_from(UserCard)).scalar() == counts["user_card"]
+        assert conn.execute(select(func.count()).select_from(UserSubscription)).scalar() == counts["user_subscription"]
+        # Every user holds at least one card, ~5 on average, never more than the catalog
+        per_user = conn.execute(select(func.count()).select_from(UserCard).group_by(UserCard.client_id)).scalars().all()
+        assert len(per_user) == 250 and max(per_user) <= 8
+        assert 3.5 < counts["user_card"] / 250 < 6
+        total = conn.execute(select(func.sum(UserCard.current_points))).scalar()
+        assert conn.execute(select(func.sum(UserSummary.total_points))).scalar() == total
+        assert set(conn.execute(select(Client.password)).scalars()) == {"hash"}
+
+    # A second run continues after the existing ids
+    generate_dataset(engine, 10, password_hash="hash", seed=2)
+    with engine.connect() as conn:
+        assert conn.execute(select(func.max(Client.id))).scalar() == 260
+
+
+def test_sample_distinct_in_small_blocks():
+    rng = np.random.default_rng(0)
+    counts = np.array([0, 3, 1, 50, 2] * 40)
+    # 50-item catalog, 120 keys per block: two rows at a time
+    rows, items = sample_distinct(rng, popularity_weights(50), counts, max_keys=120)
+
+    assert np.bincount(rows, minlength=counts.size).tolist() == counts.tolist()
+    assert len(set(zip(rows.tolist(), items.tolist()))) == rows.size
+    assert items.min() >= 0 and items.max() < 50
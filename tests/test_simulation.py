@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from catalog import BonusInfo, CardInfo, CatalogSnapshot, CategoryInfo
+from earn_rates import build_earn_rate_matrix
+from simulation import sample_spending, simulate_coverage
+
+
+
+@pytest.fixture
+def catalog():
+    cards = (CardInfo(1, "Grocer", "B", 0.0, "pts", 1.0, 1.0, None, True),)
+    categories = (CategoryInfo(1, "Groceries", None, None), CategoryInfo(2, "Gas", None, None))
+    return CatalogSnapshot(1, cards, (), categories, build_earn_rate_matrix(cards, categories, [BonusInfo(1, 1, 2.0)]))
+
+
+def test_seeded_runs_are_reproducible(catalog):
+    args = (catalog, [1], [400, 1500], {"1": 500})
+    first = simulate_coverage(*args, n_samples=2000, seed=7)
+    second = simulate_coverage(*args, n_samples=2000, seed=7)
+
+    assert first == second
+    # 1000 points on average: the cheaper one is usually covered, the dearer one usually not
+    assert 0.5 < first.probabilities[0] < 1.0
+    assert 0.0 < first.probabilities[1] < 0.5
+    assert first.percentiles[5] < first.percentiles[50] < first.percentiles[95]
+
+
+def test_zero_variance_matches_deterministic_answer(catalog):
+    simulation = simulate_coverage(catalog, [1], [999, 1000, 1001], {"1": 250, "2": 250}, n_samples=50, cv=0)
+
+    # 2 x 250 + 1 x 250 = 750 points in every sample
+    assert simulation.mean_points == 750
+    assert simulation.probabilities == [0.0, 0.0, 0.0]
+    assert simulate_coverage(catalog, [1], [750], {"1": 250, "2": 250}, cv=0).probabilities == [1.0]
+
+
+@pytest.mark.parametrize("distribution", ["lognormal", "gamma", "normal"])
+def test_samples_keep_the_mean(distribution):
+    samples = sample_spending([100.0, 400.0], 100000, distribution, cv=[0.2, 0.0], rng=np.random.default_rng(1))
+
+    assert samples.shape == (100000, 2)
+    assert samples[:, 0].mean() == pytest.approx(100.0, rel=0.01)
+    assert (samples[:, 1] == 400.0).all()
+    assert (samples >= 0).all()
+
+
+def test_invalid_arguments(catalog):
+    with pytest.raises(ValueError):
+        sample_spending([100.0], 10, "uniform")
+    with pytest.raises(ValueError):
+        sample_spending([100.0], 10, cv=-1)
+    with pytest.raises(ValueError):
+        simulate_coverage(catalog, [1], [], {"1": 100}, n_samples=0)
+
+
+def test_route_rejects_spending_that_is_not_an_object(user_client):
+    client, _ = user_client
+
+    assert client.post("/simulate-coverage", json={"spending": [1, 2]}).status_code == 400
+    assert client.post("/simulate-coverage", json={"samples": 100}).status_code == 200
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from startup import Lazy, startup_report
+
+
+def test_lazy_builds_once_across_threads():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    lazy = Lazy("thing", factory)
+    assert not lazy.ready
+    assert startup_report(lazy) == {"thing": None}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert lazy.ready
+    assert startup_report(lazy)["thing"] >= 50
+
+
+def test_failed_factory_is_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("not yet")
+        return "ok"
+
+    lazy = Lazy("flaky", factory)
+    try:
+        lazy()
+    except RuntimeError:
+        pass
+    assert not lazy.ready
+    assert lazy() == "ok"
+
+
+def test_importing_app_defers_rarely_used_modules():
+    code = (
+        "import sys, app; "
+        "print(sorted(m for m in ('forms', 'email_utils', 'flask_mail', 'merchant_index') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_database_location_follows_database_url(client, capsys):
+    import app as app_module
+
+    expected = os.environ["DATABASE_URL"][len("sqlite:///"):]
+    app_module._init_database()
+
+    assert f"Database initialized at: {expected}" in capsys.readouterr().out
+    assert client.get("/health").get_json()["database"] == expected
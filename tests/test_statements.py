@@ -0,0 +1,120 @@
+import io
+from datetime import date
+
+import pytest
+
+from catalog import CategoryInfo
+from merchant_index import MerchantIndex
+from statements import (
+    StatementError, aggregate_spending, parse_amount, read_csv_transactions,
+    read_transactions,
+)
+
+CATEGORIES = [
+    CategoryInfo(1, "Groceries", None, None),
+    CategoryInfo(3, "Dining", None, None),
+    CategoryInfo(10, "Other", None, None),
+]
+CLASSIFIER = MerchantIndex.compile().classifier(CATEGORIES)
+
+
+def test_parse_amount_formats():
+    assert parse_amount("$1,234.50") == 1234.5
+    assert parse_amount("(12.00)") == -12.0
+    assert parse_amount("") is None
+    assert parse_amount("n/a") is None
+
+
+def test_csv_debit_column_and_month_totals():
+    lines = io.StringIO(
+        "Date,Description,Debit,Credit\n"
+        "2024-01-03,LOBLAWS 12,50.00,\n"
+        "2024-01-20,Tim Hortons,4.50,\n"
+        "2024-01-25,PAYMENT,,300.00\n"
+        "2024-02-01,Loblaws,150.00,\n"
+    )
+    monthly = aggregate_spending(read_csv_transactions(lines), CLASSIFIER)
+
+    assert monthly.transactions == 3
+    assert monthly.months == {"2024-01": {1: 50.0, 3: 4.5}, "2024-02": {1: 150.0}}
+    assert monthly.average() == {1: 100.0, 3: 2.25}
+
+
+def test_negative_spend_flips_single_amount_column():
+    lines = io.StringIO("Date,Description,Amount\n01/31/2024,Corner store,-20.00\n02/01/2024,Refund,5.00\n")
+    transactions = list(read_csv_transactions(lines, negative_spend=True))
+
+    assert transactions == [(date(2024, 1, 31), "Corner store", 20.0)]
+
+
+def test_missing_columns_is_an_error():
+    with pytest.raises(StatementError):
+        list(read_csv_transactions(io.StringIO("When,What\n2024-01-01,x\n")))
+
+
+def test_ofx_detected_from_content():
+    ofx = (
+        b"OFXHEADER:100\n<OFX><BANKTRANLIST>\n"
+        b"<STMTTRN><DTPOSTED>20240305<TRNAMT>-12.34<NAME>PIZZA PIZZA</STMTTRN>\n"
+        b"<STMTTRN><DTPOSTED>20240306<TRNAMT>99.00<NAME>DEPOSIT</STMTTRN>\n"
+        b"</BANKTRANLIST></OFX>\n"
+    )
+    transactions = list(read_transactions(io.BytesIO(ofx), "statement.txt"))
+
+    assert transactions == [(date(2024, 3, 5), "PIZZA PIZZA", 12.34)]
+
+
+def test_streams_rows_without_materializing_them():
+    def rows():
+        yield "Date,Description,Amount\n"
+        for i in range(200_000):
+            yield f"2023-{i % 12 + 1:02d}-15,Sobeys,1.00\n"
+
+    monthly = aggregate_spending(read_csv_transactions(rows()), CLASSIFIER)
+
+    assert monthly.transactions == 200_000
+    assert len(monthly.months) == 12
+    assert monthly.average() == {1: pytest.approx(200_000 / 12, abs=0.01)}
+
+
+def _upload(client, text, filename="statement.csv", **form):
+    data = dict(form, statement=(io.BytesIO(text.encode()), filename))
+    return client.post("/import-statement", data=data, content_type="multipart/form-data")
+
+
+def test_import_route_requires_a_file(user_client):
+    client, _ = user_client
+
+    assert client.post("/import-statement", data={}, content_type="multipart/form-data").status_code == 400
+    assert _upload(client, "", filename="").status_code == 400
+
+
+def test_import_route_rejects_unparseable_statements(user_client):
+    client, _ = user_client
+
+    response = _upload(client, "Foo,Bar\n1,2\n")
+
+    assert response.status_code == 400
+    assert "date, description and amount" in response.get_json()["error"]
+
+
+def test_import_route_maps_spending(user_client):
+    client, _ = user_client
+
+    response = _upload(
+        client,
+        "Date,Description,Debit,Credit\n"
+        "2024-01-03,LOBLAWS 12,50.00,\n"
+        "2024-01-20,Tim Hortons,4.50,\n"
+        "2024-01-25,PAYMENT,,300.00\n"
+        "2024-02-01,Loblaws,150.00,\n",
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["transactions"] == 3
+    assert data["months"] == {"2024-01": {"Groceries": 50.0, "Dining": 4.5}, "2024-02": {"Groceries": 150.0}}
+    assert data["spending"] == {"1": 100.0, "3": 2.25}
+    # Scored like /calculate-points; an empty wallet earns nothing
+    assert data["total_points"] == 0
+    assert data["coverage"] == []
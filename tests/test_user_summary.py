@@ -0,0 +1,51 @@
+import pytest
+
+from models import Client, Subscription, UserCard, UserSubscription, UserSummary
+from user_summary import get_user_summary, rebuild_user_summaries, refresh_user_summary
+
+
+@pytest.fixture
+def db_session(db_session):
+    db_session.add_all([
+        Client(id=1, email="a@example.com"),
+        Client(id=2, email="b@example.com"),
+        Subscription(id=1, name="Spotify Premium", monthly_cost_cad=11.99),
+        Subscription(id=2, name="Crave", monthly_cost_cad=19.99),
+        UserCard(client_id=1, credit_card_id=1, current_points=1500),
+        UserCard(client_id=1, credit_card_id=2, current_points=500),
+        UserSubscription(client_id=1, subscription_id=1),
+        UserSubscription(client_id=1, subscription_id=2, is_active=False),
+    ])
+    db_session.commit()
+    return db_session
+
+
+def test_missing_summary_is_filled_on_read(db_session):
+    summary = get_user_summary(db_session, 1)
+
+    assert summary.total_points == 2000
+    assert summary.monthly_cost_cad == 11.99
+    assert summary.points_needed == 1199
+    assert summary.coverage_percent == 100
+    assert db_session.get(UserSummary, 1) is not None
+
+
+def test_refresh_tracks_wallet_changes(db_session):
+    refresh_user_summary(db_session, 2)
+    db_session.add(UserCard(client_id=2, credit_card_id=1, current_points=300))
+    db_session.add(UserSubscription(client_id=2, subscription_id=2))
+    db_session.flush()
+    refresh_user_summary(db_session, 2)
+    db_session.commit()
+
+    assert get_user_summary(db_session, 2) == (300, 19.99, 1998, 15)
+
+
+def test_rebuild_repairs_drift(db_session):
+    refresh_user_summary(db_session, 1)
+    db_session.get(UserSummary, 1).total_points = 1
+    db_session.commit()
+
+    assert rebuild_user_summaries(db_session) == 2
+    assert get_user_summary(db_session, 1).total_points == 2000
+    assert get_user_summary(db_session, 2) == (0, 0, 0, 0)
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+
+import wallet
+from models import Client, UserCard, UserSubscription
+
+
+@pytest.fixture
+def db_session(db_session):
+    db_session.add_all([Client(id=1, email="a@example.com"), Client(id=2, email="b@example.com")])
+    db_session.commit()
+    return db_session
+
+
+def test_add_card_once(db_session):
+    assert wallet.add_user_card(db_session, 1, 7) is True
+    assert wallet.add_user_card(db_session, 1, 7) is False
+    assert wallet.add_user_card(db_session, 2, 7) is True
+    db_session.commit()
+
+    assert db_session.query(UserCard).filter_by(client_id=1).count() == 1
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_remove_returns_catalog_id_for_owner_only(db_session, monkeypatch, returning):
+    monkeypatch.setattr(wallet, "_supports_delete_returning", lambda dialect: returning)
+    wallet.add_user_subscription(db_session, 1, 4)
+    db_session.commit()
+    user_sub_id = db_session.execute(select(UserSubscription.id).filter_by(client_id=1)).scalar()
+
+    assert wallet.remove_user_subscription(db_session, 2, user_sub_id) is None
+    assert wallet.remove_user_subscription(db_session, 1, user_sub_id) == 4
+    assert wallet.remove_user_subscription(db_session, 1, user_sub_id) is None
+
+
+def test_set_card_points_only_touches_own_cards(db_session):
+    wallet.add_user_card(db_session, 1, 7)
+    wallet.add_user_card(db_session, 1, 8)
+    wallet.add_user_card(db_session, 2, 7)
+    db_session.commit()
+    ids = dict(db_session.execute(select(UserCard.credit_card_id, UserCard.id).filter_by(client_id=1)).all())
+    other = db_session.execute(select(UserCard.id).filter_by(client_id=2)).scalar()
+
+    wallet.set_card_points(db_session, 1, {ids[7]: 5000, ids[8]: -10, other: 999})
+    db_session.commit()
+
+    points = dict(db_session.execute(select(UserCard.id, UserCard.current_points)).all())
+    assert points == {ids[7]: 5000, ids[8]: 0, other: 0}
+
+
+@pytest.mark.parametrize("points", [1.7, True, "1500", None])
+def test_points_sync_rejects_non_integers(user_client, points):
+    client, _ = user_client
+
+    response = client.post("/update-points", json={"points": {"1": points}})
+
+    assert response.status_code == 400
+
+
+def test_points_sync_accepts_whole_floats(user_client):
+    client, _ = user_client
+
+    response = client.post("/update-points", json={"points": {"1": 1500.0}})
+
+    assert response.status_code == 200
+    assert response.get_json()["not_found"] == [1]
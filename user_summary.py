@@ -0,0 +1,136 @@
+"""
+Denormalized per-user dashboard totals.
+The dashboard header (total points, monthly cost, points needed, coverage)
+is read from one user_summary row instead of summing every UserCard and
+UserSubscription on each visit.
+
+Every write path that changes a user's cards, points or subscriptions calls
+refresh_user_summary() inside its own transaction, so the row commits or
+rolls back with the change; catalog loads that reprice a subscription call
+refresh_subscriber_summaries() for everyone tracking it. Run this module to
+rebuild all rows and repair drift (e.g. after seed_data.py changes
+subscription prices):
+    python user_summary.py
+"""
+import os
+from collections import namedtuple
+
+from sqlalchemy import delete, func, insert, select
+
+from db_engine import upsert_insert
+from models import Client, Subscription, UserCard, UserSubscription, UserSummary
+
+# Rough estimate used across the app: $1 = 100 points for most cards
+POINTS_PER_DOLLAR = 100
+
+Summary = namedtuple("Summary", ["total_points", "monthly_cost_cad", "points_needed", "coverage_percent"])
+
+
+def summarize(total_points, subscription_costs):
+    """Compute the header values from a points total and monthly costs."""
+    total_points = total_points or 0
+    monthly_cost = sum(subscription_costs)
+    points_needed = int(monthly_cost * POINTS_PER_DOLLAR)
+    coverage_percent = min(100, int((total_points / max(points_needed, 1)) * 100))
+    return Summary(total_points, monthly_cost, points_needed, coverage_percent)
+
+
+def _active_subscription_costs(client_id):
+    return select(Subscription.monthly_cost_cad).join(
+        UserSubscription, UserSubscription.subscription_id == Subscription.id
+    ).where(UserSubscription.client_id == client_id, UserSubscription.is_active.is_(True))
+
+
+def refresh_user_summary(session, client_id):
+    """Recompute and upsert one user's summary in the session's transaction."""
+    total_points = session.execute(
+        select(func.sum(UserCard.current_points)).where(UserCard.client_id == client_id)
+    ).scalar()
+    costs = session.execute(_active_subscription_costs(client_id)).scalars().all()
+    summary = summarize(total_points, costs)
+
+    values = dict(summary._asdict(), client_id=client_id)
+    dialect_insert = upsert_insert(session.get_bind())
+    if dialect_insert is not None:
+        stmt = dialect_insert(UserSummary.__table__).values(**values)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["client_id"],
+            set_={name: stmt.excluded[name] for name in Summary._fields},
+        ))
+    else:
+        session.merge(UserSummary(**values))
+    return summary
+
+
+def get_user_summary(session, client_id):
+    """Primary-key read of a user's summary, filling it in if missing."""
+    row = session.execute(
+        select(*[getattr(UserSummary, name) for name in Summary._fields])
+        .where(UserSummary.client_id == client_id)
+    ).first()
+    if row is None:
+        summary = refresh_user_summary(session, client_id)
+        session.commit()
+        return summary
+    return Summary(*row)
+
+
+def _summary_rows(session, client_ids=None):
+    """Summary rows for every client, or those selected by the client_ids subquery."""
+    points_query = select(UserCard.client_id, func.sum(UserCard.current_points)).group_by(UserCard.client_id)
+    costs_query = (
+        select(UserSubscription.client_id, Subscription.monthly_cost_cad)
+        .join(Subscription, UserSubscription.subscription_id == Subscription.id)
+        .where(UserSubscription.is_active.is_(True))
+    )
+    clients_query = select(Client.id)
+    if client_ids is not None:
+        points_query = points_query.where(UserCard.client_id.in_(client_ids))
+        costs_query = costs_query.where(UserSubscription.client_id.in_(client_ids))
+        clients_query = clients_query.where(Client.id.in_(client_ids))
+
+    points = dict(session.execute(points_query).all())
+    costs = {}
+    for client_id, cost in session.execute(costs_query):
+        costs.setdefault(client_id, []).append(cost)
+    return [
+        dict(summarize(points.get(client_id), costs.get(client_id, []))._asdict(), client_id=client_id)
+        for client_id in session.execute(clients_query).scalars()
+    ]
+
+
+def refresh_subscriber_summaries(session, subscription_ids):
+    """
+    Recompute the summaries of every user tracking one of subscription_ids
+    (e.g. after their prices change) in the session's transaction; returns
+    the row count.
+    """
+    client_ids = select(UserSubscription.client_id).where(UserSubscription.subscription_id.in_(subscription_ids))
+    rows = _summary_rows(session, client_ids)
+    table = UserSummary.__table__
+    session.execute(delete(table).where(table.c.client_id.in_(client_ids)))
+    if rows:
+        session.execute(insert(UserSummary), rows)
+    return len(rows)
+
+
+def rebuild_user_summaries(session):
+    """Recompute every user's summary from scratch; returns the row count."""
+    rows = _summary_rows(session)
+    session.execute(delete(UserSummary))
+    if rows:
+        session.execute(insert(UserSummary), rows)
+    session.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from sqlalchemy.orm import sessionmaker
+    from db_engine import create_db_engine
+    from migrations import run_migrations
+
+    engine = create_db_engine(os.environ.get("DATABASE_URL", "sqlite:///clients.db"))
+    run_migrations(engine)
+    with sessionmaker(bind=engine)() as session:
+        count = rebuild_user_summaries(session)
+    print(f"✅ Rebuilt {count} user summaries!")
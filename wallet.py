@@ -0,0 +1,96 @@
+"""
+Single-statement write paths for a user's wallet and tracked subscriptions.
+Adds are one INSERT ... ON CONFLICT DO NOTHING against the unique
+(client_id, catalog id) indexes, so concurrent clicks can't create duplicates.
+Removes are one DELETE ... RETURNING the catalog id, so the caller can look the
+name up in the catalog snapshot without a join. Balance syncs are one
+executemany UPDATE scoped to the user. Callers commit.
+"""
+from sqlalchemy import bindparam, delete, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from db_engine import upsert_insert
+from models import UserCard, UserSubscription
+
+
+def _insert_do_nothing(session, model, values, conflict_columns):
+    """Insert a row unless it conflicts; True if a row was inserted."""
+    dialect_insert = upsert_insert(session.get_bind())
+    if dialect_insert is not None:
+        stmt = dialect_insert(model.__table__).values(**values).on_conflict_do_nothing(
+            index_elements=conflict_columns
+        )
+        return session.execute(stmt).rowcount == 1
+
+    # No ON CONFLICT support: let the unique index reject the duplicate
+    try:
+        with session.begin_nested():
+            session.execute(insert(model.__table__).values(**values))
+        return True
+    except IntegrityError:
+        return False
+
+
+def _supports_delete_returning(dialect):
+    if dialect.name == "postgresql":
+        return True
+    return dialect.name == "sqlite" and dialect.dbapi.sqlite_version_info >= (3, 35)
+
+
+def _delete_returning(session, model, column, row_id, client_id):
+    """Delete a user's row by id; returns column's value, or None if no row matched."""
+    params = {"id": row_id, "client_id": client_id}
+    if _supports_delete_returning(session.get_bind().dialect):
+        return session.execute(text(
+            f"DELETE FROM {model.__tablename__} WHERE id = :id AND client_id = :client_id "
+            f"RETURNING {column}"
+        ), params).scalar()
+
+    value = session.execute(select(getattr(model, column)).filter_by(**params)).scalar()
+    if value is not None:
+        session.execute(delete(model.__table__).filter_by(**params))
+    return value
+
+
+def add_user_card(session, client_id, credit_card_id):
+    """Add a card to a wallet; False if the user already has it."""
+    return _insert_do_nothing(
+        session, UserCard,
+        {"client_id": client_id, "credit_card_id": credit_card_id, "current_points": 0},
+        ["client_id", "credit_card_id"],
+    )
+
+
+def remove_user_card(session, client_id, user_card_id):
+    """Remove a wallet card; returns its credit_card_id, or None if not found."""
+    return _delete_returning(session, UserCard, "credit_card_id", user_card_id, client_id)
+
+
+def add_user_subscription(session, client_id, subscription_id):
+    """Start tracking a subscription; False if already tracked."""
+    return _insert_do_nothing(
+        session, UserSubscription,
+        {"client_id": client_id, "subscription_id": subscription_id},
+        ["client_id", "subscription_id"],
+    )
+
+
+def remove_user_subscription(session, client_id, user_sub_id):
+    """Stop tracking a subscription; returns its subscription_id, or None if not found."""
+    return _delete_returning(session, UserSubscription, "subscription_id", user_sub_id, client_id)
+
+
+def set_card_points(session, client_id, points_by_card):
+    """Set many wallet balances in one executemany UPDATE; negatives become 0."""
+    if not points_by_card:
+        return
+    table = UserCard.__table__
+    session.execute(
+        update(table)
+        .where(table.c.id == bindparam("user_card_id"), table.c.client_id == bindparam("owner_id"))
+        .values(current_points=bindparam("points")),
+        [
+            {"user_card_id": user_card_id, "owner_id": client_id, "points": max(0, points)}
+            for user_card_id, points in points_by_card.items()
+        ],
+    )